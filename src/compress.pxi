@@ -0,0 +1,357 @@
+# compress.pxi
+# ------------
+# Transparent compressed I/O (gzip / zlib / xz) for every path-taking
+# entry point: XMLDocument.load_file / parse_file, iterparse / iterfind,
+# jsonify.stream_dump / stream_jsonl, save_file and XMLWriter.
+# Include BEFORE stream.pxi and jsonify.pxi: their native read loops use
+# PXSource / PXSink from the C++ block below.
+#
+# Input compression is detected from the file's magic bytes, output
+# compression from the path's extension (.gz, .xz, .zz / .zlib).  The
+# codecs are the standard library's zlib and lzma, so no extra native
+# dependency is linked: the C++ loops pull decompressed bytes with
+# ``readinto()`` straight into their own buffers (and push output through
+# ``write()``), and all (de)compression itself runs in C.
+
+import io
+import os
+import zlib
+
+try:
+    import lzma
+except ImportError:            # Python built without liblzma
+    lzma = None
+
+import gzip
+
+from cpython.ref cimport PyObject
+from libc.stdio cimport FILE
+
+
+cdef extern from *:
+    """
+    #include <cstdio>
+    #include <cstring>
+    #include <string>
+    #include "pugixml.hpp"
+
+    // Copy the pending Python exception's message into errbuf and clear
+    // it, so callers can report it through their usual errbuf path.
+    static void px_error_to_buf(const char* what, char* errbuf, size_t errbuf_size) {
+        PyObject *type, *value, *tb;
+        PyErr_Fetch(&type, &value, &tb);
+        PyObject* s = value ? PyObject_Str(value) : nullptr;
+        const char* msg = s ? PyUnicode_AsUTF8(s) : nullptr;
+        snprintf(errbuf, errbuf_size, "%s: %s", what, msg ? msg : "unknown error");
+        Py_XDECREF(s);
+        Py_XDECREF(type);
+        Py_XDECREF(value);
+        Py_XDECREF(tb);
+        PyErr_Clear();
+    }
+
+    // 64-bit seek / tell on a FILE*: MSVC has no fseeko / ftello.
+    static int px_fseek64(FILE* fp, unsigned long long off) {
+    #if defined(_WIN32)
+        return _fseeki64(fp, (__int64)off, SEEK_SET);
+    #else
+        return fseeko(fp, (off_t)off, SEEK_SET);
+    #endif
+    }
+
+    static long long px_ftell64(FILE* fp) {
+    #if defined(_WIN32)
+        return (long long)_ftelli64(fp);
+    #else
+        return (long long)ftello(fp);
+    #endif
+    }
+
+    // Input side of a native read loop: a FILE* for plain files, or a
+    // Python decompressing reader filled through readinto().
+    struct PXSource {
+        FILE*     fp = nullptr;
+        PyObject* fh = nullptr;      // borrowed; owned by the Cython caller
+        bool      failed = false;
+
+        bool open(const char* path, PyObject* reader) {
+            if (reader && reader != Py_None) { fh = reader; return true; }
+            fp = fopen(path, "rb");
+            return fp != nullptr;
+        }
+
+        size_t read(char* buf, size_t n) {
+            if (fp) return fread(buf, 1, n, fp);
+            if (!fh || failed) return 0;
+            PyObject* mv = PyMemoryView_FromMemory(buf, (Py_ssize_t)n, PyBUF_WRITE);
+            if (!mv) { failed = true; return 0; }
+            PyObject* r = PyObject_CallMethod(fh, "readinto", "O", mv);
+            Py_DECREF(mv);
+            if (!r) { failed = true; return 0; }
+            Py_ssize_t got = r == Py_None ? 0 : PyLong_AsSsize_t(r);
+            Py_DECREF(r);
+            if (got < 0) { failed = true; return 0; }
+            return (size_t)got;
+        }
+
+        bool seek(unsigned long long off) {
+            if (fp) return px_fseek64(fp, off) == 0;
+            if (!fh || failed) return false;
+            PyObject* r = PyObject_CallMethod(fh, "seek", "K", off);
+            if (!r) { failed = true; return false; }
+            Py_DECREF(r);
+            return true;
+        }
+
+        void close() {
+            if (fp) { fclose(fp); fp = nullptr; }
+            fh = nullptr;
+        }
+    };
+
+    // Output side: a FILE* for plain files, or a Python compressing
+    // writer fed in 64 KB blocks through write().
+    struct PXSink {
+        FILE*       fp = nullptr;
+        PyObject*   fh = nullptr;    // borrowed; owned by the Cython caller
+        std::string buf;
+        bool        failed = false;
+
+        bool open(const char* path, const char* mode, PyObject* writer) {
+            if (writer && writer != Py_None) { fh = writer; return true; }
+            fp = fopen(path, mode);
+            return fp != nullptr;
+        }
+
+        bool flush() {
+            if (failed) return false;
+            if (!fh || buf.empty()) return true;
+            PyObject* r = PyObject_CallMethod(fh, "write", "y#",
+                                              buf.data(), (Py_ssize_t)buf.size());
+            if (!r) { failed = true; return false; }
+            Py_DECREF(r);
+            buf.clear();
+            return true;
+        }
+
+        bool write(const char* p, size_t n) {
+            if (fp) return fwrite(p, 1, n, fp) == n;
+            buf.append(p, n);
+            return buf.size() < 65536 || flush();
+        }
+
+        bool put(char c) { return write(&c, 1); }
+
+        bool close() {
+            bool ok = true;
+            if (fp) { ok = fclose(fp) == 0; fp = nullptr; }
+            else if (fh) ok = flush();
+            fh = nullptr;
+            return ok;
+        }
+    };
+
+    // Decompress a whole document straight into a pugixml-owned buffer
+    // and parse it in place -- no intermediate Python bytes object.
+    static bool px_load_reader(pugi::xml_document* doc, PyObject* reader,
+                               unsigned int opts, int enc,
+                               bool use_default_opts) {
+        pugi::allocation_function alloc = pugi::get_memory_allocation_function();
+        pugi::deallocation_function dealloc = pugi::get_memory_deallocation_function();
+        PXSource src;
+        src.fh = reader;
+        size_t cap = 1 << 16, len = 0;
+        char* buf = static_cast<char*>(alloc(cap));
+        if (!buf) { PyErr_NoMemory(); return false; }
+        for (;;) {
+            if (len == cap) {
+                char* nbuf = static_cast<char*>(alloc(cap * 2));
+                if (!nbuf) { dealloc(buf); PyErr_NoMemory(); return false; }
+                memcpy(nbuf, buf, len);
+                dealloc(buf);
+                buf = nbuf;
+                cap *= 2;
+            }
+            size_t got = src.read(buf + len, cap - len);
+            if (src.failed) { dealloc(buf); return false; }
+            if (got == 0) break;
+            len += got;
+        }
+        pugi::xml_parse_result r = use_default_opts
+            ? doc->load_buffer_inplace_own(buf, len)
+            : doc->load_buffer_inplace_own(buf, len, opts,
+                                           static_cast<pugi::xml_encoding>(enc));
+        return static_cast<bool>(r);
+    }
+    """
+    bint px_load_reader(xml_document* doc, object reader, unsigned int opts,
+                        int enc, bint use_default_opts) except? False
+
+
+# Bytes read from the start of a file to decide whether it is compressed.
+_SNIFF_SIZE = 512
+
+
+# Magic numbers: gzip (RFC 1952) and xz, which no XML document can start
+# with.  A zlib (RFC 1950) header is only a deflate CMF byte whose 16-bit
+# header is a multiple of 31, which plain text such as "hb", "Xf" or
+# "8(" (a FRAGMENT, say) passes as well.  So zlib is taken from a .zz /
+# .zlib suffix of *path*, or otherwise only when *head* really inflates
+# to something that starts like XML.
+cdef str _sniff_compression(bytes head, path=None):
+    if head[:2] == b"\x1f\x8b":
+        return "gzip"
+    if head[:6] == b"\xfd7zXZ\x00":
+        return "xz"
+    if (len(head) >= 2 and (head[0] & 0x0F) == 8 and (head[0] >> 4) <= 7
+            and ((head[0] << 8) | head[1]) % 31 == 0):
+        if path is not None and _compression_for_path(path) == "zlib":
+            return "zlib"
+        try:
+            start = zlib.decompressobj().decompress(head, 16)
+        except zlib.error:
+            return None
+        if start[:1] in (b"<", b" ", b"\t", b"\r", b"\n") or start[:3] == b"\xef\xbb\xbf":
+            return "zlib"
+    return None
+
+
+_COMPRESSED_EXTENSIONS = {
+    ".gz": "gzip",
+    ".xz": "xz",
+    ".zz": "zlib",
+    ".zlib": "zlib",
+}
+
+
+cdef str _compression_for_path(path):
+    """Compression implied by an output path's extension, or ``None``."""
+    cdef str p = os.fsdecode(path).lower()
+    for ext, kind in _COMPRESSED_EXTENSIONS.items():
+        if p.endswith(ext):
+            return kind
+    return None
+
+
+cdef _require_lzma():
+    if lzma is None:
+        raise PygiXMLError("xz compression requires Python's lzma module")
+
+
+class _ZlibReader(io.RawIOBase):
+    """Readable raw stream over a zlib-wrapped (RFC 1950) file."""
+
+    def __init__(self, path):
+        self._fh = open(path, "rb")
+        self._d = zlib.decompressobj()
+        self._pending = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        cdef Py_ssize_t n = len(b)
+        while True:
+            data = self._d.decompress(self._pending, n)
+            self._pending = self._d.unconsumed_tail
+            if data:
+                b[:len(data)] = data
+                return len(data)
+            if self._d.eof:
+                return 0
+            if not self._pending:
+                self._pending = self._fh.read(65536)
+                if not self._pending:
+                    raise EOFError("Compressed file ended before the "
+                                   "end-of-stream marker was reached")
+
+    def close(self):
+        if not self.closed:
+            self._fh.close()
+        super().close()
+
+
+class _ZlibWriter(io.RawIOBase):
+    """Writable raw stream producing a zlib-wrapped (RFC 1950) file."""
+
+    def __init__(self, path):
+        self._fh = open(path, "wb")
+        self._c = zlib.compressobj()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._fh.write(self._c.compress(b))
+        return len(b)
+
+    def close(self):
+        if not self.closed:
+            try:
+                self._fh.write(self._c.flush())
+            finally:
+                self._fh.close()
+        super().close()
+
+
+cdef object _open_compressed_reader(path):
+    """Return a decompressing binary reader for *path*, or ``None`` when
+    the file is not compressed (or cannot be opened — callers then fall
+    back to their normal error handling)."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(_SNIFF_SIZE)
+    except OSError:
+        return None
+    cdef str kind = _sniff_compression(head, path)
+    if kind is None:
+        return None
+    if kind == "gzip":
+        return gzip.open(path, "rb")
+    if kind == "xz":
+        _require_lzma()
+        return lzma.open(path, "rb")
+    return io.BufferedReader(_ZlibReader(path))
+
+
+cdef object _open_compressed_writer(path):
+    """Return a compressing binary writer for *path* based on its
+    extension, or ``None`` for plain output."""
+    cdef str kind = _compression_for_path(path)
+    if kind is None:
+        return None
+    if kind == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    if kind == "xz":
+        _require_lzma()
+        return lzma.open(path, "wb")
+    return _ZlibWriter(path)
+
+
+cdef object _open_input(path):
+    """Open *path* for binary reading, decompressing transparently."""
+    reader = _open_compressed_reader(path)
+    return reader if reader is not None else open(path, "rb")
+
+
+_DECOMPRESSION_ERRORS = (OSError, EOFError, zlib.error) + (
+    (lzma.LZMAError,) if lzma is not None else ())
+
+
+cdef int _load_compressed(xml_document* doc, path, unsigned int opts,
+                          int enc, bint use_default_opts) except -1:
+    """Parse a compressed file into *doc*.
+
+    Returns 1 on success, 0 when the data cannot be decompressed or
+    parsed, and 2 when *path* is not compressed at all, in which case the
+    caller uses pugixml's own file loader.
+    """
+    reader = _open_compressed_reader(path)
+    if reader is None:
+        return 2
+    try:
+        return 1 if px_load_reader(doc, reader, opts, enc, use_default_opts) else 0
+    except _DECOMPRESSION_ERRORS:
+        return 0
+    finally:
+        reader.close()
@@ -381,7 +381,7 @@ def dictify_parse(str xml,
         # {'root': {'@id': '1', 'item': ['a', 'b']}}
     """
     cdef XMLDocument doc = XMLDocument()
-    if not doc.load_string(xml):
+    if not doc._load_string(xml, 0xFFFFFFFF, "dictify.parse"):
         raise PygiXMLError("Failed to parse XML string")
     cdef xml_node root_raw = doc._doc.first_child()
     if _node_is_null(root_raw):
@@ -412,7 +412,7 @@ def dictify_parse_file(str path,
         PygiXMLError: If the file cannot be read or XML is malformed.
     """
     cdef XMLDocument doc = XMLDocument()
-    if not doc.load_file(path):
+    if not doc._load_file(path, 0xFFFFFFFF, "dictify.parse_file"):
         raise PygiXMLError(f"Failed to parse XML file: {path}")
     cdef xml_node root_raw = doc._doc.first_child()
     if _node_is_null(root_raw):
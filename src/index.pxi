@@ -0,0 +1,448 @@
+# index.pxi
+# ---------
+# Opt-in per-document lookup indexes: XMLDocument.build_index() (tag
+# index) and XMLDocument.index_by_attr() (AttrIndex).
+#
+# A tag index maps every element name to its elements in document order,
+# together with each element's preorder number, so "all <item> under this
+# node" is a binary search over one vector instead of a walk over the
+# whole subtree.  An AttrIndex maps the values of one attribute to the
+# elements carrying them.
+#
+# Indexed documents are registered by document node address.  Every
+# method that adds, removes or renames elements calls _touch() on the
+# node it changed, which bumps that document's generation; every method
+# that edits attributes calls _touch_attrs() on the element carrying
+# them (an XMLAttribute remembers the element it was reached from),
+# which bumps that document's attribute generation.  An index built at an older generation is rebuilt lazily on
+# its next use, so a batch of edits costs one rebuild -- and edits to
+# one document never invalidate another's indexes.  With no index
+# anywhere, the hooks are a single empty-dict test.
+#
+# Both indexes hold raw xml_node_struct pointers.  They stay valid
+# because (1) an index is never used at an older generation than the
+# one it was built at, and every pygixml call that frees nodes (removal,
+# reset, reload) touches the document first; (2) an AttrIndex keeps its
+# XMLDocument alive, and a document's tag index is dropped with it in
+# XMLDocument.__dealloc__, so a new document allocated at the same
+# address never finds a stale entry in _INDEXED_DOCS.  Freeing nodes
+# behind pygixml's back (pugixml calls from other C++ code) is not
+# supported while an index exists.
+
+cdef extern from *:
+    """
+    #include <algorithm>
+    #include <string>
+    #include <unordered_map>
+    #include <utility>
+    #include <vector>
+    #include "pugixml.hpp"
+
+    static inline size_t px_document_key(const pugi::xml_node& node) {
+        return reinterpret_cast<size_t>(node.root().internal_object());
+    }
+
+    // Next node after n in preorder within doc's tree (null at the end).
+    static inline pugi::xml_node px_next_preorder(pugi::xml_node n,
+                                                  const pugi::xml_node& doc) {
+        if (n.first_child()) return n.first_child();
+        while (n != doc && !n.next_sibling()) n = n.parent();
+        return n == doc ? pugi::xml_node() : n.next_sibling();
+    }
+
+    class PXTagIndex {
+    public:
+        typedef std::pair<size_t, pugi::xml_node_struct*> entry;
+
+        std::unordered_map<std::string, std::vector<entry>> tags;
+        std::unordered_map<const pugi::xml_node_struct*, size_t> order;
+        size_t count = 0;
+
+        // Number every element in preorder and file it under its name.
+        void build(pugi::xml_node doc) {
+            tags.clear();
+            order.clear();
+            count = 0;
+            for (pugi::xml_node n = doc.first_child(); n; n = px_next_preorder(n, doc)) {
+                if (n.type() != pugi::node_element) continue;
+                order.emplace(n.internal_object(), count);
+                tags[n.name()].emplace_back(count, n.internal_object());
+                ++count;
+            }
+        }
+
+        // Preorder numbers [lo, hi) of the elements strictly below scope.
+        // hi is the number of the first element after scope's subtree,
+        // found by walking up to the nearest following element sibling.
+        void range(pugi::xml_node scope, size_t& lo, size_t& hi) const {
+            lo = hi = 0;
+            if (scope.type() == pugi::node_document) { hi = count; return; }
+            auto it = order.find(scope.internal_object());
+            if (it == order.end()) return;
+            lo = it->second + 1;
+            hi = count;
+            for (pugi::xml_node n = scope; n && n.type() != pugi::node_document;
+                 n = n.parent()) {
+                for (pugi::xml_node s = n.next_sibling(); s; s = s.next_sibling()) {
+                    if (s.type() == pugi::node_element) {
+                        hi = order.find(s.internal_object())->second;
+                        return;
+                    }
+                }
+            }
+        }
+
+        // Elements below scope named any of names, in document order.
+        void descendants(pugi::xml_node scope,
+                         const std::vector<std::string>& names,
+                         std::vector<pugi::xml_node>& out) const {
+            size_t lo, hi;
+            range(scope, lo, hi);
+            std::vector<entry> hits;
+            for (const std::string& name : names) {
+                auto t = tags.find(name);
+                if (t == tags.end()) continue;
+                const std::vector<entry>& v = t->second;
+                auto b = std::lower_bound(v.begin(), v.end(), entry(lo, nullptr));
+                auto e = std::lower_bound(b, v.end(), entry(hi, nullptr));
+                hits.insert(hits.end(), b, e);
+            }
+            if (names.size() > 1) {
+                std::sort(hits.begin(), hits.end());
+                hits.erase(std::unique(hits.begin(), hits.end()), hits.end());
+            }
+            out.reserve(out.size() + hits.size());
+            for (const entry& h : hits) out.push_back(pugi::xml_node(h.second));
+        }
+
+        // The node set of //name, already in document order.
+        pugi::xpath_node_set node_set(const std::string& name) const {
+            auto t = tags.find(name);
+            if (t == tags.end()) return pugi::xpath_node_set();
+            std::vector<pugi::xpath_node> nodes;
+            nodes.reserve(t->second.size());
+            for (const entry& h : t->second) nodes.emplace_back(pugi::xml_node(h.second));
+            return pugi::xpath_node_set(nodes.data(), nodes.data() + nodes.size(),
+                                        pugi::xpath_node_set::type_sorted);
+        }
+
+        pugi::xml_node first(const std::string& name) const {
+            auto t = tags.find(name);
+            if (t == tags.end() || t->second.empty()) return pugi::xml_node();
+            return pugi::xml_node(t->second.front().second);
+        }
+    };
+
+    class PXAttrIndex {
+    public:
+        std::unordered_map<std::string, std::vector<pugi::xml_node>> values;
+        size_t count = 0;
+
+        // File every element (named tag, unless tag is empty) carrying
+        // attribute attr under that attribute's value, in document order.
+        void build(pugi::xml_node doc, const std::string& attr,
+                   const std::string& tag) {
+            values.clear();
+            count = 0;
+            for (pugi::xml_node n = doc.first_child(); n; n = px_next_preorder(n, doc)) {
+                if (n.type() != pugi::node_element) continue;
+                if (!tag.empty() && tag != n.name()) continue;
+                pugi::xml_attribute a = n.attribute(attr.c_str());
+                if (!a) continue;
+                values[a.value()].push_back(n);
+                ++count;
+            }
+        }
+
+        const std::vector<pugi::xml_node>* find(const std::string& v) const {
+            auto it = values.find(v);
+            return it == values.end() ? nullptr : &it->second;
+        }
+
+        pugi::xml_node first(const std::string& v) const {
+            auto it = values.find(v);
+            return it == values.end() ? pugi::xml_node() : it->second.front();
+        }
+    };
+    """
+    size_t px_document_key(const xml_node& node)
+
+    cdef cppclass PXTagIndex:
+        size_t count
+        void build(xml_node doc) except +
+        void descendants(xml_node scope, const vector[string]& names,
+                         vector[xml_node]& out) except +
+        xpath_node_set node_set(const string& name) except +
+        xml_node first(const string& name)
+
+    cdef cppclass PXAttrIndex:
+        size_t count
+        size_t num_values "values.size"()
+        void build(xml_node doc, const string& attr, const string& tag) except +
+        const vector[xml_node]* find(const string& value)
+        xml_node first(const string& value)
+
+
+cdef class _DocIndexes:
+    """Index state of one document; lives in _INDEXED_DOCS."""
+    cdef PXTagIndex* tags         # NULL until build_index()
+    cdef size_t      generation   # bumped by every structural edit
+    cdef size_t      attr_generation   # bumped by every attribute edit
+    cdef size_t      tags_built   # generation the tag index reflects
+    cdef Py_ssize_t  attr_users   # live AttrIndex objects
+    cdef Py_ssize_t  serializers  # live iter_serialize() iterators
+
+    def __cinit__(self):
+        self.tags = NULL
+        self.generation = 1
+        self.attr_generation = 1
+        self.tags_built = 0
+        self.attr_users = 0
+        self.serializers = 0
+
+    def __dealloc__(self):
+        if self.tags != NULL:
+            del self.tags
+
+
+# document node address -> _DocIndexes
+cdef dict _INDEXED_DOCS = {}
+
+cdef inline void _touch(xml_node node):
+    """Invalidate the indexes of *node*'s document, if it has any."""
+    if _INDEXED_DOCS:
+        _touch_key(px_document_key(node))
+
+
+cdef void _touch_key(size_t key):
+    state = _INDEXED_DOCS.get(key)
+    if state is not None:
+        (<_DocIndexes>state).generation += 1
+
+
+cdef inline void _touch_attrs(xml_node node):
+    """Invalidate the attribute indexes of *node*'s document after an
+    edit to *node*'s attributes."""
+    if _INDEXED_DOCS:
+        _touch_attrs_key(px_document_key(node))
+
+
+cdef void _touch_attrs_key(size_t key):
+    state = _INDEXED_DOCS.get(key)
+    if state is not None:
+        (<_DocIndexes>state).attr_generation += 1
+
+
+cdef _DocIndexes _doc_indexes(xml_node doc_node, bint create):
+    key = px_document_key(doc_node)
+    state = _INDEXED_DOCS.get(key)
+    if state is None and create:
+        state = _INDEXED_DOCS[key] = _DocIndexes()
+    return state
+
+
+cdef void _release_doc_indexes(xml_node doc_node, _DocIndexes state):
+    """Unregister *state* once it holds no index at all."""
+    if state.tags == NULL and state.attr_users == 0 and state.serializers == 0:
+        _INDEXED_DOCS.pop(px_document_key(doc_node), None)
+
+
+cdef void _drop_indexes(xml_node doc_node):
+    if _INDEXED_DOCS:
+        _INDEXED_DOCS.pop(px_document_key(doc_node), None)
+
+
+cdef _DocIndexes _tag_index_for(xml_node node):
+    """The index state of *node*'s document with an up-to-date tag
+    index, or ``None`` when it has no tag index."""
+    if not _INDEXED_DOCS:
+        return None
+    state = _INDEXED_DOCS.get(px_document_key(node))
+    if state is None or (<_DocIndexes>state).tags == NULL:
+        return None
+    cdef _DocIndexes st = <_DocIndexes>state
+    if st.tags_built != st.generation:
+        st.tags.build(node.root())
+        st.tags_built = st.generation
+    return st
+
+
+cdef size_t _build_tag_index(xml_node doc_node) except? 0:
+    cdef _DocIndexes state = _doc_indexes(doc_node, True)
+    if state.tags == NULL:
+        state.tags = new PXTagIndex()
+    state.tags.build(doc_node)
+    state.tags_built = state.generation
+    return state.tags.count
+
+
+cdef void _drop_tag_index(xml_node doc_node):
+    cdef _DocIndexes state = _doc_indexes(doc_node, False)
+    if state is None or state.tags == NULL:
+        return
+    del state.tags
+    state.tags = NULL
+    _release_doc_indexes(doc_node, state)
+
+
+cdef bint _indexed_descendants(xml_node scope, list tag_bytes,
+                               vector[xml_node]& out) except -1:
+    """Fill *out* with the elements below *scope* named any of
+    *tag_bytes*, in document order.  Returns ``False`` (leaving *out*
+    empty) when the document has no tag index."""
+    cdef _DocIndexes state = _tag_index_for(scope)
+    if state is None:
+        return False
+    cdef vector[string] names
+    for tb in tag_bytes:
+        names.push_back(<bytes>tb)
+    state.tags.descendants(scope, names, out)
+    return True
+
+
+cdef object _indexed_select(xml_node context, str query, bint first):
+    """Answer ``//name`` from the tag index: an :class:`XPathNodeSet`
+    (or its first :class:`XPathNode`, when *first*).
+    Returns ``NotImplemented`` for any other expression, or when the
+    document has no tag index."""
+    if not query.startswith("//") or not _is_path_name(query[2:]):
+        return NotImplemented
+    cdef _DocIndexes state = _tag_index_for(context)
+    if state is None:
+        return NotImplemented
+    cdef string name = query[2:].encode("utf-8")
+    cdef xml_node found
+    if first:
+        found = state.tags.first(name)
+        if found.type() == node_null:
+            return XPathNode.create_from_cpp(xpath_node())
+        return XPathNode.create_from_cpp(xpath_node(found))
+    return XPathNodeSet.create_from_cpp(state.tags.node_set(name))
+
+
+cdef class AttrIndex:
+    """Elements of one document keyed by the value of one attribute.
+
+    Created by :meth:`XMLDocument.index_by_attr`.  Lookups are hash-table
+    probes instead of a ``//*[@id='...']`` scan per value, so resolving
+    many cross-references costs time linear in the document.
+
+    The index follows edits made through pygixml: adding, removing or
+    renaming elements and changing attributes marks it stale, and it is
+    rebuilt on the next lookup.  :meth:`refresh` rebuilds it on demand.
+    The index keeps its document alive.
+
+    Example::
+
+        >>> doc = pygixml.parse_string(
+        ...     '<r><item id="a"/><item id="b"/><ref to="b"/></r>')
+        >>> ids = doc.index_by_attr('id')
+        >>> ids.get('b').xpath
+        '/r/item[2]'
+        >>> 'z' in ids
+        False
+    """
+    cdef PXAttrIndex* _index
+    cdef XMLDocument  _doc
+    cdef _DocIndexes  _state
+    cdef string       _attr_s
+    cdef string       _tag_s
+    cdef size_t       _built
+    cdef size_t       _attrs_built
+    cdef readonly str attr
+    cdef readonly str tag
+
+    def __cinit__(self):
+        self._index = new PXAttrIndex()
+
+    def __init__(self, XMLDocument doc not None, str attr, str tag=None):
+        if not attr:
+            raise ValueError("attribute name must not be empty")
+        self._doc = doc
+        self.attr = attr
+        self.tag = tag
+        self._attr_s = attr.encode("utf-8")
+        self._tag_s = tag.encode("utf-8") if tag else b""
+        self._state = _doc_indexes(pygixml_document_node(doc._doc), True)
+        self._state.attr_users += 1
+        self.refresh()
+
+    def __dealloc__(self):
+        if self._state is not None:
+            self._state.attr_users -= 1
+            _release_doc_indexes(pygixml_document_node(self._doc._doc),
+                                 self._state)
+        del self._index
+
+    cdef PXAttrIndex* _current(self) except NULL:
+        if (self._built != self._state.generation
+                or self._attrs_built != self._state.attr_generation):
+            self.refresh()
+        return self._index
+
+    def refresh(self):
+        """Rebuild the index from the current document.
+
+        Returns:
+            int: Number of elements indexed.
+        """
+        self._index.build(pygixml_document_node(self._doc._doc),
+                          self._attr_s, self._tag_s)
+        self._built = self._state.generation
+        self._attrs_built = self._state.attr_generation
+        return self._index.count
+
+    def get(self, str value, default=None):
+        """Return the first element (in document order) whose attribute
+        equals *value*, or *default*."""
+        cdef xml_node found = self._current().first(value.encode("utf-8"))
+        if found.type() == node_null:
+            return default
+        return XMLNode.create_from_cpp(found)
+
+    def get_all(self, str value):
+        """Return every element whose attribute equals *value*, in
+        document order.
+
+        Returns:
+            list[XMLNode]
+        """
+        cdef const vector[xml_node]* found = \
+            self._current().find(value.encode("utf-8"))
+        cdef size_t i
+        if found == NULL:
+            return []
+        return [XMLNode.create_from_cpp(found[0][i])
+                for i in range(found.size())]
+
+    def lookup(self, values):
+        """Resolve many values at once.
+
+        Args:
+            values: Iterable of attribute values (``str``).
+
+        Returns:
+            list[XMLNode | None]: The first matching element for each
+            value, in the order given.
+        """
+        cdef PXAttrIndex* index = self._current()
+        cdef xml_node found
+        cdef list out = []
+        for value in values:
+            found = index.first((<str?>value).encode("utf-8"))
+            out.append(None if found.type() == node_null
+                       else XMLNode.create_from_cpp(found))
+        return out
+
+    def __contains__(self, value):
+        if not isinstance(value, str):
+            return False
+        return self._current().find((<str>value).encode("utf-8")) != NULL
+
+    def __len__(self):
+        """Number of distinct attribute values."""
+        return self._current().num_values()
+
+    def __repr__(self):
+        tag = f", tag={self.tag!r}" if self.tag else ""
+        return f"AttrIndex({self.attr!r}{tag})"
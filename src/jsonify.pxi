@@ -482,6 +482,7 @@ cdef extern from *:
     // -------------------------------------------------------------------
     static long long xml_stream_to_json_file(
         const char*  xml_path,
+        PyObject*    xml_reader,
         const char*  json_path,
         const char*  attr_prefix_c,
         const char*  cdata_key_c,
@@ -518,14 +519,14 @@ cdef extern from *:
             return false;
         };
 
-        FILE* xin = fopen(xml_path, "rb");
-        if (!xin) {
+        PXSource xin;
+        if (!xin.open(xml_path, xml_reader)) {
             snprintf(errbuf, errbuf_size, "cannot open XML input: %s", xml_path);
             return -1;
         }
         FILE* fout = fopen(json_path, "w+b");   // read+write: needed for seek/patch
         if (!fout) {
-            fclose(xin);
+            xin.close();
             snprintf(errbuf, errbuf_size, "cannot open JSON output: %s", json_path);
             return -1;
         }
@@ -783,7 +784,11 @@ cdef extern from *:
         bool ok = true;
 
         while (ok) {
-            size_t nread = fread(chunk.data(), 1, io_buf_size, xin);
+            size_t nread = xin.read(chunk.data(), io_buf_size);
+            if (xin.failed) {
+                px_error_to_buf("cannot read XML input", errbuf, errbuf_size);
+                ok = false; break;
+            }
             if (nread == 0) break;
 
             for (size_t i = 0; i < nread; ++i) {
@@ -909,7 +914,7 @@ cdef extern from *:
             }
         }
 
-        fclose(xin);
+        xin.close();
         fclose(fout);
 
         if (!ok) return -2;
@@ -940,6 +945,7 @@ cdef extern from *:
 
     long long xml_stream_to_json_file(
         const char* xml_path,
+        object      xml_reader,
         const char* json_path,
         const char* attr_prefix,
         const char* cdata_key,
@@ -1057,7 +1063,9 @@ cdef extern from *:
     // -------------------------------------------------------------------
     static long long xml_stream_jsonl_file(
         const char*  xml_path,
+        PyObject*    xml_reader,
         const char*  jsonl_path,
+        PyObject*    jsonl_writer,
         const char*  target_tag_c,
         const char*  attr_prefix_c,
         const char*  cdata_key_c,
@@ -1065,6 +1073,9 @@ cdef extern from *:
         bool         force_all,
         size_t       stack_size,
         size_t       io_buf_size,
+        PyObject*    on_checkpoint,
+        long long    checkpoint_every,
+        PyObject*    resume,
         char*        errbuf,
         size_t       errbuf_size
     ) {
@@ -1091,14 +1102,15 @@ cdef extern from *:
             return false;
         };
 
-        FILE* xin = fopen(xml_path, "rb");
-        if (!xin) {
+        PXSource xin;
+        if (!xin.open(xml_path, xml_reader)) {
             snprintf(errbuf, errbuf_size, "cannot open XML input: %s", xml_path);
             return -1;
         }
-        FILE* fout = fopen(jsonl_path, "wb");
-        if (!fout) {
-            fclose(xin);
+        bool resuming = resume && resume != Py_None;
+        PXSink fout;
+        if (!fout.open(jsonl_path, resuming ? "ab" : "wb", jsonl_writer)) {
+            xin.close();
             snprintf(errbuf, errbuf_size, "cannot open JSONL output: %s", jsonl_path);
             return -1;
         }
@@ -1107,6 +1119,48 @@ cdef extern from *:
         yxml_t x;
         yxml_init(&x, ystack.data(), stack_size);
 
+        // Names of the open elements outside any match, for checkpoints.
+        bool track = on_checkpoint && on_checkpoint != Py_None;
+        std::vector<std::string> open_names;
+
+        if (resuming) {
+            // Re-open the checkpoint's elements through a synthetic prefix,
+            // then continue from its offset with the counters restored.
+            unsigned long long off, col;
+            unsigned int line;
+            const char* prefix;
+            Py_ssize_t prefix_len;
+            PyObject* names;
+            bool good = PyArg_ParseTuple(resume, "KIKy#O!", &off, &line, &col,
+                                         &prefix, &prefix_len, &PyTuple_Type, &names);
+            if (!good) {
+                px_error_to_buf("bad checkpoint", errbuf, errbuf_size);
+            } else {
+                for (Py_ssize_t i = 0; good && i < prefix_len; ++i)
+                    good = yxml_parse(&x, (unsigned char)prefix[i]) >= 0;
+                if (!good)
+                    snprintf(errbuf, errbuf_size,
+                             "bad checkpoint: cannot re-open its elements");
+            }
+            if (good) {
+                x.total = off;
+                x.line = line;
+                x.byte = col;
+                for (Py_ssize_t i = 0; i < PyTuple_GET_SIZE(names); ++i)
+                    open_names.push_back(PyUnicode_AsUTF8(PyTuple_GET_ITEM(names, i)));
+                good = xin.seek(off);
+                if (!good && xin.failed)
+                    px_error_to_buf("cannot seek XML input", errbuf, errbuf_size);
+                else if (!good)
+                    snprintf(errbuf, errbuf_size, "cannot seek XML input: %s", xml_path);
+            }
+            if (!good) {
+                xin.close();
+                fout.close();
+                return -2;
+            }
+        }
+
         std::vector<char> chunk(io_buf_size);
 
         PJStrEditor med;                 // builds ONE matched element at a time
@@ -1255,13 +1309,48 @@ cdef extern from *:
             med.write_at_tail('}');
         };
 
+        // Flush the output so its reported size is on disk, then hand the
+        // position just past the record written last to the callback.
+        auto emit_checkpoint = [&]() -> bool {
+            long long out_size = fflush(fout.fp) == 0 ? px_ftell64(fout.fp) : -1;
+            if (out_size < 0) {
+                snprintf(errbuf, errbuf_size, "cannot write to JSONL output: %s", jsonl_path);
+                return false;
+            }
+            PyObject* names = PyTuple_New((Py_ssize_t)open_names.size());
+            for (size_t k = 0; names && k < open_names.size(); ++k) {
+                PyObject* name = PyUnicode_DecodeUTF8(open_names[k].data(),
+                                                      (Py_ssize_t)open_names[k].size(),
+                                                      "strict");
+                if (!name) { Py_CLEAR(names); break; }
+                PyTuple_SET_ITEM(names, (Py_ssize_t)k, name);
+            }
+            PyObject* r = names ? PyObject_CallFunction(
+                on_checkpoint, "KIKNLL",
+                (unsigned long long)x.total, (unsigned int)x.line,
+                (unsigned long long)x.byte, names,
+                matches_written, out_size) : nullptr;
+            if (!r) {
+                px_error_to_buf("checkpoint failed", errbuf, errbuf_size);
+                return false;
+            }
+            Py_DECREF(r);
+            return true;
+        };
+
         bool ok = true;
 
         while (ok) {
-            size_t nread = fread(chunk.data(), 1, io_buf_size, xin);
+            size_t nread = xin.read(chunk.data(), io_buf_size);
+            if (xin.failed) {
+                px_error_to_buf("cannot read XML input", errbuf, errbuf_size);
+                ok = false; break;
+            }
             if (nread == 0) break;
 
-            for (size_t i = 0; i < nread; ++i) {
+            // A failed write or checkpoint sets ok from inside the switch,
+            // where `break` only leaves the switch: stop on the next byte.
+            for (size_t i = 0; ok && i < nread; ++i) {
                 int ret = yxml_parse(&x, (unsigned char)chunk[i]);
                 if (ret < 0) {
                     snprintf(errbuf, errbuf_size,
@@ -1279,7 +1368,10 @@ cdef extern from *:
                     std::string tag(x.elem, nlen);
 
                     if (levels.empty()) {
-                        if (tag != target_tag) break;   // not inside a match
+                        if (tag != target_tag) {        // not inside a match
+                            if (track) open_names.push_back(tag);
+                            break;
+                        }
                         med.reset();                     // start a fresh capture
                     } else {
                         open_child(levels.back(), tag);
@@ -1320,7 +1412,10 @@ cdef extern from *:
                     break;
 
                 case YXML_ELEMEND: {
-                    if (levels.empty()) break;   // stray close outside any match
+                    if (levels.empty()) {        // close outside any match
+                        if (track) open_names.pop_back();
+                        break;
+                    }
 
                     PJLevel finished = levels.back();
                     levels.pop_back();
@@ -1330,14 +1425,22 @@ cdef extern from *:
                         // flush this one record straight to disk.
                         close_level(finished);
                         size_t n = med.buf.size();
-                        if (fwrite(med.buf.data(), 1, n, fout) != n ||
-                            fputc('\n', fout) == EOF) {
-                            snprintf(errbuf, errbuf_size,
-                                     "cannot write to JSONL output: %s", jsonl_path);
+                        if (!fout.write(med.buf.data(), n) || !fout.put('\n')) {
+                            if (fout.failed)
+                                px_error_to_buf("cannot write to JSONL output",
+                                                errbuf, errbuf_size);
+                            else
+                                snprintf(errbuf, errbuf_size,
+                                         "cannot write to JSONL output: %s", jsonl_path);
                             ok = false;
                             break;
                         }
                         matches_written++;
+                        if (track && matches_written % checkpoint_every == 0
+                                && !emit_checkpoint()) {
+                            ok = false;
+                            break;
+                        }
                     } else {
                         PJLevel& parent = levels.back();
                         close_level(finished);
@@ -1364,8 +1467,15 @@ cdef extern from *:
             }
         }
 
-        fclose(xin);
-        fclose(fout);
+        xin.close();
+        if (!fout.close() && ok) {
+            if (PyErr_Occurred())
+                px_error_to_buf("cannot write to JSONL output", errbuf, errbuf_size);
+            else
+                snprintf(errbuf, errbuf_size,
+                         "cannot write to JSONL output: %s", jsonl_path);
+            ok = false;
+        }
 
         if (!ok) return -2;
         return matches_written;
@@ -1373,7 +1483,9 @@ cdef extern from *:
     """
     long long xml_stream_jsonl_file(
         const char* xml_path,
+        object      xml_reader,
         const char* jsonl_path,
+        object      jsonl_writer,
         const char* target_tag,
         const char* attr_prefix,
         const char* cdata_key,
@@ -1381,6 +1493,9 @@ cdef extern from *:
         bint        force_all,
         size_t      stack_size,
         size_t      io_buf_size,
+        object      on_checkpoint,
+        long long   checkpoint_every,
+        object      resume,
         char*       errbuf,
         size_t      errbuf_size
     ) except +
@@ -1435,7 +1550,7 @@ def jsonify_dumps_str(str xml,
         PygiXMLError: If the XML is malformed.
     """
     cdef XMLDocument doc = XMLDocument()
-    if not doc.load_string(xml):
+    if not doc._load_string(xml, 0xFFFFFFFF, "jsonify.dumps_str"):
         raise PygiXMLError("Failed to parse XML string")
     cdef xml_node root_raw = doc._doc.first_child()
     if _node_is_null(root_raw):
@@ -1462,7 +1577,7 @@ def jsonify_dumps_file(str path,
         PygiXMLError: If the file cannot be read or XML is malformed.
     """
     cdef XMLDocument doc = XMLDocument()
-    if not doc.load_file(path):
+    if not doc._load_file(path, 0xFFFFFFFF, "jsonify.dumps_file"):
         raise PygiXMLError(f"Failed to parse XML file: {path}")
     cdef xml_node root_raw = doc._doc.first_child()
     if _node_is_null(root_raw):
@@ -1644,9 +1759,12 @@ def jsonify_stream_dump(
     Parameters
     ----------
     xml_path : str
-        Path to the input XML file.
+        Path to the input XML file.  gzip, zlib and xz compressed input
+        is detected from its magic bytes and decompressed on the fly.
     json_path : str
         Path to the output JSON file. **Overwritten if it exists.**
+        Must be a plain (uncompressed) file: the in-place patching
+        described above needs random access to the output.
     attr_prefix : str
         Prefix for XML attribute names in JSON keys. Default ``"@"``.
     cdata_key : str
@@ -1699,6 +1817,11 @@ def jsonify_stream_dump(
 
     if indent < 0:
         raise ValueError(f"indent must be >= 0, got {indent}")
+    if _compression_for_path(json_path) is not None:
+        raise PygiXMLError(
+            f"jsonify_stream_dump cannot write compressed output ({json_path!r}): "
+            "the seek-and-patch writer needs a plain, seekable file; use "
+            "stream_jsonl() or compress the result afterwards")
 
     cdef bint force_all = False
     cdef object force_set = None
@@ -1710,19 +1833,26 @@ def jsonify_stream_dump(
     cdef char errbuf[512]
     errbuf[0] = 0
 
-    cdef long long result = xml_stream_to_json_file(
-        <const char*>xml_b,
-        <const char*>json_b,
-        <const char*>ap_b,
-        <const char*>ck_b,
-        force_set,
-        force_all,
-        <int>indent,
-        stack_size,
-        io_buf_size,
-        errbuf,
-        sizeof(errbuf),
-    )
+    cdef long long result
+    xml_reader = _open_compressed_reader(xml_path)
+    try:
+        result = xml_stream_to_json_file(
+            <const char*>xml_b,
+            xml_reader,
+            <const char*>json_b,
+            <const char*>ap_b,
+            <const char*>ck_b,
+            force_set,
+            force_all,
+            <int>indent,
+            stack_size,
+            io_buf_size,
+            errbuf,
+            sizeof(errbuf),
+        )
+    finally:
+        if xml_reader is not None:
+            xml_reader.close()
 
     if result < 0:
         msg = errbuf.decode("utf-8", "replace") if errbuf[0] else "unknown error"
@@ -1796,7 +1926,8 @@ def jsonify_iterjsonl(source, str tag, str attr_prefix="@", str cdata_key="#text
 def jsonify_stream_jsonl(str xml_path, str jsonl_path, str tag,
              str attr_prefix="@", str cdata_key="#text",
              object force_list=None, size_t stack_size=4096,
-             size_t io_buf_size=65536):
+             size_t io_buf_size=65536, object checkpoint=None,
+             long long checkpoint_every=1000, object resume_from=None):
     """Stream-convert an XML **file** straight to a ``.jsonl`` **file**,
     one matched element per line -- entirely in C++.
 
@@ -1819,9 +1950,12 @@ def jsonify_stream_jsonl(str xml_path, str jsonl_path, str tag,
     Parameters
     ----------
     xml_path : str
-        Path to the source XML file.
+        Path to the source XML file.  gzip, zlib and xz compressed input
+        is detected from its magic bytes and decompressed on the fly.
     jsonl_path : str
-        Path to the ``.jsonl`` file to write (overwritten if it exists).
+        Path to the ``.jsonl`` file to write (overwritten if it exists,
+        unless resuming). A path ending in ``.gz``, ``.xz`` or
+        ``.zz``/``.zlib`` is written compressed.
     tag : str
         Tag name of the elements to convert and write, one per line.
     attr_prefix, cdata_key, force_list :
@@ -1830,11 +1964,27 @@ def jsonify_stream_jsonl(str xml_path, str jsonl_path, str tag,
         ``stack_size`` is yxml's internal element/attribute name stack
         (same meaning as :func:`iterparse`'s ``stack_size``);
         ``io_buf_size`` is the read chunk size from the XML file.
+    checkpoint : callable, optional
+        Called with a checkpoint state after every *checkpoint_every*
+        records, once those records are flushed to *jsonl_path*. The
+        state is the :meth:`PullParser.checkpoint` ``dict`` plus
+        ``records`` (the total written so far) and ``output_size`` (the
+        size of *jsonl_path* at that point); persist it, e.g. with
+        :func:`json.dump`, to restart an interrupted conversion. An
+        exception it raises stops the conversion and is re-raised as is.
+    resume_from : dict, optional
+        A state passed to *checkpoint* by an earlier call with the same
+        *xml_path* and *jsonl_path*. *jsonl_path* is cut back to the
+        checkpoint's ``output_size`` -- dropping any records written
+        after it -- and appended to, and reading continues from the
+        checkpoint's position in the XML.
+
+    Checkpoints and resuming need an uncompressed *jsonl_path*.
 
     Returns
     -------
     int
-        The number of matched elements written.
+        The number of matched elements written by this call.
 
     Notes
     -----
@@ -1853,6 +2003,20 @@ def jsonify_stream_jsonl(str xml_path, str jsonl_path, str tag,
         from pygixml import jsonify
         n = jsonify.stream_jsonl("big.xml", "big.jsonl", "record")
         print(f"wrote {n} records")
+
+        # compressed in, compressed out
+        jsonify.stream_jsonl("big.xml.gz", "big.jsonl.gz", "record")
+
+        # restartable: save a checkpoint every 10000 records ...
+        def save(state):
+            with open("big.ckpt", "w") as f:
+                json.dump(state, f)
+        jsonify.stream_jsonl("big.xml", "big.jsonl", "record",
+                             checkpoint=save, checkpoint_every=10000)
+        # ... and after a crash, pick up where the last one left off
+        with open("big.ckpt") as f:
+            jsonify.stream_jsonl("big.xml", "big.jsonl", "record",
+                                 resume_from=json.load(f))
     """
     cdef bytes xml_b   = xml_path.encode("utf-8")
     cdef bytes jsonl_b = jsonl_path.encode("utf-8")
@@ -1867,24 +2031,79 @@ def jsonify_stream_jsonl(str xml_path, str jsonl_path, str tag,
     elif force_list:
         force_set = set(force_list)
 
+    cdef object on_checkpoint = None
+    cdef object resume = None
+    cdef long long base = 0
+    if checkpoint is not None or resume_from is not None:
+        if _compression_for_path(jsonl_path) is not None:
+            raise ValueError("checkpoints need an uncompressed JSONL output")
+    if checkpoint is not None:
+        if not callable(checkpoint):
+            raise TypeError("checkpoint must be callable")
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be at least 1")
+    if resume_from is not None:
+        try:
+            if resume_from["version"] != 1:
+                raise ValueError(
+                    f"unsupported checkpoint version {resume_from['version']!r}")
+            names = tuple(name for name, _attrib in resume_from["stack"])
+            resume = (resume_from["offset"], resume_from["line"],
+                      resume_from["column"], _resume_prefix(list(resume_from["stack"])),
+                      names)
+            base = resume_from["records"]
+            output_size = resume_from["output_size"]
+        except (KeyError, TypeError):
+            raise ValueError("resume_from is not a stream_jsonl checkpoint") from None
+        if os.path.getsize(jsonl_path) < output_size:
+            raise ValueError(f"{jsonl_path} is shorter than at the checkpoint")
+        os.truncate(jsonl_path, output_size)
+    callback_error = []
+    if checkpoint is not None:
+        def on_checkpoint(offset, line, column, names, records, output_size):
+            try:
+                checkpoint({"version": 1, "offset": offset, "line": line,
+                            "column": column, "stack": [[name, {}] for name in names],
+                            "skip": 0, "records": base + records, "output_size": output_size})
+            except BaseException as exc:
+                callback_error.append(exc)   # re-raised as is once parsing stops
+                raise
+
     cdef char errbuf[512]
     errbuf[0] = 0
 
-    cdef long long result = xml_stream_jsonl_file(
-        <const char*>xml_b,
-        <const char*>jsonl_b,
-        <const char*>tag_b,
-        <const char*>ap_b,
-        <const char*>ck_b,
-        force_set,
-        force_all,
-        stack_size,
-        io_buf_size,
-        errbuf,
-        sizeof(errbuf),
-    )
+    cdef long long result
+    xml_reader = _open_compressed_reader(xml_path)
+    jsonl_writer = None
+    try:
+        jsonl_writer = _open_compressed_writer(jsonl_path)
+        result = xml_stream_jsonl_file(
+            <const char*>xml_b,
+            xml_reader,
+            <const char*>jsonl_b,
+            jsonl_writer,
+            <const char*>tag_b,
+            <const char*>ap_b,
+            <const char*>ck_b,
+            force_set,
+            force_all,
+            stack_size,
+            io_buf_size,
+            on_checkpoint,
+            checkpoint_every,
+            resume,
+            errbuf,
+            sizeof(errbuf),
+        )
+    finally:
+        if xml_reader is not None:
+            xml_reader.close()
+        if jsonl_writer is not None:
+            jsonl_writer.close()
 
     if result < 0:
+        if callback_error:
+            raise callback_error[0]
         msg = errbuf.decode("utf-8", "replace") if errbuf[0] else "unknown error"
         raise PygiXMLError(f"jsonify_stream_jsonl failed: {msg}")
 
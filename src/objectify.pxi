@@ -719,11 +719,13 @@ cdef class ObjectifiedElement:
             cb = (<str>candidate).encode("utf-8")
             attr_c = self._node.attribute(cb)
             if not _attr_is_null(attr_c):
+                _touch_attrs(self._node)
                 attr_c.set_value(val_b)
                 return
 
         cb = name.encode("utf-8")
         cdef xml_node new_elem = self._node.append_child(cb)
+        _touch(new_elem)
         new_elem.append_child(node_pcdata).set_value(val_b)
 
     def __delattr__(self, str name):
@@ -740,6 +742,7 @@ cdef class ObjectifiedElement:
                 break
 
         if found_tag is not None:
+            _touch(probe)
             self._node.remove_child(probe)
             return
 
@@ -747,6 +750,7 @@ cdef class ObjectifiedElement:
             cb = (<str>candidate).encode("utf-8")
             attr_c = self._node.attribute(cb)
             if not _attr_is_null(attr_c):
+                _touch_attrs(self._node)
                 self._node.remove_attribute(attr_c)
                 return
 
@@ -834,7 +838,9 @@ cdef class ObjectifiedElement:
     def findall(self, str tag, bint recursive=True):
         """Return all descendants matching *tag* in document order.
 
-        Accepts the same tag formats as :meth:`find`.
+        Accepts the same tag formats as :meth:`find`.  A recursive search
+        in a document with a tag index (:meth:`XMLDocument.build_index`)
+        is answered from the index instead of walking the subtree.
 
         Args:
             tag (str): Tag to search for.
@@ -846,6 +852,14 @@ cdef class ObjectifiedElement:
         cdef list resolved  = _resolve_tag(tag, self._nsmap)
         cdef list tag_bytes = [(<str>c).encode("utf-8") for c in resolved]
         cdef list result    = []
+        cdef vector[xml_node] found
+        cdef size_t i
+        if recursive and _indexed_descendants(self._node, tag_bytes, found):
+            for i in range(found.size()):
+                result.append(ObjectifiedElement._from_raw(
+                    found[i], self._doc_ref,
+                    _inherit_nsmap(self._nsmap, found[i])))
+            return result
         _find_all(self._node, tag_bytes, recursive, result,
                   self._doc_ref, self._nsmap)
         return result
@@ -1188,6 +1202,13 @@ cdef class NamespacedElement(ObjectifiedElement):
         cdef list tag_bytes = [(<str>c).encode("utf-8")
                                for c in _ns_candidate_names(tag, self._ns_map)]
         cdef list result = []
+        cdef vector[xml_node] found
+        cdef size_t i
+        if recursive and _indexed_descendants(self._node, tag_bytes, found):
+            for i in range(found.size()):
+                result.append(NamespacedElement._from_raw_ns(
+                    found[i], self._doc_ref, self._ns_map))
+            return result
         _ns_find_all(self._node, tag_bytes, recursive, result,
                      self._doc_ref, self._ns_map)
         return result
@@ -1343,9 +1364,13 @@ def objectify_from_string(str xml,
     cdef XMLDocument   doc   = XMLDocument()
     cdef bytes         xml_b = xml.encode("utf-8")
     cdef xml_encoding  enc   = _str_to_encoding(encoding)
-    if not pygixml_load_buffer(doc._doc,
-                                <const void*>(<char*>xml_b),
-                                len(xml_b), parse_full, enc):
+    cdef double        t0    = _stats_start()
+    cdef bint ok = pygixml_load_buffer(doc._doc,
+                                       <const void*>(<char*>xml_b),
+                                       len(xml_b), parse_full, enc)
+    if _stats_on:
+        _stats_parse("objectify.from_string", len(xml_b), t0, ok)
+    if not ok:
         raise PygiXMLError("Failed to parse XML string")
     cdef xml_node root_raw = doc._doc.first_child()
     if _node_is_null(root_raw):
@@ -1392,9 +1417,14 @@ def objectify_from_file(str path,
     cdef XMLDocument  doc   = XMLDocument()
     cdef bytes        path_b = path.encode("utf-8")
     cdef xml_encoding enc    = _str_to_encoding(encoding)
-    if not pygixml_load_file(doc._doc,
-                              <const char*>path_b,
-                              parse_full, enc):
+    cdef double       t0     = _stats_start()
+    cdef int rc = _load_compressed(doc._doc, path, parse_full, <int>enc, False)
+    cdef bint ok = rc == 1 or (rc == 2 and pygixml_load_file(doc._doc,
+                                                             <const char*>path_b,
+                                                             parse_full, enc))
+    if _stats_on:
+        _stats_parse("objectify.from_file", _stats_file_size(path), t0, ok)
+    if not ok:
         raise PygiXMLError(f"Failed to parse XML file: {path}")
     cdef xml_node root_raw = doc._doc.first_child()
     if _node_is_null(root_raw):
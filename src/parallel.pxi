@@ -0,0 +1,496 @@
+# parallel.pxi
+# ------------
+# pygixml.parallel_iterfind: iterfind over one big file on several cores.
+# Include AFTER stream.pxi (records are parsed with PullParser) and
+# compress.pxi (compressed input is detected with _sniff_compression).
+#
+# The file is memory-mapped and cut into byte ranges.  Each cut is moved
+# forward to the next "<tag" that *looks* like a record start, assuming it
+# sits in plain content.  That guess is wrong when the cut falls inside a
+# comment, CDATA section, PI or an enclosing record of the same name, so
+# every range is then lexed exactly from its (guessed) start on native
+# threads: the lexer knows where the first top-level record at or after
+# the range's end really begins.  Walking the ranges in order, a range
+# whose guessed start disagrees with its predecessor's answer is re-lexed
+# from the right place before anything is parsed.  Only the verified
+# ranges go to the worker pool, where each one feeds its records (and
+# nothing in between) to a PullParser.
+
+import mmap
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+
+
+cdef extern from *:
+    """
+    #include <atomic>
+    #include <cstring>
+    #include <string>
+    #include <thread>
+    #include <vector>
+
+    // A lexer that only tracks what decides where records start and end:
+    // markup that may contain a literal "<tag" (comments, CDATA, PIs,
+    // DOCTYPE), quoted attribute values, and the nesting depth of
+    // elements named `tag`.  Everything else is skipped with memchr.
+    struct PXRecordScanner {
+        const char* buf = nullptr;
+        size_t      n = 0;
+        std::string tag;
+
+        size_t find(size_t from, const char* s, size_t len) const {
+            while (from + len <= n) {
+                const char* p = static_cast<const char*>(
+                    memchr(buf + from, s[0], n - from - len + 1));
+                if (!p) return n;
+                size_t at = p - buf;
+                if (memcmp(p, s, len) == 0) return at;
+                from = at + 1;
+            }
+            return n;
+        }
+
+        static bool name_end(char c) {
+            return c == ' ' || c == '\\t' || c == '\\r' || c == '\\n' ||
+                   c == '/' || c == '>';
+        }
+
+        bool is_tag(size_t from, size_t to) const {
+            return to - from == tag.size() &&
+                   memcmp(buf + from, tag.data(), tag.size()) == 0;
+        }
+
+        // Add a record's span, merging it into the previous one when only
+        // character data (no markup) lies between them.
+        void add_span(std::vector<size_t>* spans, size_t start, size_t end) const {
+            if (!spans) return;
+            if (!spans->empty()) {
+                size_t prev = spans->back();
+                if (!memchr(buf + prev, '<', start - prev)) {
+                    spans->back() = end;
+                    return;
+                }
+            }
+            spans->push_back(start);
+            spans->push_back(end);
+        }
+
+        // Lex buf[pos, n) starting in content outside any record.  Add the
+        // byte spans of the top-level records that start before `limit`
+        // to *spans (when given; runs of adjacent records become one
+        // span) and store in *next where the first top-level record at or
+        // after `limit` starts (n if none).  Returns 1 when a record is
+        // still open at end of input.
+        int scan(size_t pos, size_t limit, std::vector<size_t>* spans,
+                 size_t* next) const {
+            size_t depth = 0, start = 0, i = pos;
+            while (i < n) {
+                const char* lt = static_cast<const char*>(memchr(buf + i, '<', n - i));
+                if (!lt) break;
+                size_t p = lt - buf;
+                if (p + 1 >= n) break;
+                char c = buf[p + 1];
+                if (c == '!') {
+                    if (n - p >= 4 && memcmp(buf + p, "<!--", 4) == 0) {
+                        i = find(p + 4, "-->", 3) + 3;
+                    } else if (n - p >= 9 && memcmp(buf + p, "<![CDATA[", 9) == 0) {
+                        i = find(p + 9, "]]>", 3) + 3;
+                    } else {
+                        // <!DOCTYPE ...> with an optional [internal subset]
+                        size_t j = p + 2;
+                        int brackets = 0;
+                        char quote = 0;
+                        for (; j < n; ++j) {
+                            char d = buf[j];
+                            if (quote) { if (d == quote) quote = 0; }
+                            else if (d == '<' && n - j >= 4 &&
+                                     memcmp(buf + j, "<!--", 4) == 0)
+                                j = find(j + 4, "-->", 3) + 2;
+                            else if (d == '"' || d == '\\'') quote = d;
+                            else if (d == '[') ++brackets;
+                            else if (d == ']') --brackets;
+                            else if (d == '>' && brackets <= 0) break;
+                        }
+                        i = j + 1;
+                    }
+                } else if (c == '?') {
+                    i = find(p + 2, "?>", 2) + 2;
+                } else if (c == '/') {
+                    size_t j = p + 2;
+                    while (j < n && !name_end(buf[j])) ++j;
+                    bool match = is_tag(p + 2, j);
+                    const char* gt = static_cast<const char*>(memchr(buf + j, '>', n - j));
+                    i = gt ? (gt - buf) + 1 : n;
+                    if (match && depth > 0 && --depth == 0)
+                        add_span(spans, start, i);
+                } else {
+                    size_t j = p + 1;
+                    while (j < n && !name_end(buf[j])) ++j;
+                    bool match = is_tag(p + 1, j);
+                    // Find the closing '>' of the start tag, skipping over
+                    // quoted attribute values (which may contain '>').
+                    size_t end = n;
+                    while (j < n) {
+                        char d = buf[j];
+                        if (d == '"' || d == '\\'') {
+                            const char* q = static_cast<const char*>(
+                                memchr(buf + j + 1, d, n - j - 1));
+                            if (!q) { j = n; break; }
+                            j = (q - buf) + 1;
+                        } else if (d == '>') {
+                            end = j;
+                            break;
+                        } else {
+                            ++j;
+                        }
+                    }
+                    i = end < n ? end + 1 : n;
+                    if (match) {
+                        bool empty = end < n && buf[end - 1] == '/';
+                        if (depth == 0) {
+                            if (p >= limit) {
+                                *next = p;
+                                return 0;
+                            }
+                            start = p;
+                            if (empty) {
+                                add_span(spans, p, i);
+                            } else {
+                                depth = 1;
+                            }
+                        } else if (!empty) {
+                            ++depth;
+                        }
+                    }
+                }
+            }
+            *next = n;
+            return depth > 0 ? 1 : 0;
+        }
+
+        // Run scan(starts[k], limits[k]) for every k on up to `workers`
+        // native threads, storing next[k] and status[k].
+        void scan_many(const std::vector<size_t>& starts,
+                       const std::vector<size_t>& limits,
+                       std::vector<size_t>& next, std::vector<int>& status,
+                       unsigned workers) const {
+            size_t count = starts.size();
+            next.assign(count, n);
+            status.assign(count, 0);
+            std::atomic<size_t> k(0);
+            auto work = [&]() {
+                size_t i;
+                while ((i = k.fetch_add(1)) < count)
+                    status[i] = scan(starts[i], limits[i], nullptr, &next[i]);
+            };
+            std::vector<std::thread> threads;
+            if (workers > count) workers = static_cast<unsigned>(count);
+            for (unsigned t = 1; t < workers; ++t) {
+                try {
+                    threads.emplace_back(work);
+                } catch (...) {
+                    break;      // run with the threads we have
+                }
+            }
+            work();
+            for (std::thread& t : threads) t.join();
+        }
+    };
+    """
+    cppclass PXRecordScanner:
+        const char* buf
+        size_t n
+        string tag
+        int scan(size_t pos, size_t limit, vector[size_t]* spans,
+                 size_t* next) nogil
+        void scan_many(const vector[size_t]& starts, const vector[size_t]& limits,
+                       vector[size_t]& next, vector[int]& status,
+                       unsigned workers) except + nogil
+
+
+cdef size_t _MIN_RANGE = 1 << 20        # never cut ranges smaller than 1 MiB
+cdef size_t _MAX_RANGE = 64 << 20       # ... or larger than 64 MiB
+cdef size_t _FEED_SIZE = 1 << 16        # bytes handed to PullParser.feed at a time
+
+
+cdef list _record_ranges(object buf, str tag, unsigned workers, size_t range_size):
+    """Cut *buf* (a read-only mmap) into verified ``(start, limit)``
+    ranges of about *range_size* bytes (0: pick from the size and
+    *workers*): each *start* is a top-level ``<tag`` and a range owns
+    the records that start before its *limit*."""
+    cdef Py_buffer view
+    cdef PXRecordScanner scanner
+    cdef vector[size_t] starts, limits, nexts
+    cdef vector[int] status
+    cdef size_t size, count, i, nxt, expected
+    cdef int rc
+    cdef list ranges = []
+
+    PyObject_GetBuffer(buf, &view, PyBUF_SIMPLE)
+    try:
+        scanner.buf = <const char*>view.buf
+        scanner.n = size = <size_t>view.len
+        scanner.tag = tag.encode("utf-8")
+
+        if range_size:
+            count = (size + range_size - 1) // range_size
+        else:
+            count = max(<size_t>1, min(<size_t>workers * 4, size // _MIN_RANGE))
+            count = max(count, (size + _MAX_RANGE - 1) // _MAX_RANGE)
+
+        # Guess: the first "<tag" after each cut, read as plain content.
+        for i in range(1, count):
+            starts.push_back(size * i // count)
+        limits = starts
+        with nogil:
+            scanner.scan_many(starts, limits, nexts, status, workers)
+        starts.clear()
+        starts.push_back(0)
+        for i in range(nexts.size()):
+            if nexts[i] < size and nexts[i] > starts.back():
+                starts.push_back(nexts[i])
+
+        # Lex every guessed range exactly from its start.
+        limits.clear()
+        for i in range(1, starts.size()):
+            limits.push_back(starts[i])
+        limits.push_back(size)
+        with nogil:
+            scanner.scan_many(starts, limits, nexts, status, workers)
+
+        # A guess is right when it is where its predecessor, lexed from a
+        # verified start, found the next top-level record.
+        expected = 0
+        for i in range(starts.size()):
+            if limits[i] <= expected:
+                continue
+            if starts[i] == expected:
+                nxt, rc = nexts[i], status[i]
+            else:
+                with nogil:
+                    rc = scanner.scan(expected, limits[i], NULL, &nxt)
+            if rc:
+                raise PygiXMLError(
+                    f"unexpected end of input: unclosed <{tag}> element")
+            if expected < size:
+                ranges.append((expected, limits[i]))
+            expected = nxt
+    finally:
+        PyBuffer_Release(&view)
+    return ranges
+
+
+def _iter_record_range(buf, str tag, size_t start, size_t limit,
+                       size_t stack_size):
+    """Yield the ``tag`` elements of the top-level records starting in
+    ``buf[start:limit]``, feeding only the records themselves (wrapped
+    in a synthetic root) to a PullParser."""
+    cdef Py_buffer view
+    cdef PXRecordScanner scanner
+    cdef vector[size_t] spans
+    cdef size_t nxt, i, pos, end
+
+    PyObject_GetBuffer(buf, &view, PyBUF_SIMPLE)
+    try:
+        scanner.buf = <const char*>view.buf
+        scanner.n = <size_t>view.len
+        scanner.tag = tag.encode("utf-8")
+        with nogil:
+            scanner.scan(start, limit, &spans, &nxt)
+    finally:
+        PyBuffer_Release(&view)
+
+    cdef bytes root = b"pygixml-range" if tag != "pygixml-range" else b"pygixml-range-"
+    cdef PullParser parser = PullParser(events=("end",), tag=tag,
+                                        stack_size=stack_size, retain="matched")
+    cdef size_t fed = len(root) + 2     # bytes of the synthetic stream so far
+    cdef vector[size_t] starts          # where each span begins in that stream
+    data = memoryview(buf)
+    try:
+        parser.feed(b"<" + root + b">")
+        for i in range(0, spans.size(), 2):
+            pos, end = spans[i], spans[i + 1]
+            starts.push_back(fed)
+            fed += end - pos
+            while pos < end:
+                parser.feed(data[pos:min(pos + _FEED_SIZE, end)])
+                pos += _FEED_SIZE
+                for _event, elem in parser.read_events():
+                    yield elem
+        parser.feed(b"</" + root + b">")
+        parser.close()
+        for _event, elem in parser.read_events():
+            yield elem
+    except PygiXMLError as exc:
+        raise _range_error(exc, parser._x.total, starts, spans, limit) from None
+    finally:
+        data.release()
+
+
+cdef object _range_error(exc, uint64_t total, vector[size_t]& starts,
+                         vector[size_t]& spans, size_t limit):
+    """Restate a parse error of the synthetic range stream, whose line
+    and byte mean nothing in the file, at the file offset it came from:
+    the failing byte of a record, or -- for an element left open at the
+    end of the range -- the end of its last record."""
+    msg = str(exc).rpartition(" (line ")[0] or str(exc)
+    cdef uint64_t at = total - 1 if total else 0
+    cdef size_t offset = spans[spans.size() - 1] if spans.size() else limit
+    cdef Py_ssize_t k
+    for k in range(<Py_ssize_t>starts.size() - 1, -1, -1):
+        if at >= starts[k]:
+            offset = min(spans[2 * k] + (at - starts[k]), spans[2 * k + 1])
+            break
+    return PygiXMLError(f"{msg} (file offset {offset})")
+
+
+cdef tuple _pack_element(StreamElement elem):
+    return (elem.tag, elem.attrib, elem.text, elem.tail,
+            [_pack_element(<StreamElement>c) for c in elem._children])
+
+
+cdef StreamElement _unpack_element(tuple packed):
+    cdef StreamElement elem = StreamElement(packed[0], packed[1])
+    elem.text = packed[2]
+    elem.tail = packed[3]
+    elem._children = [_unpack_element(<tuple>c) for c in <list>packed[4]]
+    return elem
+
+
+def _parse_record_range(path, str tag, size_t start, size_t limit,
+                        reducer, size_t stack_size, bint pack):
+    """Worker task: parse one verified range of *path* and return its
+    elements as a list -- as plain tuples when *pack* is set, which
+    pickle far faster than StreamElement objects -- or whatever
+    *reducer* makes of them."""
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    elements = _iter_record_range(buf, tag, start, limit, stack_size)
+    try:
+        if reducer is not None:
+            return reducer(elements)
+        if pack:
+            return [_pack_element(<StreamElement>e) for e in elements]
+        return list(elements)
+    finally:
+        elements.close()
+        buf.close()
+
+
+def parallel_iterfind(path, str tag, workers=None, bint ordered=True,
+                      reducer=None, str backend="process", range_size=None,
+                      size_t stack_size=4096):
+    """:func:`iterfind` over one large uncompressed file on several cores.
+
+    The file is memory-mapped and cut into byte ranges, each moved to a
+    top-level ``<tag`` boundary. Cuts that land inside a comment, CDATA
+    section, processing instruction or an enclosing ``<tag>`` element
+    are detected (by lexing every range exactly on native threads) and
+    corrected before any parsing starts. The ranges are then parsed on a
+    pool of *workers*, each feeding only its records to a
+    :class:`PullParser`, so every record is checked for well-formedness
+    but markup between records is only lexed, not validated.
+
+    :param path: path of an uncompressed XML file. Compressed files
+        cannot be split and are streamed by a single :func:`iterfind`.
+    :param tag: tag name of the records. A record nested in another
+        record is yielded before it, as with :func:`iterfind`.
+    :param workers: pool size (default: one per CPU).
+    :param ordered: if true (default) results come out in file order,
+        otherwise in the order ranges finish.
+    :param reducer: optional ``reducer(elements)`` called in the worker
+        with an iterator over one range's elements; its return values
+        are yielded instead of the elements. With the process backend it
+        must be picklable (a module-level function), and so must its
+        result.
+    :param backend: ``"process"`` (default) for a process pool, or
+        ``"thread"``; tokenizing releases the GIL but building elements
+        does not, so threads help most with a reducer that releases it.
+        Without a reducer every element is sent back to the calling
+        process, which then does the unpacking alone -- reduce in the
+        workers when throughput matters.
+    :param range_size: approximate bytes per range (default: four
+        ranges per worker, between 1 and 64 MiB each).
+    :param stack_size: see :class:`PullParser`.
+    :returns: a generator of :class:`StreamElement`, or of reducer
+        results.
+    :raises PygiXMLError: on a malformed record or one that is never
+        closed.
+
+    Example::
+
+        def total(records):
+            return sum(float(r.findtext("amount")) for r in records)
+
+        grand_total = sum(pygixml.parallel_iterfind(
+            "orders.xml", "order", workers=16, ordered=False, reducer=total))
+    """
+    if not isinstance(path, (str, os.PathLike)):
+        raise TypeError(f"path must be str or os.PathLike, not {type(path).__name__}")
+    if not tag:
+        raise ValueError("tag must be a non-empty string")
+    if backend not in ("process", "thread"):
+        raise ValueError(f"backend must be 'process' or 'thread', not {backend!r}")
+    cdef unsigned n_workers
+    if workers is None:
+        n_workers = max(pygixml_hardware_threads(), 1)
+    elif workers < 1:
+        raise ValueError("workers must be >= 1")
+    else:
+        n_workers = workers
+    if range_size is not None and range_size < 1:
+        raise ValueError("range_size must be >= 1")
+    path = os.fspath(path)
+
+    with open(path, "rb") as f:
+        head = f.read(_SNIFF_SIZE)
+        size = os.fstat(f.fileno()).st_size
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) \
+            if size and _sniff_compression(head, path) is None else None
+    if buf is None:
+        records = iterfind(path, tag, stack_size=stack_size)
+        if reducer is None:
+            yield from records
+        else:
+            yield reducer(records)
+        return
+    try:
+        ranges = _record_ranges(buf, tag, n_workers, range_size or 0)
+    finally:
+        buf.close()
+
+    cdef bint pack = backend == "process"
+    pool = (ProcessPoolExecutor if pack else ThreadPoolExecutor)(max_workers=n_workers)
+    pending = deque() if ordered else set()
+    cdef Py_ssize_t submitted = 0
+    cdef Py_ssize_t window = 2 * n_workers     # ranges in flight
+    try:
+        while True:
+            while submitted < len(ranges) and len(pending) < window:
+                start, limit = ranges[submitted]
+                fut = pool.submit(_parse_record_range, path, tag, start, limit,
+                                  reducer, stack_size, pack)
+                if ordered:
+                    pending.append(fut)
+                else:
+                    pending.add(fut)
+                submitted += 1
+            if not pending:
+                break
+            if ordered:
+                fut = pending.popleft()
+            else:
+                fut = next(iter(wait(pending, return_when=FIRST_COMPLETED)[0]))
+                pending.discard(fut)
+            result = fut.result()
+            if reducer is not None:
+                yield result
+            elif pack:
+                for packed in result:
+                    yield _unpack_element(<tuple>packed)
+            else:
+                yield from result
+    finally:
+        for fut in pending:
+            fut.cancel()
+        pool.shutdown(wait=True)
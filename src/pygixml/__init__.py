@@ -12,15 +12,32 @@ from .pygixml_cy import (
     XPathQuery,
     XPathNode,
     XPathNodeSet,
+    QuerySet,
+    AttrIndex,
+    XPathCacheInfo,
+    xpath_cache_info,
+    xpath_cache_clear,
+    set_xpath_cache_size,
+    enable_stats,
+    stats,
+    reset_stats,
+    set_stats_hook,
     PygiXMLError,
     PygiXMLNullNodeError,
     ParseFlags,
+    FormatFlags,
     parse_string,
     parse_file,
     StreamElement,
     PullParser,
     iterparse,
+    aiterparse,
     iterfind,
+    parallel_iterfind,
+    build_record_index,
+    RecordFile,
+    stream_select,
+    XMLWriter,
 )
 
 from . import objectify
@@ -34,15 +51,32 @@ __all__ = [
     "XPathQuery",
     "XPathNode",
     "XPathNodeSet",
+    "QuerySet",
+    "AttrIndex",
+    "XPathCacheInfo",
+    "xpath_cache_info",
+    "xpath_cache_clear",
+    "set_xpath_cache_size",
+    "enable_stats",
+    "stats",
+    "reset_stats",
+    "set_stats_hook",
     "PygiXMLError",
     "PygiXMLNullNodeError",
     "ParseFlags",
+    "FormatFlags",
     "parse_string",
     "parse_file",
     "StreamElement",
     "PullParser",
     "iterparse",
+    "aiterparse",
     "iterfind",
+    "parallel_iterfind",
+    "build_record_index",
+    "RecordFile",
+    "stream_select",
+    "XMLWriter",
     "objectify",
     "dictify",
     "jsonify",
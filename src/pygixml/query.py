@@ -226,7 +226,11 @@ def _execute_dotted_tracked(root, steps: list) -> list:
 # ---------------------------------------------------------------------------
 
 def _execute_xpath(doc, query: str) -> list:
-    """Execute an XPath query and return a list of results."""
+    """Execute an XPath query and return a list of results.
+
+    ``select_nodes`` reuses compiled expressions from pygixml's XPath
+    cache, so repeated queries (e.g. in a batch) are parsed only once.
+    """
     root = doc.root
     nodes = root.select_nodes(query)
     results = []
@@ -8,6 +8,8 @@ Python wrapper for pugixml using Cython
 from libcpp.string cimport string
 from libcpp.vector cimport vector
 from libcpp cimport bool
+from cpython cimport array
+import array
 
 # Import pugixml headers
 cdef extern from "pugixml.hpp" namespace "pugi":
@@ -31,6 +33,19 @@ cdef extern from "pugixml.hpp" namespace "pugi":
     const unsigned int parse_default
     const unsigned int parse_full
 
+    # Format flags
+    const unsigned int format_indent
+    const unsigned int format_write_bom
+    const unsigned int format_raw
+    const unsigned int format_no_declaration
+    const unsigned int format_no_escapes
+    const unsigned int format_save_file_text
+    const unsigned int format_indent_attributes
+    const unsigned int format_no_empty_element_tags
+    const unsigned int format_skip_control_chars
+    const unsigned int format_attribute_single_quote
+    const unsigned int format_default
+
     cdef cppclass xml_parse_result:
         bool operator bool() const
         const char* description() const
@@ -48,6 +63,7 @@ cdef extern from "pugixml.hpp" namespace "pugi":
         xml_parse_result load_string(const char* contents)
         xml_parse_result load_file(const char* path)
         void save_file(const char* path, const char* indent) except +
+        void save_file(const char* path, const char* indent, unsigned int flags) except +
         void reset()
         
     cdef cppclass xml_node:
@@ -61,6 +77,7 @@ cdef extern from "pugixml.hpp" namespace "pugi":
         xml_node next_sibling()
         xml_node previous_sibling()
         xml_node parent()
+        xml_node root() const
         xml_attribute first_attribute()
         xml_attribute last_attribute()
         xml_attribute attribute(const char* name)
@@ -83,6 +100,7 @@ cdef extern from "pugixml.hpp" namespace "pugi":
         
     cdef cppclass xml_attribute:
         xml_attribute() except +
+        bool empty() const
         string name() const
         string value() const
         bool set_name(const char* name)
@@ -113,18 +131,37 @@ cdef extern from "pugixml.hpp" namespace "pugi":
         xpath_node_set() except +
         size_t size() const
         xpath_node operator[](size_t index) const
+        void sort(bool reverse)
         
+    cdef enum xpath_value_type:
+        xpath_type_none
+        xpath_type_node_set
+        xpath_type_number
+        xpath_type_string
+        xpath_type_boolean
+
     cdef cppclass xpath_query:
         xpath_query() except +
         xpath_query(const char* query) except +
-        xpath_node_set evaluate_node_set(const xml_node& n) const
-        xpath_node evaluate_node(const xml_node& n) const
+        xpath_query(const char* query, xpath_variable_set* variables) except +
+        xpath_value_type return_type() const
+        xpath_node_set evaluate_node_set(const xml_node& n) except +
+        xpath_node evaluate_node(const xml_node& n) except +
         bool evaluate_boolean(const xml_node& n) const
         double evaluate_number(const xml_node& n) const
         string evaluate_string(const xml_node& n) const
         
+    cdef cppclass xpath_variable:
+        xpath_value_type type() const
+        bool set_boolean "set"(bool value)
+        bool set_number "set"(double value)
+        bool set_string "set"(const char* value)
+        bool set_node_set "set"(const xpath_node_set& value)
+
     cdef cppclass xpath_variable_set:
         xpath_variable_set() except +
+        xpath_variable* add(const char* name, xpath_value_type type)
+        xpath_variable* get(const char* name)
     
 
     bool operator==(const xml_node&, const xml_node&)
@@ -142,13 +179,14 @@ cdef extern from *:
 
     std::string pugi_serialize_node(
         const pugi::xml_node& node,
-        const char* indent
+        const char* indent,
+        unsigned int flags = pugi::format_default
     ) {
         if (node.type() == pugi::node_null) {
             return std::string();
         }
         std::ostringstream oss;
-        node.print(oss, indent);
+        node.print(oss, indent, flags);
         std::string xml { oss.str() };
         if (!xml.empty() && *xml.rbegin() == '\\n') {
             xml.pop_back(); // Removes the last character
@@ -247,12 +285,450 @@ cdef extern from *:
     }
     """
     string pugi_serialize_node(const xml_node& node, const char* indent)
+    string pugi_serialize_node(const xml_node& node, const char* indent, unsigned int flags)
     size_t get_pugi_node_address(xml_node& node)
     xml_node find_node_by_address(xml_node& root, size_t target_addr)
     string get_xpath_for_node(const xml_node& node)
     xml_node node_from_raw_ptr(size_t addr)
 
 
+cdef extern from *:
+    """
+    #include <atomic>
+    #include <clocale>
+    #include <cmath>
+    #include <cstdlib>
+    #include <cstring>
+    #if defined(__APPLE__)
+    #include <xlocale.h>
+    #endif
+    #include <new>
+    #include <string>
+    #include <thread>
+    #include <vector>
+    #include "pugixml.hpp"
+
+    // The document itself as an xml_node (pugi::xml_document derives from
+    // xml_node, which Cython cannot see through its cppclass declarations).
+    static inline pugi::xml_node pygixml_document_node(pugi::xml_document* doc) {
+        return *doc;
+    }
+
+    // ---------------------------------------------------------------------------
+    // Declarative subtree builder (XMLNode.build)
+    // ---------------------------------------------------------------------------
+    // Strings are read through their cached UTF-8 buffer
+    // (PyUnicode_AsUTF8AndSize), so no intermediate bytes object is created
+    // per name/value. Non-str scalars are converted with str() first.
+    static const char* pygixml_spec_utf8(PyObject* obj, Py_ssize_t* size,
+                                         PyObject** tmp) {
+        *tmp = nullptr;
+        if (PyUnicode_Check(obj))
+            return PyUnicode_AsUTF8AndSize(obj, size);
+        // str(b"x") is "b'x'", never what the caller meant.
+        if (PyBytes_Check(obj) || PyByteArray_Check(obj)) {
+            PyErr_Format(PyExc_TypeError,
+                         "cannot build XML from %.200s; decode it to str first",
+                         Py_TYPE(obj)->tp_name);
+            return nullptr;
+        }
+        *tmp = PyObject_Str(obj);
+        if (!*tmp) return nullptr;
+        return PyUnicode_AsUTF8AndSize(*tmp, size);
+    }
+
+    static int pygixml_spec_text(pugi::xml_node parent, PyObject* value) {
+        PyObject* tmp;
+        Py_ssize_t n;
+        const char* s = pygixml_spec_utf8(value, &n, &tmp);
+        if (!s) return -1;
+        pugi::xml_node text = parent.append_child(pugi::node_pcdata);
+        text.set_value(s, (size_t)n);
+        Py_XDECREF(tmp);
+        return 0;
+    }
+
+    // Tag and attribute names are written verbatim, so an empty name or
+    // one with an embedded NUL would produce a different (or broken)
+    // document than the spec describes.
+    static int pygixml_spec_check_name(const char* s, Py_ssize_t n,
+                                       const char* what) {
+        if (n == 0) {
+            PyErr_Format(PyExc_ValueError, "%s must not be empty", what);
+            return -1;
+        }
+        if (memchr(s, '\\0', (size_t)n)) {
+            PyErr_Format(PyExc_ValueError,
+                         "%s must not contain a NUL character", what);
+            return -1;
+        }
+        return 0;
+    }
+
+    static int pygixml_spec_attrs(pugi::xml_node elem, PyObject* attrs) {
+        PyObject *k, *v;
+        Py_ssize_t pos = 0;
+        while (PyDict_Next(attrs, &pos, &k, &v)) {
+            if (v == Py_None) continue;
+            PyObject *kt, *vt;
+            Py_ssize_t kn, vn;
+            const char* ks = pygixml_spec_utf8(k, &kn, &kt);
+            if (!ks) return -1;
+            if (pygixml_spec_check_name(ks, kn, "attribute name") < 0) {
+                Py_XDECREF(kt);
+                return -1;
+            }
+            const char* vs = pygixml_spec_utf8(v, &vn, &vt);
+            if (!vs) { Py_XDECREF(kt); return -1; }
+            pugi::xml_attribute a = elem.append_attribute(ks);
+            a.set_value(vs, (size_t)vn);
+            Py_XDECREF(kt);
+            Py_XDECREF(vt);
+        }
+        return 0;
+    }
+
+    static int pygixml_build_spec(pugi::xml_node parent, PyObject* spec,
+                                  Py_ssize_t* count);
+
+    // One ("tag", [attrs], [text | children]...) tuple -> one element.
+    static int pygixml_build_element(pugi::xml_node parent, PyObject* spec,
+                                     Py_ssize_t* count) {
+        Py_ssize_t n = PyTuple_GET_SIZE(spec);
+        if (n == 0) {
+            PyErr_SetString(PyExc_ValueError, "element spec must not be empty");
+            return -1;
+        }
+        PyObject* tag = PyTuple_GET_ITEM(spec, 0);
+        if (!PyUnicode_Check(tag)) {
+            PyErr_Format(PyExc_TypeError,
+                         "element tag must be str, got %.200s",
+                         Py_TYPE(tag)->tp_name);
+            return -1;
+        }
+        Py_ssize_t tag_len;
+        const char* tag_s = PyUnicode_AsUTF8AndSize(tag, &tag_len);
+        if (!tag_s) return -1;
+        if (pygixml_spec_check_name(tag_s, tag_len, "element tag") < 0)
+            return -1;
+
+        pugi::xml_node elem = parent.append_child(tag_s);
+        ++*count;
+
+        for (Py_ssize_t i = 1; i < n; ++i) {
+            PyObject* item = PyTuple_GET_ITEM(spec, i);
+            int rc;
+            if (item == Py_None) {
+                rc = 0;
+            } else if (PyDict_Check(item)) {
+                rc = pygixml_spec_attrs(elem, item);
+            } else if (PyTuple_Check(item) || PyList_Check(item)) {
+                rc = pygixml_build_spec(elem, item, count);
+            } else {
+                rc = pygixml_spec_text(elem, item);
+            }
+            if (rc < 0) return -1;
+        }
+        return 0;
+    }
+
+    static int pygixml_build_spec_impl(pugi::xml_node parent, PyObject* spec,
+                                       Py_ssize_t* count) {
+        if (PyTuple_Check(spec))
+            return pygixml_build_element(parent, spec, count);
+        if (PyUnicode_Check(spec))
+            return pygixml_spec_text(parent, spec);
+        if (PyDict_Check(spec)) {
+            PyErr_SetString(PyExc_TypeError,
+                            "a dict is only valid as the attribute mapping "
+                            "inside an element tuple");
+            return -1;
+        }
+        if (PyList_Check(spec)) {
+            Py_ssize_t n = PyList_GET_SIZE(spec);
+            for (Py_ssize_t i = 0; i < n; ++i) {
+                PyObject* item = PyList_GET_ITEM(spec, i);
+                Py_INCREF(item);
+                int rc = pygixml_build_spec(parent, item, count);
+                Py_DECREF(item);
+                if (rc < 0) return -1;
+            }
+            return 0;
+        }
+
+        PyObject* it = PyObject_GetIter(spec);
+        if (!it) {
+            PyErr_Clear();
+            PyErr_Format(PyExc_TypeError,
+                         "cannot build XML from %.200s "
+                         "(expected a tuple, str, list, or iterable of specs)",
+                         Py_TYPE(spec)->tp_name);
+            return -1;
+        }
+        PyObject* item;
+        while ((item = PyIter_Next(it)) != nullptr) {
+            int rc = pygixml_build_spec(parent, item, count);
+            Py_DECREF(item);
+            if (rc < 0) { Py_DECREF(it); return -1; }
+        }
+        Py_DECREF(it);
+        return PyErr_Occurred() ? -1 : 0;
+    }
+
+    // Every nesting level goes through here, so a spec nested deeper than
+    // the interpreter's recursion limit raises RecursionError instead of
+    // overflowing the C stack.
+    static int pygixml_build_spec(pugi::xml_node parent, PyObject* spec,
+                                  Py_ssize_t* count) {
+        if (Py_EnterRecursiveCall(" while building XML from a spec"))
+            return -1;
+        int rc = pygixml_build_spec_impl(parent, spec, count);
+        Py_LeaveRecursiveCall();
+        return rc;
+    }
+
+    static Py_ssize_t pygixml_build(pugi::xml_node parent, PyObject* spec) {
+        Py_ssize_t count = 0;
+        if (pygixml_build_spec(parent, spec, &count) < 0) return -1;
+        return count;
+    }
+
+    // Remove every descendant of `root` matching all given criteria
+    // (nullptr / node_null = "any") in one pre-order pass.  A matching
+    // node is removed with its whole subtree, so the walk skips over it;
+    // the next node is found before removal, so nothing is invalidated.
+    static Py_ssize_t pygixml_remove_all(pugi::xml_node root,
+                                         const char* tag,
+                                         const char* attr,
+                                         const char* value,
+                                         pugi::xml_node_type type) {
+        Py_ssize_t removed = 0;
+        pugi::xml_node node = root.first_child();
+        while (node) {
+            bool match = (type == pugi::node_null || node.type() == type) &&
+                         (!tag || strcmp(node.name(), tag) == 0);
+            if (match && attr) {
+                pugi::xml_attribute a = node.attribute(attr);
+                match = a && (!value || strcmp(a.value(), value) == 0);
+            }
+
+            pugi::xml_node next;
+            if (!match && node.first_child()) {
+                next = node.first_child();
+            } else {
+                for (pugi::xml_node cur = node; cur != root; cur = cur.parent()) {
+                    if (cur.next_sibling()) { next = cur.next_sibling(); break; }
+                }
+            }
+            if (match) {
+                node.parent().remove_child(node);
+                ++removed;
+            }
+            node = next;
+        }
+        return removed;
+    }
+
+    // ---------------------------------------------------------------------------
+
+    // XPath 1.0 string-value of a query result: an attribute's value, the
+    // value of a text / comment / PI node, or the concatenated descendant
+    // text of an element or document.
+    static void pygixml_xpath_string(const pugi::xpath_node& xn, std::string& out) {
+        out.clear();
+        if (xn.attribute()) { out = xn.attribute().value(); return; }
+        pugi::xml_node n = xn.node();
+        switch (n.type()) {
+            case pugi::node_pcdata: case pugi::node_cdata:
+            case pugi::node_comment: case pugi::node_pi:
+                out = n.value();
+                return;
+            case pugi::node_element: case pugi::node_document:
+                break;
+            default:
+                return;
+        }
+        pugi::xml_node cur = n.first_child();
+        while (cur) {
+            if (cur.type() == pugi::node_pcdata || cur.type() == pugi::node_cdata)
+                out += cur.value();
+            if (cur.first_child()) { cur = cur.first_child(); continue; }
+            while (cur != n && !cur.next_sibling()) cur = cur.parent();
+            if (cur == n) break;
+            cur = cur.next_sibling();
+        }
+    }
+
+    // strtod() follows LC_NUMERIC, so under a comma-decimal locale it
+    // would stop at the '.' of "1.5".  Parse with a private "C" locale
+    // instead (created once; C++11 makes the static thread-safe, and the
+    // bulk evaluators call this from worker threads without the GIL).
+    static double pygixml_strtod_c(const char* s) {
+    #if defined(_WIN32)
+        static _locale_t loc = _create_locale(LC_NUMERIC, "C");
+        if (loc) return _strtod_l(s, nullptr, loc);
+    #else
+        static locale_t loc = newlocale(LC_NUMERIC_MASK, "C", (locale_t)0);
+        if (loc) return strtod_l(s, nullptr, loc);
+    #endif
+        return strtod(s, nullptr);
+    }
+
+    // XPath 1.0 number(): optional whitespace, an optional '-', digits with
+    // an optional fraction, optional whitespace.  Anything else is NaN.
+    static double pygixml_xpath_number(const char* s) {
+        auto ws = [](char c) { return c == ' ' || c == '\\t' || c == '\\n' || c == '\\r'; };
+        auto digit = [](char c) { return c >= '0' && c <= '9'; };
+        while (ws(*s)) ++s;
+        const char* start = s;
+        if (*s == '-') ++s;
+        bool digits = false;
+        while (digit(*s)) { ++s; digits = true; }
+        if (*s == '.') {
+            ++s;
+            while (digit(*s)) { ++s; digits = true; }
+        }
+        if (!digits) return NAN;
+        while (ws(*s)) ++s;
+        if (*s) return NAN;
+        return pygixml_strtod_c(start);
+    }
+
+    // Evaluate one compiled query against many context nodes on a small
+    // pool of native threads.  Workers pull indexes from a shared counter
+    // and write into preallocated per-context slots, so results stay in
+    // input order.  Only the output vector for `kind` is filled:
+    // 0 = node sets, 1 = string-values, 2 = numbers, 3 = match counts.
+    // Returns 0 on success, 1 on allocation failure, 2 on any other error.
+    static int pygixml_xpath_evaluate_many(
+            const pugi::xpath_query& query,
+            const std::vector<pugi::xml_node>& contexts,
+            int kind, unsigned workers,
+            std::vector<pugi::xpath_node_set>& sets,
+            std::vector<std::vector<std::string>>& strings,
+            std::vector<std::vector<double>>& numbers,
+            std::vector<size_t>& counts) {
+        size_t n = contexts.size();
+        try {
+            switch (kind) {
+                case 0: sets.resize(n); break;
+                case 1: strings.resize(n); break;
+                case 2: numbers.resize(n); break;
+                default: counts.resize(n); break;
+            }
+        } catch (...) {
+            return 1;
+        }
+
+        std::atomic<size_t> next(0);
+        std::atomic<int> error(0);
+        auto work = [&]() {
+            std::string buf;
+            try {
+                size_t i;
+                while (!error.load(std::memory_order_relaxed) &&
+                       (i = next.fetch_add(1)) < n) {
+                    pugi::xpath_node_set r = query.evaluate_node_set(contexts[i]);
+                    switch (kind) {
+                        case 0:
+                            sets[i] = std::move(r);
+                            break;
+                        case 1:
+                            strings[i].reserve(r.size());
+                            for (const pugi::xpath_node& xn : r) {
+                                pygixml_xpath_string(xn, buf);
+                                strings[i].push_back(buf);
+                            }
+                            break;
+                        case 2:
+                            numbers[i].reserve(r.size());
+                            for (const pugi::xpath_node& xn : r) {
+                                pygixml_xpath_string(xn, buf);
+                                numbers[i].push_back(pygixml_xpath_number(buf.c_str()));
+                            }
+                            break;
+                        default:
+                            counts[i] = r.size();
+                            break;
+                    }
+                }
+            } catch (const std::bad_alloc&) {
+                error = 1;
+            } catch (...) {
+                error = 2;
+            }
+        };
+
+        std::vector<std::thread> threads;
+        if (workers > n) workers = static_cast<unsigned>(n);
+        for (unsigned t = 1; t < workers; ++t) {
+            try {
+                threads.emplace_back(work);
+            } catch (...) {
+                break;      // run with the threads we have
+            }
+        }
+        work();
+        for (std::thread& t : threads) t.join();
+        return error.load();
+    }
+    """
+    xml_node pygixml_document_node(xml_document* doc)
+    void pygixml_xpath_string(const xpath_node& xn, string& out)
+    double pygixml_xpath_number(const char* s)
+    int pygixml_xpath_evaluate_many(const xpath_query& query,
+                                    const vector[xml_node]& contexts,
+                                    int kind, unsigned workers,
+                                    vector[xpath_node_set]& sets,
+                                    vector[vector[string]]& strings,
+                                    vector[vector[double]]& numbers,
+                                    vector[size_t]& counts) nogil
+    unsigned pygixml_hardware_threads "std::thread::hardware_concurrency"()
+    Py_ssize_t pygixml_build(xml_node parent, object spec) except -1
+    Py_ssize_t pygixml_remove_all(xml_node root, const char* tag,
+                                  const char* attr, const char* value,
+                                  xml_node_type type)
+
+
+_NODE_TYPES = {
+    "element": node_element,
+    "pcdata": node_pcdata,
+    "cdata": node_cdata,
+    "comment": node_comment,
+    "pi": node_pi,
+    "declaration": node_declaration,
+    "doctype": node_doctype,
+}
+
+
+cdef Py_ssize_t _remove_all(xml_node root, str tag, str attr, str value,
+                            str node_type) except -1:
+    """Validate the criteria shared by :meth:`XMLNode.remove_all` and
+    :meth:`XMLDocument.prune` and run the native removal pass."""
+    if tag is None and attr is None and node_type is None:
+        raise ValueError("remove_all() needs at least one of tag, attr or node_type")
+    if value is not None and attr is None:
+        raise ValueError("value= requires attr=")
+    cdef xml_node_type t = node_null
+    if node_type is not None:
+        if node_type not in _NODE_TYPES:
+            raise ValueError(
+                f"unknown node_type {node_type!r} "
+                f"(expected one of {', '.join(_NODE_TYPES)})")
+        t = _NODE_TYPES[node_type]
+    elif tag is not None or attr is not None:
+        t = node_element
+    cdef bytes tag_b = tag.encode("utf-8") if tag is not None else None
+    cdef bytes attr_b = attr.encode("utf-8") if attr is not None else None
+    cdef bytes value_b = value.encode("utf-8") if value is not None else None
+    return pygixml_remove_all(
+        root,
+        <const char*>tag_b if tag_b is not None else NULL,
+        <const char*>attr_b if attr_b is not None else NULL,
+        <const char*>value_b if value_b is not None else NULL,
+        t)
+
+
 # Parse flags as an IntFlag enum (supports bitwise OR)
 from enum import IntFlag as _IntFlag
 
@@ -297,6 +773,42 @@ class ParseFlags(_IntFlag):
     FULL                = parse_full
 
 
+class FormatFlags(_IntFlag):
+    """Bitmask of output options for :meth:`XMLDocument.save_file`,
+    ``to_string()``, ``to_bytes()``, ``write()``, ``iter_serialize()``
+    and :class:`XMLWriter`.
+
+    Members are combined with the bitwise OR operator (``|``).  When no
+    flags are supplied pugixml's ``FormatFlags.DEFAULT`` (indented
+    output) is used.
+
+    Use ``FormatFlags.RAW`` for compact machine-to-machine output — no
+    indentation and no line breaks are written, which skips that work
+    entirely.
+
+    Example::
+
+        >>> doc.to_string(flags=pygixml.FormatFlags.RAW)
+        '<root><item>value</item></root>'
+        >>> doc.save_file('out.xml',
+        ...               flags=pygixml.FormatFlags.RAW | pygixml.FormatFlags.NO_DECLARATION)
+
+    See the :ref:`format-flags` section in the documentation for a
+    complete description of each flag.
+    """
+    INDENT                  = format_indent
+    WRITE_BOM               = format_write_bom
+    RAW                     = format_raw
+    NO_DECLARATION          = format_no_declaration
+    NO_ESCAPES              = format_no_escapes
+    SAVE_FILE_TEXT          = format_save_file_text
+    INDENT_ATTRIBUTES       = format_indent_attributes
+    NO_EMPTY_ELEMENT_TAGS   = format_no_empty_element_tags
+    SKIP_CONTROL_CHARS      = format_skip_control_chars
+    ATTRIBUTE_SINGLE_QUOTE  = format_attribute_single_quote
+    DEFAULT                 = format_default
+
+
 # Version injected by CMake at compile time
 cdef extern from *:
     """
@@ -369,6 +881,7 @@ cdef class XMLDocument:
 
     def __dealloc__(self):
         if self._doc != NULL:
+            _drop_indexes(pygixml_document_node(self._doc))
             del self._doc
     
     def load_string(self, str content, options=0xFFFFFFFF):
@@ -402,18 +915,29 @@ cdef class XMLDocument:
                 by :func:`parse_string`; this method returns ``False``
                 instead).
         """
-        cdef unsigned int opts = options if options != 0xFFFFFFFF else 0xFFFFFFFF
+        return self._load_string(content, options, "XMLDocument.load_string")
+
+    cdef bint _load_string(self, str content, unsigned int opts,
+                           str entry) except -1:
+        cdef double t0 = _stats_start()
         cdef bytes content_bytes = content.encode('utf-8')
+        cdef bint ok
+        _touch(pygixml_document_node(self._doc))
         if opts == 0xFFFFFFFF:
-            return <bool>self._doc.load_string(content_bytes)
-        return <bool>self._doc.load_string(content_bytes, opts)
+            ok = <bool>self._doc.load_string(content_bytes)
+        else:
+            ok = <bool>self._doc.load_string(content_bytes, opts)
+        if _stats_on:
+            _stats_parse(entry, len(content_bytes), t0, ok)
+        return ok
 
     def load_file(self, str path, options=0xFFFFFFFF):
         """Parse XML from a file and replace the current document content.
 
         Reads and parses the file at *path*.  Returns ``True`` on success,
         ``False`` if the file cannot be opened or does not contain
-        well-formed XML.
+        well-formed XML.  gzip, zlib and xz compressed files are
+        detected from their magic bytes and decompressed transparently.
 
         Args:
             path (str): Path to the XML file.
@@ -431,13 +955,28 @@ cdef class XMLDocument:
             >>> doc.root.name
             'root'
         """
-        cdef unsigned int opts = options if options != 0xFFFFFFFF else 0xFFFFFFFF
-        cdef bytes path_bytes = path.encode('utf-8')
-        if opts == 0xFFFFFFFF:
-            return <bool>self._doc.load_file(path_bytes)
-        return <bool>self._doc.load_file(path_bytes, opts)
+        return self._load_file(path, options, "XMLDocument.load_file")
+
+    cdef bint _load_file(self, str path, unsigned int opts,
+                         str entry) except -1:
+        cdef double t0 = _stats_start()
+        cdef bint ok
+        _touch(pygixml_document_node(self._doc))
+        cdef int rc = _load_compressed(self._doc, path, opts, 0, opts == 0xFFFFFFFF)
+        cdef bytes path_bytes
+        if rc != 2:
+            ok = rc == 1
+        else:
+            path_bytes = path.encode('utf-8')
+            if opts == 0xFFFFFFFF:
+                ok = <bool>self._doc.load_file(path_bytes)
+            else:
+                ok = <bool>self._doc.load_file(path_bytes, opts)
+        if _stats_on:
+            _stats_parse(entry, _stats_file_size(path), t0, ok)
+        return ok
     
-    def save_file(self, str path, str indent="  "):
+    def save_file(self, str path, str indent="  ", flags=FormatFlags.DEFAULT):
         """Serialize the document and write it to a file.
 
         Args:
@@ -446,16 +985,33 @@ cdef class XMLDocument:
             indent (str): Indentation string used for pretty-printing.
                 Defaults to two spaces.  Pass an empty string for compact
                 output with no indentation.
+            flags (FormatFlags): Output options.  Defaults to
+                ``FormatFlags.DEFAULT``.  ``FormatFlags.RAW`` writes no
+                indentation or line breaks at all;
+                ``FormatFlags.NO_DECLARATION`` omits the
+                ``<?xml ...?>`` header.
+
+        A path ending in ``.gz``, ``.xz`` or ``.zz``/``.zlib`` is written
+        compressed with gzip, xz or zlib respectively.
 
         Example::
 
             >>> doc = pygixml.parse_string('<root><item>value</item></root>')
             >>> doc.save_file('output.xml')              # 2-space indent
             >>> doc.save_file('compact.xml', indent='')  # no indent
+            >>> doc.save_file('raw.xml', flags=pygixml.FormatFlags.RAW)
+            >>> doc.save_file('archive.xml.gz')          # gzip-compressed
         """
         cdef bytes path_bytes = path.encode('utf-8')
         cdef bytes indent_bytes = indent.encode('utf-8')
-        self._doc.save_file(path_bytes, indent_bytes)
+        writer = _open_compressed_writer(path)
+        if writer is not None:
+            try:
+                _save_to_writer(self._doc, writer, indent_bytes, flags)
+            finally:
+                writer.close()
+            return
+        self._doc.save_file(path_bytes, indent_bytes, <unsigned int>flags)
 
     def reset(self):
         """Clear all content, returning the document to its initial empty state.
@@ -469,6 +1025,7 @@ cdef class XMLDocument:
             >>> doc.reset()
             >>> doc.root  # None — document is empty
         """
+        _touch(pygixml_document_node(self._doc))
         self._doc.reset()
     
     def append_child(self, str name):
@@ -490,8 +1047,121 @@ cdef class XMLDocument:
         """
         cdef bytes name_bytes = name.encode('utf-8')
         cdef xml_node node = self._doc.append_child(name_bytes)
+        _touch(node)
         return XMLNode.create_from_cpp(node)
-    
+
+    def build(self, spec):
+        """Append top-level content described by *spec* in one native
+        call.
+
+        Same spec format as :meth:`XMLNode.build`.  A well-formed
+        document has a single root element, so *spec* is usually one
+        element tuple.
+
+        Returns:
+            int: Number of elements created.
+
+        Example::
+
+            >>> doc = pygixml.XMLDocument()
+            >>> doc.build(("catalog", [("item", {"id": "1"}, "a")]))
+            2
+            >>> doc.root.child('item').text()
+            'a'
+        """
+        cdef xml_node doc_node = pygixml_document_node(self._doc)
+        _touch(doc_node)
+        return pygixml_build(doc_node, spec)
+
+    def prune(self, str tag=None, str attr=None, str value=None,
+              str node_type=None):
+        """Remove every node in the document matching the given
+        criteria, with its whole subtree, in one native pass.
+
+        Same criteria as :meth:`XMLNode.remove_all`, applied to the
+        whole document — including top-level comments and processing
+        instructions outside the root element.
+
+        Returns:
+            int: Number of subtrees removed.
+
+        Example::
+
+            >>> doc = pygixml.parse_string(xml, pygixml.ParseFlags.FULL)
+            >>> doc.prune(node_type='comment')
+            12
+            >>> doc.prune(tag='debug')
+            3
+        """
+        cdef xml_node doc_node = pygixml_document_node(self._doc)
+        _touch(doc_node)
+        return _remove_all(doc_node, tag, attr, value, node_type)
+
+    def build_index(self, bint tags=True):
+        """Build an index of the document's elements by tag name.
+
+        .. note::
+           This is a **pygixml-specific feature**.  Once built, tag
+           lookups no longer walk the tree: :meth:`XMLNode.children` with
+           ``recursive=True`` and a *tag*, a plain ``//name`` passed to
+           :meth:`XMLNode.select_nodes` / :meth:`XMLNode.select_node`,
+           and recursive ``findall()`` on objectified elements are
+           answered from the index in time proportional to the number of
+           matches.
+
+        Adding, removing or renaming elements through pygixml marks the
+        index stale; it is rebuilt automatically on its next use.  The
+        index costs memory proportional to the number of elements, so
+        build it for documents that are queried repeatedly.
+
+        Args:
+            tags (bool): Build (or rebuild) the tag index.  ``False``
+                drops an existing index instead.
+
+        Returns:
+            int: Number of elements indexed (``0`` when dropping).
+
+        Example::
+
+            >>> doc = pygixml.parse_string(xml)
+            >>> doc.build_index()
+            120000
+            >>> items = list(doc.root.children(recursive=True, tag='item'))
+        """
+        cdef xml_node doc_node = pygixml_document_node(self._doc)
+        if not tags:
+            _drop_tag_index(doc_node)
+            return 0
+        return _build_tag_index(doc_node)
+
+    def index_by_attr(self, str attr, str tag=None):
+        """Index the document's elements by the value of one attribute.
+
+        .. note::
+           This is a **pygixml-specific feature**.  Resolving
+           ``@id`` / ``@ref`` cross-references with one
+           ``//*[@id='...']`` query per value rescans the whole document
+           each time; the returned :class:`AttrIndex` answers each
+           lookup with a hash-table probe.
+
+        Args:
+            attr (str): Attribute whose values are indexed.
+            tag (str): Only index elements with this tag name.  Defaults
+                to every element.
+
+        Returns:
+            AttrIndex: Supports ``get(value)``, ``get_all(value)``,
+            ``value in index`` and bulk ``lookup(values)``; stays valid
+            across edits made through pygixml.
+
+        Example::
+
+            >>> ids = doc.index_by_attr('id')
+            >>> for ref in doc.root.children(True, tag='ref'):
+            ...     target = ids.get(ref.attribute('to').value)
+        """
+        return AttrIndex(self, attr, tag)
+
     def first_child(self):
         """Return the first child element, or ``None`` if the document is
         empty.
@@ -528,13 +1198,15 @@ cdef class XMLDocument:
         cdef xml_node node = self._doc.child(name_bytes)
         return XMLNode.create_from_cpp(node)
 
-    def to_string(self, indent="  "):
+    def to_string(self, indent="  ", flags=FormatFlags.DEFAULT):
         """Serialize the document to an XML string.
 
         Args:
             indent (str | int): Indentation — either a string
                 (e.g. ``'    '``) or a number of spaces (e.g. ``4``).
                 Defaults to two spaces.
+            flags (FormatFlags): Output options, e.g.
+                ``FormatFlags.RAW`` for compact output.
 
         Returns:
             str: The serialized XML.
@@ -554,9 +1226,84 @@ cdef class XMLDocument:
             indent_str = indent
             
         cdef bytes indent_bytes = indent_str.encode('utf-8')
-        cdef string s = pugi_serialize_node(self._doc.first_child(), indent_bytes)
+        cdef string s = pugi_serialize_node(self._doc.first_child(), indent_bytes,
+                                            <unsigned int>flags)
         return s.decode('utf-8')
 
+    def to_bytes(self, indent="  ", flags=FormatFlags.DEFAULT):
+        """Serialize the document to UTF-8 encoded ``bytes``.
+
+        Same output as ``to_string(indent).encode('utf-8')``, but
+        pugixml writes into one C++ buffer that becomes the resulting
+        ``bytes`` — no Python ``str`` is created.
+
+        Args:
+            indent (str | int): Indentation string or number of spaces.
+            flags (FormatFlags): Output options.
+
+        Returns:
+            bytes
+
+        Example::
+
+            >>> doc = pygixml.parse_string('<root><item>value</item></root>')
+            >>> doc.to_bytes(0)
+            b'<root>\\n<item>value</item>\\n</root>'
+        """
+        return _serialize_to_bytes(self._doc.first_child(), indent, flags)
+
+    def write(self, fileobj, indent="  ", size_t chunk_size=65536,
+              flags=FormatFlags.DEFAULT):
+        """Serialize the document to a file-like object.
+
+        Output is handed to ``fileobj.write()`` in chunks of
+        *chunk_size* bytes as pugixml produces it, so the serialized
+        document is never held in memory as a whole.  Binary streams
+        receive ``bytes``; text streams (:class:`io.TextIOBase`) receive
+        ``str``.
+
+        Args:
+            fileobj: Object with a ``write()`` method.
+            indent (str | int): Indentation string or number of spaces.
+            chunk_size (int): Size of each ``write()`` call in bytes.
+            flags (FormatFlags): Output options.
+
+        Example::
+
+            >>> with open('out.xml', 'wb') as f:
+            ...     doc.write(f)
+        """
+        _serialize_to_file(self._doc.first_child(), fileobj, indent, chunk_size,
+                           flags)
+
+    def iter_serialize(self, size_t chunk_size=65536, indent="  ",
+                       flags=FormatFlags.DEFAULT):
+        """Serialize the document lazily, as an iterator of ``bytes``
+        chunks.
+
+        Each chunk is *chunk_size* bytes (the last one may be shorter)
+        and is only produced when requested, which makes this a good
+        fit for streaming HTTP responses.  ``b"".join(...)`` of the
+        chunks equals :meth:`to_bytes`.  Adding, removing or renaming
+        nodes before the iterator is exhausted makes its next batch
+        raise ``RuntimeError``.
+
+        Args:
+            chunk_size (int): Chunk size in bytes.
+            indent (str | int): Indentation string or number of spaces.
+            flags (FormatFlags): Output options.
+
+        Returns:
+            Iterator[bytes]
+
+        Example::
+
+            >>> return StreamingResponse(doc.iter_serialize(),
+            ...                          media_type='application/xml')
+        """
+        return _serialize_chunks(self, self._doc.first_child(), indent, chunk_size,
+                                 flags)
+
     def __iter__(self):
         """Iterate over every element node in the document in depth-first
         order, starting from the root element.
@@ -743,6 +1490,7 @@ cdef class XMLNode:
             'new'
         """
         cdef bytes name_bytes = name.encode('utf-8')
+        _touch(self._node)
         return self._node.set_name(name_bytes)
 
     def set_value(self, str value):
@@ -865,6 +1613,7 @@ cdef class XMLNode:
         """
         cdef bytes name_bytes = name.encode('utf-8')
         cdef xml_node node = self._node.append_child(name_bytes)
+        _touch(node)
         return XMLNode.create_from_cpp(node)
 
     def prepend_child(self, str name):
@@ -884,6 +1633,7 @@ cdef class XMLNode:
         """
         cdef bytes name_bytes = name.encode('utf-8')
         cdef xml_node node = self._node.prepend_child(name_bytes)
+        _touch(node)
         return XMLNode.create_from_cpp(node)
 
     def remove_child(self, XMLNode node):
@@ -902,8 +1652,110 @@ cdef class XMLNode:
             >>> if child:
             ...     root.remove_child(child)
         """
+        _touch(self._node)
         return self._node.remove_child(node._node)
 
+    def remove_all(self, str tag=None, str attr=None, str value=None,
+                   str node_type=None):
+        """Remove every descendant matching the given criteria, with its
+        whole subtree, in one native pass.
+
+        .. note::
+           This is a **pygixml-specific feature**.  Unlike collecting
+           nodes in Python and calling :meth:`remove_child` one at a
+           time, the walk and the removals happen in a single C++ pass,
+           with no risk of invalidating a Python-side iteration.
+
+        All given criteria must match.  ``tag`` and ``attr`` imply
+        element nodes.
+
+        Args:
+            tag (str): Element tag name.
+            attr (str): Attribute that must be present.
+            value (str): Required value of *attr* (needs *attr*).
+            node_type (str): One of ``'element'``, ``'pcdata'``,
+                ``'cdata'``, ``'comment'``, ``'pi'``, ``'declaration'``,
+                ``'doctype'`` — the values of :attr:`type`.
+
+        Returns:
+            int: Number of subtrees removed (nested matches inside a
+            removed subtree are not counted separately).
+
+        Raises:
+            PygiXMLNullNodeError: If this node is null.
+            ValueError: If no criteria are given, *value* is given
+                without *attr*, or *node_type* is unknown.
+
+        Example::
+
+            >>> doc = pygixml.parse_string(
+            ...     '<r><debug/><a><debug>x</debug></a><b status="draft"/></r>')
+            >>> doc.root.remove_all(tag='debug')
+            2
+            >>> doc.root.remove_all(attr='status', value='draft')
+            1
+        """
+        if self._node.type() == node_null:
+            raise PygiXMLNullNodeError("Cannot remove from a null node")
+        _touch(self._node)
+        return _remove_all(self._node, tag, attr, value, node_type)
+
+    def build(self, spec):
+        """Append a whole subtree described by *spec* in one native call.
+
+        .. note::
+           This is a **pygixml-specific feature**.  The subtree is
+           materialized entirely in C++, reading each name and value
+           straight from the string's UTF-8 buffer — much faster than
+           chaining :meth:`append_child`, :meth:`append_attribute` and
+           :meth:`set_value` for every node.
+
+        *spec* is one of:
+
+        - a tuple ``(tag, *items)`` — one element.  Each item may be a
+          ``dict`` (attributes), a ``str`` or other scalar (text), a
+          nested element tuple, a ``list`` of child specs, or ``None``
+          (ignored).
+        - a ``str`` — a text node.
+        - any other iterable (``list``, generator, ...) of specs — each
+          one is appended in order.
+
+        Non-``str`` attribute values and text are converted with
+        ``str()`` (``bytes`` are rejected rather than written as
+        ``"b'...'"``); attributes whose value is ``None`` are skipped.
+
+        Args:
+            spec: Element tuple, text, or iterable of specs.
+
+        Returns:
+            int: Number of elements created.
+
+        Raises:
+            PygiXMLNullNodeError: If this node is null.
+            PygiXMLError: If this node cannot have children.
+            TypeError: If *spec* contains an unsupported value.
+            ValueError: If a tag or attribute name is empty or contains
+                a NUL character.
+            RecursionError: If *spec* is nested deeper than the
+                interpreter's recursion limit.
+
+        Example::
+
+            >>> doc = pygixml.parse_string('<catalog/>')
+            >>> doc.root.build(("item", {"id": "1"}, [("name", "x")]))
+            2
+            >>> doc.root.child('item').child_value('name')
+            'x'
+            >>> doc.root.build(("item", {"id": str(i)}) for i in range(3))
+            3
+        """
+        if self._node.type() == node_null:
+            raise PygiXMLNullNodeError("Cannot build on a null node")
+        if self._node.type() != node_element and self._node.type() != node_document:
+            raise PygiXMLError(f"Cannot build children under a {self.type} node")
+        _touch(self._node)
+        return pygixml_build(self._node, spec)
+
     def child_value(self, str name=None):
         """Return the text content of a child element.
 
@@ -992,7 +1844,7 @@ cdef class XMLNode:
             'id'
         """
         cdef xml_attribute attr = self._node.first_attribute()
-        return XMLAttribute.create_from_cpp(attr)
+        return XMLAttribute.create_from_cpp(attr, self._node)
 
     def attribute(self, str name):
         """Return the attribute with the given *name*, or ``None``.
@@ -1011,7 +1863,7 @@ cdef class XMLNode:
         """
         cdef bytes name_bytes = name.encode('utf-8')
         cdef xml_attribute attr = self._node.attribute(name_bytes)
-        return XMLAttribute.create_from_cpp(attr)
+        return XMLAttribute.create_from_cpp(attr, self._node)
 
     def append_attribute(self, str name):
         """Append a new attribute and return it.
@@ -1030,7 +1882,8 @@ cdef class XMLNode:
         """
         cdef bytes name_bytes = name.encode('utf-8')
         cdef xml_attribute attr = self._node.append_attribute(name_bytes)
-        return XMLAttribute.create_from_cpp(attr)
+        _touch_attrs(self._node)
+        return XMLAttribute.create_from_cpp(attr, self._node)
 
     def prepend_attribute(self, str name):
         """Prepend a new attribute and return it.
@@ -1049,7 +1902,8 @@ cdef class XMLNode:
         """
         cdef bytes name_bytes = name.encode('utf-8')
         cdef xml_attribute attr = self._node.prepend_attribute(name_bytes)
-        return XMLAttribute.create_from_cpp(attr)
+        _touch_attrs(self._node)
+        return XMLAttribute.create_from_cpp(attr, self._node)
 
     def remove_attribute(self, XMLAttribute attr):
         """Remove an attribute from this node.
@@ -1067,6 +1921,7 @@ cdef class XMLNode:
             >>> root.remove_attribute(attr)
             True
         """
+        _touch_attrs(self._node)
         return self._node.remove_attribute(attr._attr)
 
     
@@ -1085,8 +1940,21 @@ cdef class XMLNode:
             >>> doc = pygixml.parse_string('<root><a/><b/><a/></root>')
             >>> len(doc.root.select_nodes('a'))
             2
+
+        Compiled expressions are kept in a small LRU cache (see
+        :func:`xpath_cache_info`), so repeating a query does not re-parse it.
+        In a document with a tag index (:meth:`XMLDocument.build_index`),
+        a plain ``//name`` is answered from the index.
         """
-        cdef XPathQuery xpath_query = XPathQuery(query)
+        cdef double t0
+        if _INDEXED_DOCS:
+            t0 = _stats_start()
+            result = _indexed_select(self._node, query, False)
+            if result is not NotImplemented:
+                if _stats_on:
+                    _stats_xpath(query, False, t0, len(result))
+                return result
+        cdef XPathQuery xpath_query = _xpath_cache.get(query)
         return xpath_query.evaluate_node_set(self)
 
     def select_node(self, str query):
@@ -1105,7 +1973,16 @@ cdef class XMLNode:
             >>> doc.root.select_node('b').node.name
             'b'
         """
-        cdef XPathQuery xpath_query = XPathQuery(query)
+        cdef double t0
+        if _INDEXED_DOCS:
+            t0 = _stats_start()
+            result = _indexed_select(self._node, query, True)
+            if result is not NotImplemented:
+                if _stats_on:
+                    _stats_xpath(query, False, t0,
+                                 (<XPathNode>result)._xpath_node.node().type() != node_null)
+                return result
+        cdef XPathQuery xpath_query = _xpath_cache.get(query)
         return xpath_query.evaluate_node(self)
 
     def is_null(self):
@@ -1134,7 +2011,7 @@ cdef class XMLNode:
         cdef string xpath_str = get_xpath_for_node(self._node)
         return xpath_str.decode('utf-8')
 
-    def to_string(self, indent="  "):
+    def to_string(self, indent="  ", flags=FormatFlags.DEFAULT):
         """Serialize this element (and its subtree) to an XML string.
 
         .. note::
@@ -1147,6 +2024,8 @@ cdef class XMLNode:
         Args:
             indent (str | int): Indentation string or number of spaces.
                 Defaults to two spaces.
+            flags (FormatFlags): Output options, e.g.
+                ``FormatFlags.RAW`` for compact output.
 
         Returns:
             str
@@ -1167,9 +2046,87 @@ cdef class XMLNode:
             indent_str = indent
             
         cdef bytes indent_bytes = indent_str.encode('utf-8')
-        cdef string s = pugi_serialize_node(self._node, indent_bytes)
+        cdef string s = pugi_serialize_node(self._node, indent_bytes,
+                                            <unsigned int>flags)
         return s.decode('utf-8')
 
+    def to_bytes(self, indent="  ", flags=FormatFlags.DEFAULT):
+        """Serialize this node (and its subtree) to UTF-8 encoded
+        ``bytes``.
+
+        .. note::
+           This is a **pygixml-specific feature**.  Unlike
+           :meth:`to_string`, which goes through ``std::ostringstream``
+           and a Python ``str``, pugixml's serializer writes into one
+           C++ buffer via a custom ``xml_writer``, which is copied into
+           the returned ``bytes`` object once.
+
+        Args:
+            indent (str | int): Indentation string or number of spaces.
+                Defaults to two spaces.
+            flags (FormatFlags): Output options.
+
+        Returns:
+            bytes: Same content as ``to_string(indent).encode('utf-8')``.
+
+        Example::
+
+            >>> doc = pygixml.parse_string('<root><item>val</item></root>')
+            >>> doc.root.child('item').to_bytes()
+            b'<item>val</item>'
+        """
+        return _serialize_to_bytes(self._node, indent, flags)
+
+    def write(self, fileobj, indent="  ", size_t chunk_size=65536,
+              flags=FormatFlags.DEFAULT):
+        """Serialize this node (and its subtree) to a file-like object.
+
+        .. note::
+           This is a **pygixml-specific feature**.  Output is flushed to
+           ``fileobj.write()`` in fixed-size chunks while pugixml
+           serializes, so memory use is bounded by *chunk_size*.
+
+        Args:
+            fileobj: Object with a ``write()`` method.  Binary streams
+                receive ``bytes``; text streams receive ``str``.
+            indent (str | int): Indentation string or number of spaces.
+            chunk_size (int): Size of each ``write()`` call in bytes.
+            flags (FormatFlags): Output options.
+
+        Example::
+
+            >>> buf = io.BytesIO()
+            >>> doc.root.write(buf, indent='')
+        """
+        _serialize_to_file(self._node, fileobj, indent, chunk_size, flags)
+
+    def iter_serialize(self, size_t chunk_size=65536, indent="  ",
+                       flags=FormatFlags.DEFAULT):
+        """Serialize this node lazily, as an iterator of ``bytes``
+        chunks of *chunk_size* bytes (the last one may be shorter).
+
+        .. note::
+           This is a **pygixml-specific feature**.  Chunks are produced
+           on demand, so a large subtree can be streamed (e.g. as an HTTP
+           response body) without ever holding its full serialization.
+           Adding, removing or renaming nodes before the iterator is
+           exhausted makes its next batch raise ``RuntimeError``.
+
+        Args:
+            chunk_size (int): Chunk size in bytes.
+            indent (str | int): Indentation string or number of spaces.
+            flags (FormatFlags): Output options.
+
+        Returns:
+            Iterator[bytes]: ``b"".join(...)`` equals :meth:`to_bytes`.
+
+        Example::
+
+            >>> for chunk in doc.root.iter_serialize(8192):
+            ...     sock.sendall(chunk)
+        """
+        return _serialize_chunks(self, self._node, indent, chunk_size, flags)
+
     @property
     def xml(self):
         """Shorthand for ``self.to_string()`` — serialized XML with
@@ -1264,7 +2221,7 @@ cdef class XMLNode:
         """Return ``True`` if this node is not null."""
         return self._node.type() != node_null
 
-    def children(self, bint recursive=False):
+    def children(self, bint recursive=False, str tag=None):
         """Iterate over child **element** nodes.
 
         .. note::
@@ -1280,6 +2237,10 @@ cdef class XMLNode:
             recursive (bool): Yield only direct children (``False``, the
                 default) or all descendants in depth-first order
                 (``True``).
+            tag (str): Only yield elements with this tag name.  With
+                ``recursive=True`` in a document that has a tag index
+                (:meth:`XMLDocument.build_index`), the matches come
+                straight from the index.
 
         Yields:
             XMLNode
@@ -1291,18 +2252,33 @@ cdef class XMLNode:
             ['a', 'b']
             >>> [c.name for c in doc.root.children(True)]
             ['a', 'a1', 'b']
+            >>> [c.name for c in doc.root.children(True, tag='a1')]
+            ['a1']
         """
         cdef xml_node current = self._node.first_child()
         cdef xml_node child
         cdef vector[xml_node] stack
+        cdef string tag_s
+        cdef bint filtered = tag is not None
+        cdef size_t i
+
+        if filtered:
+            tag_s = tag.encode('utf-8')
 
         if not recursive:
             while current.type() != node_null:
-                if current.type() == node_element:
+                if current.type() == node_element and (
+                        not filtered or current.name() == tag_s):
                     yield XMLNode.create_from_cpp(current)
                 current = current.next_sibling()
             return
 
+        if filtered and self._node.type() != node_null and \
+                _indexed_descendants(self._node, [<bytes>tag_s], stack):
+            for i in range(stack.size()):
+                yield XMLNode.create_from_cpp(stack[i])
+            return
+
         # Recursive DFS
         current = self._node.last_child()
         while current.type() != node_null:
@@ -1312,7 +2288,8 @@ cdef class XMLNode:
         while stack.size() > 0:
             current = stack.back()
             stack.pop_back()
-            if current.type() == node_element:
+            if current.type() == node_element and (
+                    not filtered or current.name() == tag_s):
                 yield XMLNode.create_from_cpp(current)
             child = current.last_child()
             while child.type() != node_null:
@@ -1405,11 +2382,13 @@ cdef class XMLAttribute:
         '42'
     """
     cdef xml_attribute _attr
+    cdef xml_node _node         # the element carrying _attr
     
     @staticmethod
-    cdef XMLAttribute create_from_cpp(xml_attribute attr):
+    cdef XMLAttribute create_from_cpp(xml_attribute attr, xml_node node):
         cdef XMLAttribute wrapper = XMLAttribute()
         wrapper._attr = attr
+        wrapper._node = node
         return wrapper
     
     @property
@@ -1435,11 +2414,13 @@ cdef class XMLAttribute:
     def set_name(self, str name):
         """Change the attribute name.  Returns ``False`` if null."""
         cdef bytes name_bytes = name.encode('utf-8')
+        _touch_attrs(self._node)
         return self._attr.set_name(name_bytes)
 
     def set_value(self, str value):
         """Change the attribute value.  Returns ``False`` if null."""
         cdef bytes value_bytes = value.encode('utf-8')
+        _touch_attrs(self._node)
         return self._attr.set_value(value_bytes)
 
     @name.setter
@@ -1468,7 +2449,7 @@ cdef class XMLAttribute:
             >>> next_attr = attr.next_attribute
         """
         cdef xml_attribute attr = self._attr.next_attribute()
-        return XMLAttribute.create_from_cpp(attr)
+        return XMLAttribute.create_from_cpp(attr, self._node)
 
     def __iter__(self):
         """Iterate over all attributes starting from this one.
@@ -1534,7 +2515,7 @@ cdef class XPathNode:
         """The matched attribute, or ``None`` if the query matched an
         element instead."""
         cdef xml_attribute attr = self._xpath_node.attribute()
-        return XMLAttribute.create_from_cpp(attr)
+        return XMLAttribute.create_from_cpp(attr, self._xpath_node.parent())
 
     @property
     def parent(self):
@@ -1598,33 +2579,137 @@ cdef class XPathQuery:
     ``select_nodes()`` repeatedly, because the expression is parsed only
     once.
 
+    Queries can be parameterized with XPath variables (``$name``).  Declare
+    each variable's type when compiling and bind values per evaluation, so
+    one compiled query serves every value without formatting (and
+    escaping) a new expression string:
+
     Example::
 
         >>> doc = pygixml.parse_string('<root><item>value</item></root>')
         >>> query = pygixml.XPathQuery('//item')
         >>> query.evaluate_node(doc.root).node.text()
         'value'
+
+        >>> by_id = pygixml.XPathQuery('//item[@id = $id]', variables={'id': str})
+        >>> by_id.evaluate_node_set(doc.root, id='42')
+
+    Every evaluation sets all declared variables: those not passed are
+    reset to their empty value, never left over from an earlier call.
+    The values live in the compiled query itself, so a query with
+    variables is not thread-safe -- give each thread its own
+    ``XPathQuery``.
     """
     cdef xpath_query* _query
+    cdef xpath_variable_set* _vars
+    cdef dict _var_types
+    cdef str _expr
 
-    def __cinit__(self, str query):
+    def __cinit__(self, str query, variables=None):
         """Compile an XPath expression.
 
         Args:
             query (str): XPath 1.0 expression.
+            variables (dict, optional): Maps each ``$variable`` used in
+                *query* to its type: ``str``, ``float`` (or ``int``),
+                ``bool`` or :class:`XPathNodeSet`.  A variable that is
+                not bound in a call is empty (``''``, ``0``, ``false``,
+                empty node set).
+
+        Raises:
+            TypeError: If a variable type is not supported.
+            ValueError: If a variable name is invalid.
         """
         cdef bytes query_bytes = query.encode('utf-8')
-        self._query = new xpath_query(query_bytes)
-    
+        cdef bytes name_bytes
+        cdef xpath_value_type vtype
+        cdef double t0 = _stats_start()
+        self._expr = query
+        if variables:
+            self._vars = new xpath_variable_set()
+            self._var_types = {}
+            for name, kind in variables.items():
+                vtype = _xpath_value_type(kind)
+                name_bytes = name.encode('utf-8')
+                if self._vars.add(name_bytes, vtype) == NULL:
+                    raise ValueError(f"Invalid XPath variable name: {name!r}")
+                self._var_types[name] = kind
+            self._query = new xpath_query(query_bytes, self._vars)
+        else:
+            self._query = new xpath_query(query_bytes)
+        if _stats_on:
+            _stats_xpath(query, True, t0, 0)
+
     def __dealloc__(self):
+        # The compiled query points into the variable set: free it first.
         if self._query != NULL:
             del self._query
-    
-    def evaluate_node_set(self, XMLNode context_node):
+        if self._vars != NULL:
+            del self._vars
+
+    @property
+    def variables(self):
+        """Declared variables as a ``{name: type}`` dict (empty if none)."""
+        return dict(self._var_types) if self._var_types else {}
+
+    cdef int _bind(self, dict bindings) except -1:
+        """Set every declared variable for one evaluation: to its value in
+        *bindings*, or back to its empty default, so that nothing carries
+        over from an earlier call."""
+        cdef xpath_variable* var
+        cdef bytes value_bytes
+        cdef bint ok
+        cdef bool flag
+        cdef xpath_node_set empty
+        cdef double zero = 0
+        for name in bindings:
+            if not self._var_types or name not in self._var_types:
+                raise TypeError(f"XPath query has no variable ${name}")
+        if self._vars == NULL:
+            return 0
+        for name in self._var_types:
+            var = self._vars.get(name.encode('utf-8'))
+            vtype = var.type()
+            if name not in bindings:
+                if vtype == xpath_type_string:
+                    ok = var.set_string(b"")
+                elif vtype == xpath_type_number:
+                    ok = var.set_number(zero)
+                elif vtype == xpath_type_boolean:
+                    flag = False
+                    ok = var.set_boolean(flag)
+                else:
+                    ok = var.set_node_set(empty)
+                if not ok:
+                    raise MemoryError()
+                continue
+            value = bindings[name]
+            if vtype == xpath_type_string:
+                if not isinstance(value, str):
+                    raise TypeError(f"${name} expects str, got {type(value).__name__}")
+                value_bytes = value.encode('utf-8')
+                ok = var.set_string(value_bytes)
+            elif vtype == xpath_type_number:
+                if isinstance(value, (str, bytes)):
+                    raise TypeError(f"${name} expects a number, got {type(value).__name__}")
+                ok = var.set_number(float(value))
+            elif vtype == xpath_type_boolean:
+                flag = <bint>value
+                ok = var.set_boolean(flag)
+            else:
+                if not isinstance(value, XPathNodeSet):
+                    raise TypeError(f"${name} expects XPathNodeSet, got {type(value).__name__}")
+                ok = var.set_node_set((<XPathNodeSet>value)._xpath_node_set)
+            if not ok:
+                raise MemoryError()
+        return 0
+
+    def evaluate_node_set(self, XMLNode context_node, **bindings):
         """Evaluate query and return node set.
         
         Args:
             context_node (XMLNode): Node to evaluate the query against
+            **bindings: Values for the query's declared variables
             
         Returns:
             XPathNodeSet: Set of matching XPath nodes
@@ -1635,14 +2720,20 @@ cdef class XPathQuery:
             >>> for node in nodes:
             ...     print(node.node.text())
         """
+        cdef double t0 = _stats_start()
+        if bindings or self._vars != NULL:
+            self._bind(bindings)
         cdef xpath_node_set result = self._query.evaluate_node_set(context_node._node)
+        if _stats_on:
+            _stats_xpath(self._expr, False, t0, result.size())
         return XPathNodeSet.create_from_cpp(result)
     
-    def evaluate_node(self, XMLNode context_node):
+    def evaluate_node(self, XMLNode context_node, **bindings):
         """Evaluate query and return first node.
         
         Args:
             context_node (XMLNode): Node to evaluate the query against
+            **bindings: Values for the query's declared variables
             
         Returns:
             XPathNode: First matching XPath node or None if no matches
@@ -1652,14 +2743,22 @@ cdef class XPathQuery:
             >>> node = query.evaluate_node(doc.first_child())
             >>> print(node.node.text())
         """
+        cdef double t0 = _stats_start()
+        if bindings or self._vars != NULL:
+            self._bind(bindings)
         cdef xpath_node result = self._query.evaluate_node(context_node._node)
+        if _stats_on:
+            _stats_xpath(self._expr, False, t0,
+                         result.node().type() != node_null
+                         or not result.attribute().empty())
         return XPathNode.create_from_cpp(result)
     
-    def evaluate_boolean(self, XMLNode context_node):
+    def evaluate_boolean(self, XMLNode context_node, **bindings):
         """Evaluate query and return boolean result.
         
         Args:
             context_node (XMLNode): Node to evaluate the query against
+            **bindings: Values for the query's declared variables
             
         Returns:
             bool: Boolean result of the XPath query
@@ -1670,13 +2769,20 @@ cdef class XPathQuery:
             >>> print(has_items)
             True
         """
-        return self._query.evaluate_boolean(context_node._node)
+        cdef double t0 = _stats_start()
+        if bindings or self._vars != NULL:
+            self._bind(bindings)
+        cdef bint result = self._query.evaluate_boolean(context_node._node)
+        if _stats_on:
+            _stats_xpath(self._expr, False, t0, 1)
+        return result
     
-    def evaluate_number(self, XMLNode context_node):
+    def evaluate_number(self, XMLNode context_node, **bindings):
         """Evaluate query and return numeric result.
         
         Args:
             context_node (XMLNode): Node to evaluate the query against
+            **bindings: Values for the query's declared variables
             
         Returns:
             float: Numeric result of the XPath query
@@ -1687,13 +2793,20 @@ cdef class XPathQuery:
             >>> print(count)
             2.0
         """
-        return self._query.evaluate_number(context_node._node)
+        cdef double t0 = _stats_start()
+        if bindings or self._vars != NULL:
+            self._bind(bindings)
+        cdef double result = self._query.evaluate_number(context_node._node)
+        if _stats_on:
+            _stats_xpath(self._expr, False, t0, 1)
+        return result
     
-    def evaluate_string(self, XMLNode context_node):
+    def evaluate_string(self, XMLNode context_node, **bindings):
         """Evaluate query and return string result.
         
         Args:
             context_node (XMLNode): Node to evaluate the query against
+            **bindings: Values for the query's declared variables
             
         Returns:
             str: String result of the XPath query or None if empty
@@ -1704,9 +2817,604 @@ cdef class XPathQuery:
             >>> print(text)
             'value'
         """
+        cdef double t0 = _stats_start()
+        if bindings or self._vars != NULL:
+            self._bind(bindings)
         cdef string result = self._query.evaluate_string(context_node._node)
+        if _stats_on:
+            _stats_xpath(self._expr, False, t0, 1)
         return result.decode('utf-8') if not result.empty() else None
 
+    # Bulk evaluation: the whole result is produced in one loop over the
+    # native node set, without an XPathNode / XMLNode wrapper per match.
+
+    def evaluate_strings(self, XMLNode context_node, **bindings):
+        """Evaluate query and return the string-value of every match.
+
+        .. note::
+           This is a **pygixml-specific feature**.  It is equivalent to
+           ``[string(m) for m in node_set]`` in XPath terms: an
+           attribute's value, or an element's concatenated descendant
+           text.
+
+        Args:
+            context_node (XMLNode): Node to evaluate the query against
+            **bindings: Values for the query's declared variables
+
+        Returns:
+            list[str]: One string per match, in node-set order
+
+        Example:
+            >>> query = pygixml.XPathQuery('//item/@id')
+            >>> query.evaluate_strings(doc.root)
+            ['1', '2']
+        """
+        cdef double t0 = _stats_start()
+        if bindings or self._vars != NULL:
+            self._bind(bindings)
+        cdef xpath_node_set result = self._query.evaluate_node_set(context_node._node)
+        cdef size_t i, n = result.size()
+        cdef string buf
+        cdef list out = []
+        for i in range(n):
+            pygixml_xpath_string(result[i], buf)
+            out.append(buf.decode('utf-8'))
+        if _stats_on:
+            _stats_xpath(self._expr, False, t0, n)
+        return out
+
+    def evaluate_numbers(self, XMLNode context_node, bint as_numpy=False,
+                         **bindings):
+        """Evaluate query and convert every match to a number.
+
+        .. note::
+           This is a **pygixml-specific feature**.  Each match's
+           string-value is converted with XPath ``number()`` rules, so
+           non-numeric values become ``nan``.
+
+        Args:
+            context_node (XMLNode): Node to evaluate the query against
+            as_numpy (bool): Return a ``float64`` NumPy array (sharing the
+                native buffer) instead of a list
+            **bindings: Values for the query's declared variables
+
+        Returns:
+            list[float] | numpy.ndarray
+
+        Raises:
+            PygiXMLError: If *as_numpy* is set and NumPy is not installed
+
+        Example:
+            >>> query = pygixml.XPathQuery('//item/@price')
+            >>> query.evaluate_numbers(doc.root)
+            [3.5, 12.0]
+        """
+        if as_numpy:
+            try:
+                import numpy
+            except ImportError:
+                raise PygiXMLError("evaluate_numbers(as_numpy=True) requires NumPy") from None
+        cdef double t0 = _stats_start()
+        if bindings or self._vars != NULL:
+            self._bind(bindings)
+        cdef xpath_node_set result = self._query.evaluate_node_set(context_node._node)
+        cdef size_t i, n = result.size()
+        cdef string buf
+        cdef array.array out = array.clone(_DOUBLE_ARRAY, n, zero=False)
+        for i in range(n):
+            pygixml_xpath_string(result[i], buf)
+            out.data.as_doubles[i] = pygixml_xpath_number(buf.c_str())
+        if _stats_on:
+            _stats_xpath(self._expr, False, t0, n)
+        if as_numpy:
+            return numpy.frombuffer(out, dtype=numpy.float64)
+        return out.tolist()
+
+    def evaluate_nodes(self, XMLNode context_node, **bindings):
+        """Evaluate query and return the matched nodes as a list.
+
+        .. note::
+           This is a **pygixml-specific feature**.  Unlike
+           :meth:`evaluate_node_set` it skips the :class:`XPathNode`
+           layer; attribute matches are left out (see
+           :meth:`evaluate_attrs`).
+
+        Args:
+            context_node (XMLNode): Node to evaluate the query against
+            **bindings: Values for the query's declared variables
+
+        Returns:
+            list[XMLNode]
+
+        Example:
+            >>> [n.name for n in pygixml.XPathQuery('//item').evaluate_nodes(doc.root)]
+            ['item', 'item']
+        """
+        cdef double t0 = _stats_start()
+        if bindings or self._vars != NULL:
+            self._bind(bindings)
+        cdef xpath_node_set result = self._query.evaluate_node_set(context_node._node)
+        cdef size_t i, n = result.size()
+        cdef xml_node node
+        cdef list out = []
+        for i in range(n):
+            node = result[i].node()
+            if node.type() != node_null:
+                out.append(XMLNode.create_from_cpp(node))
+        if _stats_on:
+            _stats_xpath(self._expr, False, t0, len(out))
+        return out
+
+    def evaluate_attrs(self, XMLNode context_node, **bindings):
+        """Evaluate query and return the matched attributes as a list.
+
+        .. note::
+           This is a **pygixml-specific feature**.  Only attribute matches
+           (e.g. ``//item/@id``) are returned; node matches are left out.
+
+        Args:
+            context_node (XMLNode): Node to evaluate the query against
+            **bindings: Values for the query's declared variables
+
+        Returns:
+            list[XMLAttribute]
+
+        Example:
+            >>> [a.value for a in pygixml.XPathQuery('//@id').evaluate_attrs(doc.root)]
+            ['1', '2']
+        """
+        cdef double t0 = _stats_start()
+        if bindings or self._vars != NULL:
+            self._bind(bindings)
+        cdef xpath_node_set result = self._query.evaluate_node_set(context_node._node)
+        cdef size_t i, n = result.size()
+        cdef xml_attribute attr
+        cdef list out = []
+        for i in range(n):
+            attr = result[i].attribute()
+            if not attr.empty():
+                out.append(XMLAttribute.create_from_cpp(attr, result[i].parent()))
+        if _stats_on:
+            _stats_xpath(self._expr, False, t0, len(out))
+        return out
+
+    def evaluate_many(self, nodes, str kind="strings", workers=None,
+                      **bindings):
+        """Evaluate query against many context nodes in parallel.
+
+        .. note::
+           This is a **pygixml-specific feature**.  The GIL is released
+           and the contexts are spread over a pool of native threads;
+           evaluating on distinct documents is independent, so
+           corpus-wide queries scale with the number of cores.
+
+        The documents must stay alive and must not be modified until the
+        call returns.
+
+        Args:
+            nodes (iterable): :class:`XMLNode` or :class:`XMLDocument`
+                context for each evaluation
+            kind (str): ``"strings"`` (string-value of every match, as in
+                :meth:`evaluate_strings`), ``"numbers"`` (as in
+                :meth:`evaluate_numbers`), ``"count"`` (number of matches)
+                or ``"nodes"`` (as in :meth:`evaluate_nodes`)
+            workers (int, optional): Number of threads (default: one per
+                CPU core); ``1`` evaluates on the calling thread
+            **bindings: Values for the query's declared variables, shared
+                by every evaluation
+
+        Returns:
+            list: One result per context node, in input order -- a list
+            for ``"strings"`` / ``"numbers"`` / ``"nodes"``, an int for
+            ``"count"``
+
+        Raises:
+            ValueError: If *kind* or *workers* is invalid
+            TypeError: If an item of *nodes* is not a node or document
+            RuntimeError: If the expression is not a node set
+
+        Example:
+            >>> docs = [pygixml.parse_file(p) for p in paths]
+            >>> titles = pygixml.XPathQuery('//title')
+            >>> titles.evaluate_many(docs, kind='strings', workers=8)
+            [['A', 'B'], ['C'], ...]
+        """
+        cdef double t0 = _stats_start()
+        if kind not in _EVALUATE_MANY_KINDS:
+            raise ValueError(
+                f"unknown kind {kind!r} "
+                f"(expected one of {', '.join(_EVALUATE_MANY_KINDS)})")
+        cdef int k = _EVALUATE_MANY_KINDS[kind]
+        cdef unsigned n_workers
+        if workers is None:
+            n_workers = max(pygixml_hardware_threads(), 1)
+        elif workers < 1:
+            raise ValueError("workers must be >= 1")
+        else:
+            n_workers = workers
+        if self._query.return_type() != xpath_type_node_set:
+            raise RuntimeError("Expression does not evaluate to node set")
+        if bindings or self._vars != NULL:
+            self._bind(bindings)
+
+        # Holding the list keeps documents created by a generator alive.
+        cdef list items = list(nodes)
+        cdef vector[xml_node] contexts
+        contexts.reserve(len(items))
+        for item in items:
+            if isinstance(item, XMLNode):
+                contexts.push_back((<XMLNode>item)._node)
+            elif isinstance(item, XMLDocument):
+                contexts.push_back(pygixml_document_node((<XMLDocument>item)._doc))
+            else:
+                raise TypeError(
+                    f"evaluate_many() expects XMLNode or XMLDocument items, "
+                    f"got {type(item).__name__}")
+
+        cdef vector[xpath_node_set] sets
+        cdef vector[vector[string]] strings
+        cdef vector[vector[double]] numbers
+        cdef vector[size_t] counts
+        cdef int rc
+        with nogil:
+            rc = pygixml_xpath_evaluate_many(self._query[0], contexts, k,
+                                             n_workers, sets, strings,
+                                             numbers, counts)
+        if rc == 1:
+            raise MemoryError()
+        if rc != 0:
+            raise PygiXMLError("XPath evaluation failed")
+
+        cdef size_t i, j
+        cdef list out = []
+        cdef list row
+        cdef xml_node node
+        for i in range(contexts.size()):
+            if k == 0:
+                row = []
+                for j in range(sets[i].size()):
+                    node = sets[i][j].node()
+                    if node.type() != node_null:
+                        row.append(XMLNode.create_from_cpp(node))
+                out.append(row)
+            elif k == 1:
+                out.append([v.decode('utf-8') for v in strings[i]])
+            elif k == 2:
+                out.append(list(numbers[i]))
+            else:
+                out.append(counts[i])
+        if _stats_on:
+            _stats_xpath(self._expr, False, t0,
+                         sum(map(len, out)) if k != 3 else sum(out))
+        return out
+
+
+cdef array.array _DOUBLE_ARRAY = array.array('d')
+
+_EVALUATE_MANY_KINDS = {"nodes": 0, "strings": 1, "numbers": 2, "count": 3}
+
+
+cdef xpath_value_type _xpath_value_type(kind) except xpath_type_none:
+    if kind is str:
+        return xpath_type_string
+    if kind is type(True):      # ``bool`` is libcpp's bool in this module
+        return xpath_type_boolean
+    if kind is float or kind is int:
+        return xpath_type_number
+    if kind is XPathNodeSet:
+        return xpath_type_node_set
+    raise TypeError(f"Unsupported XPath variable type: {kind!r} "
+                    "(expected str, float, int, bool or XPathNodeSet)")
+
+
+# Compiled-query cache
+# --------------------
+# select_nodes() / select_node() compile their expression on every call;
+# the cache below keeps the most recently used compiled queries so that
+# repeated expressions are only parsed once.  pugixml evaluates a compiled
+# query without mutating it, so one XPathQuery can be shared across
+# threads; the lock only guards the bookkeeping.
+
+import threading as _threading
+from collections import OrderedDict as _OrderedDict, namedtuple as _namedtuple
+
+XPathCacheInfo = _namedtuple("XPathCacheInfo",
+                             ["hits", "misses", "maxsize", "currsize"])
+
+
+cdef class _XPathCache:
+    cdef object _entries
+    cdef object _lock
+    cdef Py_ssize_t maxsize
+    cdef Py_ssize_t hits
+    cdef Py_ssize_t misses
+
+    def __cinit__(self, Py_ssize_t maxsize):
+        self._entries = _OrderedDict()
+        self._lock = _threading.Lock()
+        self.maxsize = maxsize
+
+    cdef XPathQuery get(self, str expr):
+        cdef XPathQuery query
+        with self._lock:
+            query = self._entries.get(expr)
+            if query is not None:
+                self._entries.move_to_end(expr)
+                self.hits += 1
+                return query
+            self.misses += 1
+        # Compile outside the lock; a failing expression is never cached.
+        query = XPathQuery(expr)
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[expr] = query
+                self._evict()
+        return query
+
+    cdef void _evict(self):
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+cdef _XPathCache _xpath_cache = _XPathCache(256)
+
+
+def xpath_cache_info():
+    """Return statistics for the compiled XPath query cache.
+
+    Returns:
+        XPathCacheInfo: Named tuple ``(hits, misses, maxsize, currsize)``.
+
+    Example::
+
+        >>> pygixml.xpath_cache_clear()
+        >>> doc = pygixml.parse_string('<root><a/></root>')
+        >>> _ = doc.root.select_nodes('a'); _ = doc.root.select_nodes('a')
+        >>> pygixml.xpath_cache_info()
+        XPathCacheInfo(hits=1, misses=1, maxsize=256, currsize=1)
+    """
+    with _xpath_cache._lock:
+        return XPathCacheInfo(_xpath_cache.hits, _xpath_cache.misses,
+                              _xpath_cache.maxsize,
+                              len(_xpath_cache._entries))
+
+
+def xpath_cache_clear():
+    """Drop every cached compiled query and reset the hit/miss counters."""
+    with _xpath_cache._lock:
+        _xpath_cache._entries.clear()
+        _xpath_cache.hits = 0
+        _xpath_cache.misses = 0
+
+
+def set_xpath_cache_size(Py_ssize_t maxsize):
+    """Set how many compiled queries the XPath cache keeps (default 256).
+
+    Least recently used queries are evicted first.  ``0`` disables
+    caching.
+
+    Args:
+        maxsize (int): Maximum number of cached expressions.
+
+    Raises:
+        ValueError: If *maxsize* is negative.
+    """
+    if maxsize < 0:
+        raise ValueError("maxsize must be >= 0")
+    with _xpath_cache._lock:
+        _xpath_cache.maxsize = maxsize
+        _xpath_cache._evict()
+
+
+# Statistics
+# ----------
+# Opt-in counters for XPath compilation / evaluation (per expression
+# string) and DOM parsing (per entry point).  Every instrumented call
+# site tests the C-level _stats_on flag before touching the clock, so
+# disabled statistics cost one branch per call.
+
+cdef extern from *:
+    """
+    #include <chrono>
+
+    static inline double px_monotonic() {
+        return std::chrono::duration<double>(
+            std::chrono::steady_clock::now().time_since_epoch()).count();
+    }
+    """
+    double px_monotonic() nogil
+
+
+cdef class _XPathStat:
+    cdef Py_ssize_t compiles
+    cdef Py_ssize_t evaluations
+    cdef Py_ssize_t results
+    cdef Py_ssize_t max_results
+    cdef double     compile_time
+    cdef double     total_time
+    cdef double     max_time
+
+    cdef dict as_dict(self):
+        return {
+            "compiles": self.compiles,
+            "compile_time": self.compile_time,
+            "evaluations": self.evaluations,
+            "total_time": self.total_time,
+            "max_time": self.max_time,
+            "results": self.results,
+            "max_results": self.max_results,
+        }
+
+
+cdef class _ParseStat:
+    cdef Py_ssize_t calls
+    cdef Py_ssize_t failures
+    cdef Py_ssize_t nbytes
+    cdef double     total_time
+    cdef double     max_time
+
+    cdef dict as_dict(self):
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "bytes": self.nbytes,
+            "total_time": self.total_time,
+            "max_time": self.max_time,
+        }
+
+
+cdef bint _stats_on = False
+cdef dict _xpath_stats = {}     # expression -> _XPathStat
+cdef dict _parse_stats = {}     # entry point -> _ParseStat
+cdef object _stats_hook = None
+
+
+cdef inline double _stats_start():
+    return px_monotonic() if _stats_on else 0.0
+
+
+cdef int _stats_xpath(str expr, bint compiled, double t0,
+                      Py_ssize_t size) except -1:
+    """Record one compilation (*compiled*) or evaluation of *expr*."""
+    cdef double elapsed = px_monotonic() - t0
+    cdef _XPathStat stat = _xpath_stats.get(expr)
+    if stat is None:
+        stat = _xpath_stats[expr] = _XPathStat()
+    if compiled:
+        stat.compiles += 1
+        stat.compile_time += elapsed
+    else:
+        stat.evaluations += 1
+        stat.total_time += elapsed
+        if elapsed > stat.max_time:
+            stat.max_time = elapsed
+        stat.results += size
+        if size > stat.max_results:
+            stat.max_results = size
+    if _stats_hook is not None:
+        _stats_hook("xpath_compile" if compiled else "xpath_evaluate",
+                    expr, elapsed, size)
+    return 0
+
+
+cdef int _stats_parse(str entry, Py_ssize_t nbytes, double t0,
+                      bint ok) except -1:
+    """Record one parse of *nbytes* input bytes through *entry*."""
+    cdef double elapsed = px_monotonic() - t0
+    cdef _ParseStat stat = _parse_stats.get(entry)
+    if stat is None:
+        stat = _parse_stats[entry] = _ParseStat()
+    stat.calls += 1
+    if not ok:
+        stat.failures += 1
+    stat.nbytes += nbytes
+    stat.total_time += elapsed
+    if elapsed > stat.max_time:
+        stat.max_time = elapsed
+    if _stats_hook is not None:
+        _stats_hook("parse", entry, elapsed, nbytes)
+    return 0
+
+
+cdef Py_ssize_t _stats_file_size(path):
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+def enable_stats(bint enabled=True):
+    """Turn statistics collection on or off.
+
+    .. note::
+       This is a **pygixml-specific feature**.  While disabled (the
+       default) the instrumented calls skip all bookkeeping.
+
+    Collected numbers are kept when collection is turned off; use
+    :func:`reset_stats` to clear them.
+
+    Args:
+        enabled (bool): ``True`` to start collecting, ``False`` to stop.
+
+    Returns:
+        bool: The previous setting.
+
+    Example::
+
+        >>> pygixml.enable_stats()
+        False
+        >>> doc.root.select_nodes('//item')
+        >>> pygixml.stats()['xpath']['//item']['evaluations']
+        1
+    """
+    global _stats_on
+    cdef bint previous = _stats_on
+    _stats_on = enabled
+    return previous
+
+
+def stats():
+    """Return a snapshot of the collected statistics.
+
+    XPath numbers are keyed by expression string and cover
+    :class:`XPathQuery` compilation (including the compilations behind
+    the :func:`xpath_cache_info` cache), every ``evaluate_*`` method and
+    :meth:`XMLNode.select_nodes` / :meth:`XMLNode.select_node`.  Parse
+    numbers are keyed by entry point (``"parse_string"``,
+    ``"XMLDocument.load_file"``, ``"objectify.from_string"``, ...);
+    ``bytes`` counts input bytes (the on-disk size for files).  Times
+    are in seconds.
+
+    Returns:
+        dict: ``{"enabled": bool, "xpath": {expr: {...}},
+        "parse": {entry: {...}}}`` with per-expression ``compiles``,
+        ``compile_time``, ``evaluations``, ``total_time``, ``max_time``,
+        ``results`` and ``max_results``, and per-entry-point ``calls``,
+        ``failures``, ``bytes``, ``total_time`` and ``max_time``.
+    """
+    return {
+        "enabled": _stats_on,
+        "xpath": {k: (<_XPathStat>v).as_dict() for k, v in _xpath_stats.items()},
+        "parse": {k: (<_ParseStat>v).as_dict() for k, v in _parse_stats.items()},
+    }
+
+
+def reset_stats():
+    """Clear all collected statistics (collection stays on or off)."""
+    _xpath_stats.clear()
+    _parse_stats.clear()
+
+
+def set_stats_hook(hook):
+    """Install a callback invoked after every recorded event.
+
+    The hook is called as ``hook(kind, key, seconds, size)`` where
+    *kind* is ``"xpath_compile"``, ``"xpath_evaluate"`` or ``"parse"``,
+    *key* the expression or entry point, *seconds* the elapsed time and
+    *size* the number of results (evaluations) or input bytes (parses).
+    Use it to forward timings to a metrics system.  It runs on the
+    calling thread, only while statistics are enabled; exceptions it
+    raises propagate to the instrumented call.
+
+    Args:
+        hook (callable | None): The callback, or ``None`` to remove it.
+
+    Returns:
+        The previously installed hook (or ``None``).
+
+    Example::
+
+        >>> pygixml.set_stats_hook(
+        ...     lambda kind, key, secs, size: histogram(kind).observe(secs))
+    """
+    global _stats_hook
+    if hook is not None and not callable(hook):
+        raise TypeError("stats hook must be callable or None")
+    previous = _stats_hook
+    _stats_hook = hook
+    return previous
+
+
 # Convenience functions
 def parse_string(str xml_string, options=0xFFFFFFFF):
     """Parse XML from string and return XMLDocument.
@@ -1730,8 +3438,8 @@ def parse_string(str xml_string, options=0xFFFFFFFF):
         >>> doc = pygixml.parse_string('<root>content</root>')
         >>> doc = pygixml.parse_string(xml, pygixml.ParseFlags.MINIMAL)
     """
-    doc = XMLDocument()
-    if doc.load_string(xml_string, options):
+    cdef XMLDocument doc = XMLDocument()
+    if doc._load_string(xml_string, options, "parse_string"):
         return doc
     else:
         raise PygiXMLError("Failed to parse XML string")
@@ -1739,6 +3447,9 @@ def parse_string(str xml_string, options=0xFFFFFFFF):
 def parse_file(str file_path, options=0xFFFFFFFF):
     """Parse XML from file and return XMLDocument.
 
+    gzip, zlib and xz compressed files (e.g. ``data.xml.gz``) are
+    detected from their magic bytes and decompressed on the fly.
+
     Args:
         file_path (str): Path to XML file
         options (ParseFlags, optional): Parse flags
@@ -1758,15 +3469,21 @@ def parse_file(str file_path, options=0xFFFFFFFF):
         >>> doc = pygixml.parse_file('data.xml')
         >>> doc = pygixml.parse_file('data.xml', pygixml.ParseFlags.MINIMAL)
     """
-    doc = XMLDocument()
-    if doc.load_file(file_path, options):
+    cdef XMLDocument doc = XMLDocument()
+    if doc._load_file(file_path, options, "parse_file"):
         return doc
     else:
         raise PygiXMLError(f"Failed to parse XML file: {file_path}")
 
 
+include "compress.pxi"
 include "stream.pxi"
+include "parallel.pxi"
+include "recordfile.pxi"
+include "queryset.pxi"
+include "index.pxi"
 
 include "objectify.pxi"
 include "dictify.pxi"
 include "jsonify.pxi"
+include "writer.pxi"
@@ -0,0 +1,422 @@
+# queryset.pxi
+# ------------
+# pygixml.QuerySet: evaluate many XPath expressions against one document.
+# Include AFTER stream.pxi: path-style expressions are compiled with its
+# _compile_path(), then handed to the C++ matcher below.
+#
+# Expressions in the path subset (child / descendant steps, name or '*',
+# [@attr], [@attr='v'] and [n] predicates, final text() or @attr) are
+# answered together in a single DFS over the tree.  Each visited node is
+# checked against the (query, step) states alive in its parent's frame,
+# and a subtree where no state is alive is skipped entirely.  Everything
+# else falls back to a compiled XPathQuery per expression.
+
+cdef extern from *:
+    """
+    #include <cstdint>
+    #include <cstring>
+    #include <string>
+    #include <utility>
+    #include <vector>
+    #include "pugixml.hpp"
+
+    struct PXPathPred {
+        bool        positional = false;
+        size_t      pos = 0;
+        std::string attr;
+        std::string value;
+        bool        has_value = false;
+    };
+
+    struct PXPathStep {
+        bool        descendant = false;
+        int         kind = 0;            // 0 element, 1 text(), 2 @attr
+        bool        any = true;          // '*' (or text())
+        std::string name;
+        uint64_t    hash = 0;            // px_name_hash(name)
+        std::vector<PXPathPred> preds;
+    };
+
+    struct PXPathQuery {
+        bool absolute = false;
+        int  first_state = 0;            // flat id of steps[0]
+        std::vector<PXPathStep> steps;
+    };
+
+    static inline uint64_t px_name_hash(const char* s) {
+        uint64_t h = 1469598103934665603ULL;              // FNV-1a
+        while (*s) { h ^= (unsigned char)*s++; h *= 1099511628211ULL; }
+        return h;
+    }
+
+    class PXQuerySet {
+    public:
+        std::vector<PXPathQuery> queries;
+
+        int add_query(bool absolute) {
+            queries.emplace_back();
+            queries.back().absolute = absolute;
+            return (int)queries.size() - 1;
+        }
+
+        void add_step(int q, bool descendant, int kind, const char* name) {
+            PXPathStep st;
+            st.descendant = descendant;
+            st.kind = kind;
+            st.any = name == nullptr;
+            if (name) { st.name = name; st.hash = px_name_hash(name); }
+            queries[q].steps.push_back(std::move(st));
+        }
+
+        void add_attr_pred(int q, const char* attr, const char* value) {
+            PXPathPred p;
+            p.attr = attr;
+            p.has_value = value != nullptr;
+            if (value) p.value = value;
+            queries[q].steps.back().preds.push_back(std::move(p));
+        }
+
+        void add_pos_pred(int q, size_t pos) {
+            PXPathPred p;
+            p.positional = true;
+            p.pos = pos;
+            queries[q].steps.back().preds.push_back(std::move(p));
+        }
+
+        // One DFS from `context`, answering every query whose `absolute`
+        // flag equals `absolute`; results[q] collects matches in document
+        // order.
+        //
+        // A state is one (query, step) pair, identified by a flat id.  The
+        // states alive for each open frame live in one shared pool (the
+        // DFS is a stack, so a frame's states are always the pool's tail
+        // while it is on top); sibling-position counters are pooled the
+        // same way.  `stamp` de-duplicates the states built for a node.
+        void run(pugi::xml_node context, bool absolute,
+                 std::vector<std::vector<pugi::xpath_node>>& results) {
+            struct Frame {
+                size_t begin, end;           // states in `pool`
+                size_t counters;             // first counter in `counts`
+                pugi::xml_node child;
+            };
+
+            int n_states = 0;
+            for (PXPathQuery& q : queries) {
+                q.first_state = n_states;
+                n_states += (int)q.steps.size();
+            }
+            state_query.assign(n_states, 0);
+            state_step.assign(n_states, 0);
+            for (int q = 0; q < (int)queries.size(); ++q)
+                for (int k = 0; k < (int)queries[q].steps.size(); ++k) {
+                    state_query[queries[q].first_state + k] = q;
+                    state_step[queries[q].first_state + k] = k;
+                }
+            std::vector<unsigned> stamp(n_states, 0);
+            unsigned generation = 0;
+
+            results.resize(queries.size());
+            pool.clear();
+            counts.clear();
+            for (const PXPathQuery& q : queries)
+                if (q.absolute == absolute) pool.push_back(q.first_state);
+            if (pool.empty()) return;
+            std::vector<Frame> stack;
+            stack.push_back(Frame{0, pool.size(), 0, context.first_child()});
+
+            std::vector<int> attrs_done;
+            while (!stack.empty()) {
+                Frame& f = stack.back();
+                pugi::xml_node c = f.child;
+                if (!c) {
+                    pool.resize(f.begin);
+                    counts.resize(f.counters);
+                    stack.pop_back();
+                    continue;
+                }
+                f.child = c.next_sibling();
+                size_t f_begin = f.begin, f_end = f.end;
+                bool element = c.type() == pugi::node_element;
+                uint64_t hash = element ? px_name_hash(c.name()) : 0;
+                size_t next_begin = pool.size();
+                size_t f_counters = f.counters;
+                ++generation;
+                attrs_done.clear();
+
+                for (size_t i = f_begin; i < f_end; ++i) {
+                    int id = pool[i];
+                    int q = state_query[id];
+                    const PXPathQuery& query = queries[q];
+                    const PXPathStep& st = query.steps[state_step[id]];
+                    if (st.kind == 2) {
+                        // A carried '//@attr' state: attributes of every
+                        // descendant element.
+                        if (element) {
+                            emit_attrs(c, st, q, attrs_done, results);
+                            add_state(id, stamp, generation);
+                        }
+                        continue;
+                    }
+                    if (st.descendant && element) add_state(id, stamp, generation);
+                    if (!matches(st, c, hash, id, f_counters)) continue;
+                    if (state_step[id] + 1 == (int)query.steps.size()) {
+                        results[q].push_back(pugi::xpath_node(c));
+                        continue;
+                    }
+                    const PXPathStep& nx = query.steps[state_step[id] + 1];
+                    if (nx.kind == 2) {
+                        emit_attrs(c, nx, q, attrs_done, results);
+                        if (nx.descendant) add_state(id + 1, stamp, generation);
+                    } else {
+                        add_state(id + 1, stamp, generation);
+                    }
+                }
+
+                if (pool.size() > next_begin && c.first_child()) {
+                    stack.push_back(Frame{next_begin, pool.size(), counts.size(),
+                                          c.first_child()});
+                } else {
+                    pool.resize(next_begin);
+                }
+            }
+        }
+
+    private:
+        std::vector<int> pool;
+        std::vector<std::pair<int, size_t>> counts;   // (state id << 8 | pred, n)
+        std::vector<int> state_query, state_step;
+
+        void add_state(int id, std::vector<unsigned>& stamp, unsigned generation) {
+            if (stamp[id] == generation) return;
+            stamp[id] = generation;
+            pool.push_back(id);
+        }
+
+        bool matches(const PXPathStep& st, pugi::xml_node c, uint64_t hash,
+                     int id, size_t first_counter) {
+            if (st.kind == 1)
+                return c.type() == pugi::node_pcdata || c.type() == pugi::node_cdata;
+            if (c.type() != pugi::node_element) return false;
+            if (!st.any && (st.hash != hash || strcmp(c.name(), st.name.c_str()) != 0))
+                return false;
+            for (size_t j = 0; j < st.preds.size(); ++j) {
+                const PXPathPred& p = st.preds[j];
+                if (p.positional) {
+                    // Position among the siblings that passed the name
+                    // test and every earlier predicate of this step.
+                    int key = (id << 8) | (int)j;
+                    size_t* n = nullptr;
+                    for (size_t i = first_counter; i < counts.size(); ++i)
+                        if (counts[i].first == key) { n = &counts[i].second; break; }
+                    if (!n) {
+                        counts.emplace_back(key, 0);
+                        n = &counts.back().second;
+                    }
+                    if (++*n != p.pos) return false;
+                } else {
+                    pugi::xml_attribute a = c.attribute(p.attr.c_str());
+                    if (!a) return false;
+                    if (p.has_value && p.value != a.value()) return false;
+                }
+            }
+            return true;
+        }
+
+        static void emit_attrs(pugi::xml_node c, const PXPathStep& st, int q,
+                               std::vector<int>& done,
+                               std::vector<std::vector<pugi::xpath_node>>& results) {
+            for (int d : done) if (d == q) return;
+            done.push_back(q);
+            for (pugi::xml_attribute a = c.first_attribute(); a; a = a.next_attribute())
+                if (st.any || st.name == a.name())
+                    results[q].push_back(pugi::xpath_node(a, c));
+        }
+    };
+    """
+    cdef cppclass PXQuerySet:
+        PXQuerySet() except +
+        int add_query(bint absolute) except +
+        void add_step(int q, bint descendant, int kind, const char* name) except +
+        void add_attr_pred(int q, const char* attr, const char* value) except +
+        void add_pos_pred(int q, size_t pos) except +
+        void run(xml_node context, bint absolute,
+                 vector[vector[xpath_node]]& results) except +
+
+
+cdef object _xpath_node_to_py(xpath_node xn):
+    cdef xml_attribute attr = xn.attribute()
+    if not attr.empty():
+        return XMLAttribute.create_from_cpp(attr, xn.parent())
+    return XMLNode.create_from_cpp(xn.node())
+
+
+cdef class QuerySet:
+    """Many XPath expressions evaluated together against one document.
+
+    Path-style expressions -- ``/`` and ``//`` steps with a name or
+    ``*``, ``[@attr]`` / ``[@attr='v']`` / ``[n]`` predicates, and an
+    optional final ``text()`` or ``@attr`` step -- are answered together
+    in **one** traversal of the tree.  Any other expression falls back to
+    its own compiled :class:`XPathQuery`.
+
+    .. note::
+       This is a **pygixml-specific feature**.
+
+    Args:
+        expressions (iterable[str]): XPath 1.0 expressions.  Duplicates
+            are evaluated once.
+
+    Example::
+
+        >>> qs = pygixml.QuerySet(['//item/@id', 'count(//item)', 'item[1]'])
+        >>> result = qs.evaluate(doc)
+        >>> [a.value for a in result['//item/@id']]
+        ['1', '2']
+        >>> result['count(//item)']
+        2.0
+    """
+    cdef PXQuerySet* _native
+    cdef list _expressions
+    cdef dict _slots             # expression -> native query index
+    cdef dict _fallback          # expression -> XPathQuery
+    cdef bint _has_absolute
+    cdef bint _has_relative
+
+    def __cinit__(self, expressions):
+        self._native = new PXQuerySet()
+        self._expressions = []
+        self._slots = {}
+        self._fallback = {}
+        cdef str expr
+        for expr in expressions:
+            if expr in self._slots or expr in self._fallback:
+                continue
+            self._expressions.append(expr)
+            try:
+                absolute, steps = _compile_path(expr)
+            except ValueError:
+                steps = None
+            # A leading '@attr' step selects the context's own attributes,
+            # which the child-driven traversal never visits.
+            if steps is None or ((<_PathStep>steps[0]).kind == _STEP_ATTRIBUTE
+                                 and not (<_PathStep>steps[0]).descendant):
+                self._fallback[expr] = XPathQuery(expr)
+            else:
+                self._slots[expr] = self._add_native(absolute, steps)
+
+    def __dealloc__(self):
+        if self._native != NULL:
+            del self._native
+
+    cdef int _add_native(self, bint absolute, list steps) except -1:
+        cdef int q = self._native.add_query(absolute)
+        cdef _PathStep step
+        cdef bytes name_b, attr_b, value_b
+        for step in steps:
+            name_b = step.name.encode("utf-8") if step.name is not None else None
+            self._native.add_step(q, step.descendant, step.kind,
+                                  <const char*>name_b if name_b is not None else NULL)
+            for pred in step.preds:
+                if pred[0] == "pos":
+                    self._native.add_pos_pred(q, pred[1])
+                else:
+                    attr_b = pred[1].encode("utf-8")
+                    value_b = pred[2].encode("utf-8") if pred[2] is not None else None
+                    self._native.add_attr_pred(
+                        q, attr_b, <const char*>value_b if value_b is not None else NULL)
+        if absolute:
+            self._has_absolute = True
+        else:
+            self._has_relative = True
+        return q
+
+    def __len__(self):
+        return len(self._expressions)
+
+    @property
+    def expressions(self):
+        """All expressions, in the order given (duplicates removed)."""
+        return list(self._expressions)
+
+    @property
+    def native(self):
+        """Expressions answered by the shared single-pass traversal."""
+        return [e for e in self._expressions if e in self._slots]
+
+    @property
+    def fallback(self):
+        """Expressions evaluated one by one with :class:`XPathQuery`."""
+        return [e for e in self._expressions if e in self._fallback]
+
+    def evaluate(self, context):
+        """Evaluate every expression against *context*.
+
+        Relative expressions are evaluated from *context*, absolute ones
+        from its document.  When *context* is the document itself, all
+        path-style expressions share one traversal (otherwise one for
+        each group).
+
+        Args:
+            context (XMLDocument | XMLNode): Context for the expressions
+
+        Returns:
+            dict: Maps each expression to its result -- a list of
+            :class:`XMLNode` / :class:`XMLAttribute` in document order for
+            node sets, or a ``float`` / ``str`` / ``bool`` for other
+            expressions.
+
+        Raises:
+            PygiXMLNullNodeError: If *context* is a null node
+        """
+        cdef xml_node ctx, root
+        if isinstance(context, XMLDocument):
+            ctx = pygixml_document_node((<XMLDocument>context)._doc)
+        elif isinstance(context, XMLNode):
+            ctx = (<XMLNode>context)._node
+        else:
+            raise TypeError(f"QuerySet.evaluate() expects XMLDocument or XMLNode, "
+                            f"got {type(context).__name__}")
+        if ctx.type() == node_null:
+            raise PygiXMLNullNodeError("Cannot evaluate a QuerySet on a null node")
+
+        cdef vector[vector[xpath_node]] results
+        if self._slots:
+            root = ctx
+            while root.parent().type() != node_null:
+                root = root.parent()
+            if root == ctx:
+                # Absolute and relative paths share the document context.
+                self._native.run(ctx, True, results)
+                self._native.run(ctx, False, results)
+            else:
+                if self._has_absolute:
+                    self._native.run(root, True, results)
+                if self._has_relative:
+                    self._native.run(ctx, False, results)
+
+        cdef dict out = {}
+        cdef XPathQuery query
+        cdef xpath_node_set node_set
+        cdef size_t j
+        cdef int q
+        cdef xpath_value_type rtype
+        for expr in self._expressions:
+            if expr in self._slots:
+                q = self._slots[expr]
+                out[expr] = [_xpath_node_to_py(results[q][j])
+                             for j in range(results[q].size())]
+                continue
+            query = <XPathQuery>self._fallback[expr]
+            rtype = query._query.return_type()
+            if rtype == xpath_type_node_set:
+                node_set = query._query.evaluate_node_set(ctx)
+                node_set.sort(False)    # reverse axes come back in reverse order
+                out[expr] = [_xpath_node_to_py(node_set[j])
+                             for j in range(node_set.size())]
+            elif rtype == xpath_type_number:
+                out[expr] = query._query.evaluate_number(ctx)
+            elif rtype == xpath_type_boolean:
+                out[expr] = query._query.evaluate_boolean(ctx)
+            else:
+                out[expr] = query._query.evaluate_string(ctx).decode("utf-8")
+        return out
@@ -0,0 +1,348 @@
+# recordfile.pxi
+# --------------
+# pygixml.build_record_index / RecordFile: random access to the records of
+# one big XML file.  Include AFTER stream.pxi (the scan uses PXFeed and the
+# records are parsed with PullParser) and parallel.pxi (_FEED_SIZE).
+#
+# build_record_index() tokenizes the memory-mapped file once and writes
+# the byte range of every outermost <tag> element -- plus an optional key,
+# an attribute or a child's text -- to a small binary file.  RecordFile
+# maps the XML again and parses only the bytes of the records asked for,
+# so a lookup costs one record, not a scan from the top of the file.
+#
+# Index layout (integers little-endian):
+#
+#     b"PGXRIDX1"
+#     uint32 header length, then a UTF-8 JSON header:
+#         {"tag", "key", "count", "size", "mtime_ns"}
+#     uint64[count] record starts, uint64[count] record ends
+#     int64[count]  key lengths in bytes (-1: record has no key)
+#     the UTF-8 keys, back to back
+
+import json
+import struct
+import sys
+
+from libc.string cimport memcmp
+
+
+cdef bytes _INDEX_MAGIC = b"PGXRIDX1"
+
+
+cdef inline bint _token_is(const char* arena, PXFeedToken* tok, bytes name):
+    return tok.a_len == <size_t>len(name) and \
+        memcmp(arena + tok.a_off, <const char*>name, tok.a_len) == 0
+
+
+cdef tuple _scan_records(object mapped, str tag, str key, size_t stack_size):
+    """Return ``(starts, ends, key_lengths, keys)`` for the outermost
+    *tag* elements of the mapped document."""
+    cdef const unsigned char[::1] data = mapped
+    cdef size_t n = data.shape[0]
+    cdef size_t pos = 0, step, i
+    cdef uint64_t bom = 0
+    if n >= 3 and data[0] == 0xEF and data[1] == 0xBB and data[2] == 0xBF:
+        bom = pos = 3
+
+    cdef bytes tag_b = tag.encode("utf-8")
+    cdef bint key_attr = key is not None and key.startswith("@")
+    cdef bint key_child = key is not None and not key_attr
+    cdef bytes key_b = (key[1:] if key_attr else key).encode("utf-8") if key else b""
+
+    starts = array.array("Q")
+    ends = array.array("Q")
+    key_lens = array.array("q")
+    cdef bytearray keys = bytearray()
+    cdef bytearray cur_key = bytearray()
+    cdef bint key_found = False, capturing = False
+    cdef Py_ssize_t depth = 0           # nesting inside the current record
+
+    cdef yxml_t x
+    cdef PXFeed feed
+    cdef PXFeedToken* tok
+    cdef const char* arena
+    cdef int ret
+    cdef unsigned char* stack = <unsigned char*>malloc(stack_size)
+    if stack is NULL:
+        raise MemoryError("could not allocate yxml parser stack")
+    yxml_init(&x, <void*>stack, stack_size)
+    try:
+        while pos < n:
+            step = min(<size_t>_FEED_SIZE, n - pos)
+            with nogil:
+                ret = feed.run(&x, &data[pos], step)
+            pos += step
+            arena = feed.arena.data()
+            for i in range(feed.tokens.size()):
+                tok = &feed.tokens[i]
+                if tok.kind == PX_TOK_START:
+                    if depth == 0:
+                        if _token_is(arena, tok, tag_b):
+                            depth = 1
+                            # the name and the byte after it are consumed
+                            starts.append(bom + tok.total - tok.a_len - 2)
+                            key_found = False
+                            del cur_key[:]
+                    else:
+                        depth += 1
+                        if capturing:           # text after this is a tail
+                            capturing = False
+                            key_found = True
+                        elif key_child and depth == 2 and not key_found \
+                                and _token_is(arena, tok, key_b):
+                            capturing = True
+                elif tok.kind == PX_TOK_ATTR:
+                    if depth == 1 and key_attr and not key_found \
+                            and _token_is(arena, tok, key_b):
+                        cur_key += arena[tok.b_off:tok.b_off + tok.b_len]
+                        key_found = True
+                elif tok.kind == PX_TOK_TEXT or tok.kind == PX_TOK_TEXT_PART:
+                    if capturing:
+                        cur_key += arena[tok.a_off:tok.a_off + tok.a_len]
+                elif tok.kind == PX_TOK_END and depth:
+                    if capturing:
+                        capturing = False
+                        key_found = True
+                    depth -= 1
+                    if depth == 0:
+                        ends.append(bom + tok.total)
+                        key_lens.append(len(cur_key) if key_found else -1)
+                        keys += cur_key
+            if ret != YXML_OK:
+                _raise_yxml_error(&x, ret)
+        ret = yxml_eof(&x)
+        if ret < 0:
+            _raise_yxml_error(&x, ret)
+    finally:
+        free(stack)
+        data = None
+    return starts, ends, key_lens, keys
+
+
+cdef inline void _to_little_endian(object arr):
+    if sys.byteorder == "big":
+        arr.byteswap()
+
+
+def build_record_index(path, str tag, key="@id", index_path=None,
+                       size_t stack_size=4096):
+    """Index the byte range of every *tag* record in a big XML file.
+
+    The file is memory-mapped and tokenized once; the start and end
+    offsets of each outermost *tag* element (a record nested in another
+    one is part of it) are written to a compact binary index, together
+    with a lookup key per record. Open the file with :class:`RecordFile`
+    to fetch records by position or key without reading the rest.
+
+    :param path: path of an uncompressed XML file.
+    :param tag: tag name of the records.
+    :param key: ``"@name"`` keys each record by its attribute *name*, a
+        plain name by the text of its first direct child of that tag
+        (as ``findtext``), and ``None`` stores no keys. Records without
+        the attribute or child have no key.
+    :param index_path: where to write the index (default: *path* with
+        ``.pgxidx`` appended). It is replaced atomically.
+    :param stack_size: see :class:`PullParser`.
+    :returns: the index path.
+    :raises PygiXMLError: if the document is malformed.
+    :raises ValueError: for compressed, empty or non-regular files, which
+        cannot be read at an offset.
+
+    Example::
+
+        pygixml.build_record_index("people.xml", "person", key="@id")
+        with pygixml.RecordFile("people.xml") as people:
+            print(people.get("p-1842").findtext("name"))
+    """
+    if not isinstance(path, (str, os.PathLike)):
+        raise TypeError(f"path must be str or os.PathLike, not {type(path).__name__}")
+    if not tag:
+        raise ValueError("tag must be a non-empty string")
+    if key is not None and (not isinstance(key, str) or key in ("", "@")):
+        raise ValueError(f"key must be '@attribute', a child tag or None, not {key!r}")
+    path = os.fspath(path)
+    index_path = os.fspath(index_path) if index_path is not None else path + ".pgxidx"
+
+    st = os.stat(path)
+    mapped = _map_input(path)
+    if mapped is None:
+        raise ValueError(f"cannot index {path!r}: not an uncompressed, "
+                         "non-empty regular file")
+    try:
+        starts, ends, key_lens, keys = _scan_records(mapped, tag, key, stack_size)
+    finally:
+        mapped.close()
+
+    header = json.dumps({"tag": tag, "key": key, "count": len(starts),
+                         "size": st.st_size, "mtime_ns": st.st_mtime_ns}).encode("utf-8")
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_INDEX_MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for arr in (starts, ends, key_lens):
+            _to_little_endian(arr)
+            arr.tofile(f)
+        f.write(keys)
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+cdef class RecordFile:
+    """Random access to the records of an XML file indexed by
+    :func:`build_record_index`.
+
+    The XML file is memory-mapped; each access parses only the bytes of
+    the records involved into a :class:`StreamElement` (or, with
+    :meth:`document`, an :class:`XMLDocument`). Records are numbered in
+    document order. The index remembers the size and modification time
+    of the file it was built from and is refused if either changed.
+
+    :param path: the indexed XML file.
+    :param index: the index file (default: *path* with ``.pgxidx``
+        appended).
+
+    Example::
+
+        with pygixml.RecordFile("orders.xml") as orders:
+            print(len(orders), orders[0].get("id"), orders[-1].get("id"))
+            order = orders.get("o-1001")
+            page = orders.slice(500, 550)
+    """
+    cdef object _mapped
+    cdef object _starts
+    cdef object _ends
+    cdef object _key_lens
+    cdef bytes _key_blob
+    cdef dict _by_key
+    cdef readonly str path
+    cdef readonly str tag
+    cdef readonly object key
+
+    def __init__(self, path, index=None):
+        path = os.fspath(path)
+        index = os.fspath(index) if index is not None else path + ".pgxidx"
+        with open(index, "rb") as f:
+            if f.read(len(_INDEX_MAGIC)) != _INDEX_MAGIC:
+                raise ValueError(f"{index!r} is not a pygixml record index")
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len))
+            count = header["count"]
+            self._starts = array.array("Q")
+            self._ends = array.array("Q")
+            self._key_lens = array.array("q")
+            for arr in (self._starts, self._ends, self._key_lens):
+                arr.fromfile(f, count)
+                _to_little_endian(arr)
+            self._key_blob = f.read()
+        st = os.stat(path)
+        if st.st_size != header["size"] or st.st_mtime_ns != header["mtime_ns"]:
+            raise PygiXMLError(f"record index {index!r} is out of date for {path!r}")
+        self.path = path
+        self.tag = header["tag"]
+        self.key = header["key"]
+        self._by_key = None
+        with open(path, "rb") as f:
+            self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        """Release the memory mapping. Safe to call more than once."""
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __repr__(self):
+        return f"RecordFile({self.path!r}, tag={self.tag!r}, records={len(self._starts)})"
+
+    cdef Py_ssize_t _position(self, Py_ssize_t n) except -1:
+        cdef Py_ssize_t count = len(self._starts)
+        if n < 0:
+            n += count
+        if not 0 <= n < count:
+            raise IndexError("record index out of range")
+        return n
+
+    cdef StreamElement _parse(self, Py_ssize_t n):
+        if self._mapped is None:
+            raise ValueError("RecordFile is closed")
+        cdef const unsigned char[::1] data = self._mapped
+        cdef size_t start = self._starts[n]
+        cdef size_t end = self._ends[n]
+        cdef PullParser parser = PullParser(tag=self.tag, retain="matched")
+        cdef StreamElement elem = None
+        try:
+            parser._consume(&data[start], end - start)
+            parser.close()
+        finally:
+            data = None
+        for _event, found in parser.read_events():
+            elem = <StreamElement>found         # the outermost record ends last
+        return elem
+
+    def raw(self, Py_ssize_t n):
+        """The bytes of record *n*, from its start tag to its end tag."""
+        n = self._position(n)
+        if self._mapped is None:
+            raise ValueError("RecordFile is closed")
+        return self._mapped[self._starts[n]:self._ends[n]]
+
+    def __getitem__(self, item):
+        """Record *item* as a :class:`StreamElement`, or a list of
+        records for a slice. Negative positions count from the end."""
+        if isinstance(item, slice):
+            return [self._parse(i) for i in range(*item.indices(len(self._starts)))]
+        return self._parse(self._position(item))
+
+    def __iter__(self):
+        cdef Py_ssize_t i
+        for i in range(len(self._starts)):
+            yield self._parse(i)
+
+    def slice(self, Py_ssize_t start, Py_ssize_t stop):
+        """Records ``start`` to ``stop - 1`` as a list (``self[start:stop]``)."""
+        return self[start:stop]
+
+    def document(self, Py_ssize_t n):
+        """Record *n* parsed by pugixml into an :class:`XMLDocument`."""
+        return parse_string(self.raw(n).decode("utf-8"))
+
+    cdef dict _keys(self):
+        cdef Py_ssize_t i, length, offset = 0
+        if self._by_key is None:
+            if self.key is None:
+                raise ValueError("this index was built with key=None")
+            by_key = {}
+            for i in range(len(self._key_lens)):
+                length = self._key_lens[i]
+                if length < 0:
+                    continue
+                value = self._key_blob[offset:offset + length].decode("utf-8")
+                offset += length
+                by_key.setdefault(value, i)     # first record wins
+            self._by_key = by_key
+        return self._by_key
+
+    def position(self, str key):
+        """Position of the first record with *key*, or ``None``."""
+        return self._keys().get(key)
+
+    def get(self, str key, default=None):
+        """The first record whose key is *key*, or *default*."""
+        n = self._keys().get(key)
+        return default if n is None else self._parse(n)
+
+    def __contains__(self, key):
+        return isinstance(key, str) and key in self._keys()
+
+    def keys(self):
+        """The distinct keys, in document order of their first record."""
+        return list(self._keys())
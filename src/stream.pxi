@@ -1200,6 +1200,192 @@ cdef extern from *:
     size_t yxml_symlen(yxml_t *x, const char *s)
 
 
+cdef extern from *:
+    """
+    #include <string>
+    #include <vector>
+
+    // Bytes that end a run of plain character data: markup, references,
+    // '\\r' (EOL normalization) and NUL (always an error).  Attribute
+    // values also stop at both quotes (the closing one is a stop, the
+    // other is passed through yxml) and at '\\t' / '\\n', which yxml
+    // normalizes to spaces.
+    static unsigned char px_content_stop[256];
+    static unsigned char px_attr_stop[256];
+
+    static bool px_init_stop_tables() {
+        const unsigned char content[] = {'<', '&', '\\r', 0};
+        const unsigned char attr[] = {'<', '&', '\\r', '\\n', '\\t', '"', '\\'', 0};
+        for (unsigned char c : content) px_content_stop[c] = 1;
+        for (unsigned char c : attr) px_attr_stop[c] = 1;
+        return true;
+    }
+    static const bool px_stop_tables_ready = px_init_stop_tables();
+
+    // Native feed loop behind PullParser.feed().  yxml is driven byte by
+    // byte only around markup; runs of plain content and attribute-value
+    // bytes are found with a table scan and appended in bulk, with the
+    // yxml position counters advanced as if each byte had been fed.  The
+    // result of one feed() is a flat list of coalesced tokens whose
+    // strings live in one arena, so Python objects are only created at
+    // element, attribute and text boundaries.
+    class PXFeed {
+    public:
+        enum { START = 1, ATTR, TEXT, TEXT_PART, END, PI };
+
+        struct Token {
+            int    kind;
+            size_t a_off, a_len;    // tag / attribute name / PI target / text
+            size_t b_off, b_len;    // attribute value / PI content
+            uint64_t total, byte;   // START: total at the byte after the name;
+            uint32_t line;          // END: just past the closing '>'
+        };
+
+        std::vector<Token> tokens;
+        std::string arena;
+
+        // Returns 0, or the yxml error code; tokens up to the error are kept.
+        int run(yxml_t* x, const unsigned char* p, size_t n) {
+            tokens.clear();
+            arena.clear();
+            const unsigned char* end = p + n;
+            while (p < end) {
+                if (!x->ignore) {
+                    if (x->state == YXMLS_misc2) {
+                        const unsigned char* q = scan(x, p, end, px_content_stop);
+                        text.append((const char*)p, q - p);
+                        p = q;
+                        if (p == end) break;
+                    } else if (x->state == YXMLS_attr3) {
+                        const unsigned char* q = p;
+                        while (q < end && !px_attr_stop[*q]) ++q;
+                        advance(x, p, q);
+                        attr_val.append((const char*)p, q - p);
+                        p = q;
+                        if (p == end) break;
+                    }
+                }
+                int r = yxml_parse(x, *p++);
+                switch (r) {
+                case YXML_OK:
+                    break;
+                case YXML_CONTENT:
+                    text += x->data;
+                    break;
+                case YXML_ELEMSTART:
+                    flush_text(TEXT);
+                    push(START, x->elem, yxml_symlen(x, x->elem));
+                    tokens.back().total = x->total;
+                    break;
+                case YXML_ELEMEND:
+                    flush_text(TEXT);
+                    push(END, nullptr, 0);
+                    tokens.back().total = x->total;
+                    tokens.back().byte = x->byte;
+                    tokens.back().line = x->line;
+                    break;
+                case YXML_ATTRSTART:
+                    attr_name.assign(x->attr, yxml_symlen(x, x->attr));
+                    attr_val.clear();
+                    break;
+                case YXML_ATTRVAL:
+                    attr_val += x->data;
+                    break;
+                case YXML_ATTREND:
+                    push(ATTR, attr_name.data(), attr_name.size(),
+                         attr_val.data(), attr_val.size());
+                    break;
+                case YXML_PISTART:
+                    flush_text(TEXT);
+                    pi_name.assign(x->pi, yxml_symlen(x, x->pi));
+                    pi_val.clear();
+                    break;
+                case YXML_PICONTENT:
+                    pi_val += x->data;
+                    break;
+                case YXML_PIEND:
+                    push(PI, pi_name.data(), pi_name.size(),
+                         pi_val.data(), pi_val.size());
+                    break;
+                default:
+                    flush_text(TEXT_PART);
+                    return r;
+                }
+            }
+            // Text still open at the end of the chunk continues in the
+            // next feed(); hand over what we have so far.
+            flush_text(TEXT_PART);
+            return 0;
+        }
+
+    private:
+        std::string text, attr_name, attr_val, pi_name, pi_val;
+
+        // Find the end of a run of non-stop bytes, keeping yxml's
+        // total / line / byte counters in step.
+        static const unsigned char* scan(yxml_t* x, const unsigned char* p,
+                                         const unsigned char* end,
+                                         const unsigned char* stop) {
+            const unsigned char* q = p;
+            while (q < end && !stop[*q]) ++q;
+            advance(x, p, q);
+            return q;
+        }
+
+        static void advance(yxml_t* x, const unsigned char* p,
+                            const unsigned char* q) {
+            if (p == q) return;
+            x->total += q - p;
+            const unsigned char* nl = nullptr;
+            for (const unsigned char* s = p;
+                 (s = (const unsigned char*)memchr(s, '\\n', q - s)) != nullptr; ++s) {
+                x->line++;
+                nl = s;
+            }
+            if (nl) x->byte = q - nl;
+            else x->byte += q - p;
+        }
+
+        void push(int kind, const char* a, size_t alen,
+                  const char* b = nullptr, size_t blen = 0) {
+            Token t;
+            t.kind = kind;
+            t.a_off = arena.size();
+            t.a_len = alen;
+            arena.append(a ? a : "", alen);
+            t.b_off = arena.size();
+            t.b_len = blen;
+            arena.append(b ? b : "", blen);
+            tokens.push_back(t);
+        }
+
+        void flush_text(int kind) {
+            if (text.empty()) return;
+            push(kind, text.data(), text.size());
+            text.clear();
+        }
+    };
+    """
+    cdef cppclass PXFeedToken "PXFeed::Token":
+        int kind
+        size_t a_off, a_len, b_off, b_len
+        uint64_t total, byte
+        uint32_t line
+
+    cdef cppclass PXFeed:
+        vector[PXFeedToken] tokens
+        string arena
+        int run(yxml_t* x, const unsigned char* p, size_t n) except + nogil
+
+    cdef enum:
+        PX_TOK_START "PXFeed::START"
+        PX_TOK_ATTR "PXFeed::ATTR"
+        PX_TOK_TEXT "PXFeed::TEXT"
+        PX_TOK_TEXT_PART "PXFeed::TEXT_PART"
+        PX_TOK_END "PXFeed::END"
+        PX_TOK_PI "PXFeed::PI"
+
+
 # ==========================================================================
 # pygixml.stream -- fast, generator-based streaming ("pull") XML parsing
 # ==========================================================================
@@ -1237,9 +1423,12 @@ cdef extern from *:
 
 from libc.stdlib cimport malloc, free
 from libc.string cimport strlen
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, PyBUF_SIMPLE
 from collections import deque
 import io
+import mmap
 import os
+import stat
 
 
 cdef enum:
@@ -1349,6 +1538,14 @@ cdef class StreamElement:
     def __repr__(self):
         return f"<StreamElement {self.tag!r} ({len(self._children)} children) at 0x{id(self):x}>"
 
+    def __reduce__(self):
+        return (StreamElement, (self.tag, self.attrib),
+                (self.text, self.tail, self._children))
+
+    def __setstate__(self, state):
+        self.text, self.tail, children = state
+        self._children = list(children)
+
     def __len__(self):
         return len(self._children)
 
@@ -1602,6 +1799,235 @@ cdef class StreamElement:
         parts.append("}")
 
 
+# Path-style XPath subset
+# -----------------------
+# stream_select() and QuerySet share one small compiler for path-style
+# XPath: child ('/') and descendant ('//') steps with a name or '*',
+# optional [@attr], [@attr='v'] and [n] predicates, and an optional
+# final text() or @attr step.  Each consumer rejects what it cannot run.
+#
+# stream_select() runs the compiled steps as an automaton inside
+# PullParser: every open element carries the set of step indexes still
+# "alive" at that depth, so deciding whether an element matches costs a
+# few comparisons against its tag and attributes.  Elements outside a
+# match are never linked into a tree, so they are dropped as soon as
+# they close; only matching subtrees are kept.
+
+cdef enum:
+    _STEP_ELEMENT = 0
+    _STEP_TEXT = 1
+    _STEP_ATTRIBUTE = 2
+
+
+cdef class _PathStep:
+    cdef bint descendant        # reached through '//' rather than '/'
+    cdef int kind               # _STEP_ELEMENT / _STEP_TEXT / _STEP_ATTRIBUTE
+    cdef str name               # None for '*'
+    cdef list preds             # ("attr", name, value-or-None) / ("pos", n)
+    cdef bint has_pos
+
+    def __cinit__(self, bint descendant, int kind, str name):
+        self.descendant = descendant
+        self.kind = kind
+        self.name = name
+        self.preds = []
+        self.has_pos = False
+
+
+cdef class _PathFrame:
+    cdef list states            # indexes of the steps still to be matched
+    cdef dict counters          # (step, predicate) -> siblings seen so far
+    cdef bint captured          # inside a matching subtree
+    cdef bint matched           # this element completes the path
+
+    def __cinit__(self, list states, bint captured, bint matched):
+        self.states = states
+        self.counters = None
+        self.captured = captured
+        self.matched = matched
+
+
+cdef inline bint _is_path_delim(Py_UCS4 c):
+    return c in u"/[]@='\" \t\r\n"
+
+
+cdef inline bint _is_path_name(str name):
+    if not name or name[0] in u".-0123456789" or "::" in name:
+        return False
+    for c in name:
+        if _is_path_delim(c) or c in u"()|,$<>!*+":
+            return False
+    return True
+
+
+cdef _path_error(str expr, str why):
+    raise ValueError(f"unsupported path expression {expr!r}: {why}")
+
+
+cdef _compile_predicate(str expr, _PathStep step, str pred):
+    cdef str name, value
+    if pred.isdigit():
+        if int(pred) < 1:
+            _path_error(expr, "positions start at 1")
+        step.preds.append(("pos", int(pred)))
+        step.has_pos = True
+        return
+    if not pred.startswith("@"):
+        _path_error(expr, f"predicate [{pred}] (only [@attr], [@attr='v'] and [n])")
+    name, sep, value = pred[1:].partition("=")
+    name = name.strip()
+    if not name or not _is_path_name(name):
+        _path_error(expr, f"bad attribute name in [{pred}]")
+    if not sep:
+        step.preds.append(("attr", name, None))
+        return
+    value = value.strip()
+    if (len(value) < 2 or value[0] not in "'\"" or value[-1] != value[0]
+            or value[0] in value[1:-1]):
+        _path_error(expr, f"attribute value in [{pred}] must be a quoted string")
+    step.preds.append(("attr", name, value[1:-1]))
+
+
+cdef tuple _compile_path(str expr):
+    """Compile a path-style expression into ``(absolute, steps)``.
+
+    Raises ValueError for anything outside the subset.
+    """
+    cdef str e = expr.strip()
+    cdef Py_ssize_t i = 0, n = len(e), start
+    cdef bint absolute = e.startswith("/")
+    cdef bint descendant
+    cdef int kind
+    cdef _PathStep step
+    cdef list steps = []
+    cdef str name
+    while i < n:
+        if i == 0 and not absolute:
+            descendant = False
+        elif e[i] != "/":
+            _path_error(expr, f"expected '/' at offset {i}")
+        else:
+            descendant = e.startswith("//", i)
+            i += 2 if descendant else 1
+        if steps and (<_PathStep>steps[len(steps) - 1]).kind != _STEP_ELEMENT:
+            _path_error(expr, "text() and @attr must be the last step")
+        kind = _STEP_ELEMENT
+        if i < n and e[i] == "@":
+            kind = _STEP_ATTRIBUTE
+            i += 1
+        start = i
+        while i < n and not _is_path_delim(e[i]):
+            i += 1
+        name = e[start:i]
+        if kind == _STEP_ELEMENT and name == "text()":
+            kind = _STEP_TEXT
+        elif not name:
+            _path_error(expr, f"missing name at offset {start}")
+        elif name != "*" and not _is_path_name(name):
+            _path_error(expr, f"{name!r} is not a plain name")
+        step = _PathStep(descendant, kind,
+                         None if name == "*" or kind == _STEP_TEXT else name)
+        while i < n and e[i] == "[":
+            if kind != _STEP_ELEMENT:
+                _path_error(expr, "predicates are only supported on element steps")
+            start = i + 1
+            i = e.find("]", start)
+            if i < 0:
+                _path_error(expr, "unterminated predicate")
+            _compile_predicate(expr, step, e[start:i].strip())
+            i += 1
+        steps.append(step)
+    if not steps:
+        _path_error(expr, "no steps")
+    return absolute, steps
+
+
+cdef class _StreamPath:
+    """Compiled form of a :func:`stream_select` expression."""
+
+    cdef str expr
+    cdef list steps
+    cdef bint text
+    cdef list frames
+
+    def __cinit__(self, str expr):
+        self.expr = expr
+        absolute, self.steps = _compile_path(expr)
+        if not absolute:
+            _path_error(expr, "the path must be absolute (start with '/' or '//')")
+        last = <_PathStep>self.steps[len(self.steps) - 1]
+        if last.kind == _STEP_ATTRIBUTE:
+            _path_error(expr, "attribute steps are not supported when streaming")
+        self.text = last.kind == _STEP_TEXT
+        if self.text:
+            if last.descendant or len(self.steps) == 1:
+                _path_error(expr, "text() is only supported as a final '/text()' step")
+            self.steps.pop()
+        self.frames = [_PathFrame([0], False, False)]
+
+    cdef bint _step_matches(self, _PathStep step, Py_ssize_t k,
+                            StreamElement elem, _PathFrame parent):
+        cdef Py_ssize_t j
+        cdef tuple pred
+        if step.name is not None and step.name != elem.tag:
+            return False
+        for j in range(len(step.preds)):
+            pred = <tuple>step.preds[j]
+            if pred[0] == "attr":
+                value = elem.attrib.get(pred[1])
+                if value is None or (pred[2] is not None and value != pred[2]):
+                    return False
+            else:
+                # Position among the parent's children that passed the
+                # name test and every earlier predicate of this step.
+                if parent.counters is None:
+                    parent.counters = {}
+                key = (k, j)
+                count = parent.counters.get(key, 0) + 1
+                parent.counters[key] = count
+                if count != pred[1]:
+                    return False
+        return True
+
+    cdef bint enter(self, StreamElement elem):
+        """Push *elem*'s frame; return True if it belongs to a match
+        (and so must be linked into its parent)."""
+        cdef _PathFrame parent = <_PathFrame>self.frames[len(self.frames) - 1]
+        cdef list states = []
+        cdef bint matched = False
+        cdef Py_ssize_t k, last = len(self.steps) - 1
+        cdef _PathStep step
+        for k in parent.states:
+            step = <_PathStep>self.steps[k]
+            if step.descendant and k not in states:
+                states.append(k)
+            if self._step_matches(step, k, elem, parent):
+                if k == last:
+                    matched = True
+                elif k + 1 not in states:
+                    states.append(k + 1)
+        self.frames.append(_PathFrame(states, parent.captured or matched, matched))
+        return parent.captured
+
+    cdef inline bint capturing(self):
+        return (<_PathFrame>self.frames[len(self.frames) - 1]).captured
+
+    cdef void leave(self, StreamElement elem, object queue):
+        """Pop *elem*'s frame and queue what a match emits: the element
+        itself, or -- for ``/text()`` -- each of its text nodes."""
+        cdef _PathFrame frame = <_PathFrame>self.frames.pop()
+        if not frame.matched:
+            return
+        if not self.text:
+            queue.append(("end", elem))
+            return
+        if elem.text is not None:
+            queue.append(("end", elem.text))
+        for child in elem._children:
+            if (<StreamElement>child).tail is not None:
+                queue.append(("end", (<StreamElement>child).tail))
+
+
 cdef class PullParser:
     """An incremental ("push") XML parser.
 
@@ -1612,19 +2038,53 @@ cdef class PullParser:
     This is the low-level engine behind :func:`iterparse`; use it
     directly when XML data arrives incrementally (e.g. from a socket or
     an async stream) rather than from a file you can simply read in
-    chunks.
+    chunks. For ``asyncio`` streams, :func:`aiterparse` wraps this loop.
 
     :param events: subset of ``("start", "end", "pi")`` -- which events
-        :meth:`read_events` produces. The element tree is always built
-        regardless of *events*; this only controls what is yielded.
+        :meth:`read_events` produces (default ``("end",)``). The element
+        tree is always built regardless of *events*; this only controls
+        what is yielded.
     :param tag: if given, only elements whose tag equals *tag* produce
         ``"start"``/``"end"`` events (their subtrees are still built and
-        linked into the document as usual).
+        linked into the document as usual, unless *retain* is
+        ``"matched"``).
     :param stack_size: size in bytes of yxml's internal name stack. Must
         be large enough to hold the names of all simultaneously-open
         elements/attributes/PIs plus their nesting depth (each name is
         stored with a trailing NUL). Increase this for documents with
         very deep nesting or very long tag/attribute names.
+    :param retain: ``"all"`` (default) builds every element. With
+        ``"matched"`` -- which requires *tag* -- only elements matching
+        *tag* and their descendants become :class:`StreamElement`
+        objects; the elements around them are tracked by name only and
+        their text is discarded. A matched element is never linked to
+        an ancestor (its ``tail`` stays ``None``), so it is freed as
+        soon as the caller drops it and memory stays bounded by one
+        matched subtree.
+    :param release: if true, every element delivered with an ``"end"``
+        event is removed from its parent's children once the consumer
+        of :meth:`read_events` moves past it, so processed elements do
+        not accumulate in the tree even without :meth:`StreamElement.clear`.
+    :param checkpoints: if true, element boundaries are recorded so that
+        :meth:`checkpoint` can be called. Off by default: the bookkeeping
+        costs an allocation per element.
+    :param resume_from: a state returned by :meth:`checkpoint`. The
+        parser starts out as it was at that point -- the open elements
+        are rebuilt with their tags and attributes (but no text or
+        earlier children) and no events are produced for them -- and
+        expects to be fed the input that follows the checkpoint's
+        ``offset``. :meth:`iterparse` seeks its source there itself.
+    :param mode: ``"tree"`` (default) produces the events above. With
+        ``"raw"`` no elements are built at all: :meth:`read_events`
+        yields flat tuples -- ``("start", tag, attrs)``, ``("text",
+        text)``, ``("end", tag)`` and ``("pi", target, content)`` --
+        where *attrs* is a flat ``(name, value, name, value, ...)`` tuple,
+        as with pyexpat's ``ordered_attributes``. *events* may
+        then also include ``"text"`` and defaults to ``("start", "text",
+        "end")``; every run of character data between two pieces of
+        markup is one ``"text"`` event, whitespace included. *tag*,
+        ``retain="matched"``, *release* and *checkpoints* only apply to
+        trees. This is the cheapest way to consume a document SAX-style.
 
     Example::
 
@@ -1639,6 +2099,7 @@ cdef class PullParser:
     """
 
     cdef yxml_t _x
+    cdef PXFeed _feed
     cdef unsigned char *_stack_buf
     cdef object _queue
     cdef object _pending
@@ -1652,11 +2113,44 @@ cdef class PullParser:
     cdef bint _want_start
     cdef bint _want_end
     cdef bint _want_pi
+    cdef bint _want_text
+    cdef bint _raw
+    cdef str _raw_tag
+    cdef list _raw_attrs
     cdef str _tag_filter
-
-    def __cinit__(self, events=("end",), tag=None, size_t stack_size=4096):
+    cdef bint _retain_matched
+    cdef list _skipped
+    cdef bint _release
+    cdef object _parents
+    cdef object _last_closed
+    cdef object _frame
+    cdef bint _track
+    cdef tuple _mark
+    cdef Py_ssize_t _handed
+    cdef Py_ssize_t _skip
+    cdef bint _end_seen
+    cdef uint64_t _end_total
+    cdef uint64_t _end_byte
+    cdef uint32_t _end_line
+    cdef object _end_frame
+    cdef Py_ssize_t _open_matches
+    cdef uint64_t _resume_offset
+    cdef _StreamPath _path
+
+    def __cinit__(self, events=None, tag=None, size_t stack_size=4096,
+                  str retain="all", bint release=False, bint checkpoints=False,
+                  resume_from=None, str mode="tree"):
         if stack_size < 64:
             raise ValueError("stack_size must be at least 64 bytes")
+        if retain not in ("all", "matched"):
+            raise ValueError(f"retain must be 'all' or 'matched', not {retain!r}")
+        if retain == "matched" and tag is None:
+            raise ValueError("retain='matched' requires a tag")
+        if mode not in ("tree", "raw"):
+            raise ValueError(f"mode must be 'tree' or 'raw', not {mode!r}")
+        self._raw = mode == "raw"
+        if self._raw and (tag is not None or retain != "all" or release or checkpoints):
+            raise ValueError("tag, retain, release and checkpoints need mode='tree'")
 
         self._stack_buf = <unsigned char*>malloc(stack_size)
         if self._stack_buf is NULL:
@@ -1673,14 +2167,50 @@ cdef class PullParser:
         self._cur_pi = None
         self._closed = False
 
+        if events is None:
+            events = ("start", "text", "end") if self._raw else ("end",)
         cdef tuple ev = tuple(events)
         for e in ev:
-            if e not in ("start", "end", "pi"):
+            if e not in ("start", "end", "pi") and not (self._raw and e == "text"):
                 raise ValueError(f"unknown event type: {e!r}")
         self._want_start = "start" in ev
         self._want_end = "end" in ev
         self._want_pi = "pi" in ev
+        self._want_text = "text" in ev
         self._tag_filter = tag
+        self._retain_matched = retain == "matched"
+        # Names of the open elements outside any matched subtree (all open
+        # elements in raw mode).
+        self._skipped = []
+        self._release = release
+        # Parent (or None) of each queued "end" element, when releasing.
+        self._parents = deque()
+        # The element that closed most recently in the current one: text
+        # that follows it is its tail.
+        self._last_closed = None
+        self._track = checkpoints
+        # The open elements (StreamElement or skipped name) as an immutable
+        # (item, parent_frame) chain, so an element boundary can be
+        # remembered for checkpoint() without copying the stack.
+        self._frame = None
+        # (total, line, byte, frame) just after the last element end whose
+        # events have all been handed out. The latest end is kept in the
+        # _end_* fields and only queued, as a 4-tuple, once an event
+        # follows it.
+        self._mark = (0, 1, 0, None)
+        # Events handed out by read_events() since _mark, and how many of
+        # the first events to drop after a resume: a checkpoint cannot be
+        # taken inside a match, so events of nested matches and a "start"
+        # that were already consumed sit behind its mark.
+        self._handed = 0
+        self._skip = 0
+        self._end_seen = False
+        # Open elements matching *tag*: no checkpoint is taken inside one,
+        # so a resumed parser never produces a partial match.
+        self._open_matches = 0
+        self._resume_offset = 0
+        if resume_from is not None:
+            self._restore(resume_from)
 
     def __dealloc__(self):
         if self._stack_buf is not NULL:
@@ -1701,106 +2231,331 @@ cdef class PullParser:
     def closed(self):
         return self._closed
 
+    @property
+    def resume_offset(self):
+        """Byte offset in the input (after any BOM) at which a parser
+        created with *resume_from* continues; 0 otherwise."""
+        return self._resume_offset
+
+    def checkpoint(self):
+        """Return a state from which parsing can later resume.
+
+        The state describes the input position just after the last
+        element end whose events have all been taken from
+        :meth:`read_events` and that lies outside any element matching
+        *tag*, plus the number of events taken since then -- so calling
+        this after processing an event resumes right behind it, even
+        inside a match: the events already taken (a ``"start"``, or the
+        ``"end"`` of a match nested in another) are parsed again but not
+        produced a second time. Resume with the same *events*, *tag*
+        and *retain* arguments.
+
+        The state is a ``dict`` of plain ``int``/``str``/``list``/``dict``
+        values that survives :mod:`json` or :mod:`pickle`:
+
+        * ``offset`` -- bytes of input consumed, not counting a BOM;
+        * ``line``, ``column`` -- the position, for error messages;
+        * ``skip`` -- events past ``offset`` that were already taken;
+        * ``stack`` -- ``[tag, attrib]`` for each open element, outermost
+          first (*attrib* is empty for elements skipped by
+          ``retain="matched"``).
+
+        yxml's own state at an element boundary is fully determined by
+        the open elements, so it is rebuilt from ``stack`` on resume
+        rather than stored.
+
+        Pass the state as *resume_from* to :class:`PullParser`,
+        :func:`iterparse` or :func:`iterfind`. Requires a parser created
+        with ``checkpoints=True``.
+        """
+        if not self._track:
+            raise PygiXMLError("checkpoint() needs PullParser(checkpoints=True)")
+        while self._queue and len(<tuple>self._queue[0]) == 4:
+            self._mark = <tuple>self._queue.popleft()
+            self._handed = 0
+        total, line, byte, frame = self._mark
+        stack = []
+        while frame is not None:
+            item = frame[0]
+            if isinstance(item, StreamElement):
+                stack.append([(<StreamElement>item).tag, dict((<StreamElement>item).attrib)])
+            else:
+                stack.append([item, {}])
+            frame = frame[1]
+        stack.reverse()
+        return {"version": 1, "offset": total, "line": line, "column": byte,
+                "stack": stack, "skip": self._handed}
+
+    cdef _restore(self, state):
+        """Put a fresh parser into the state described by a checkpoint."""
+        try:
+            if state["version"] != 1:
+                raise ValueError(f"unsupported checkpoint version {state['version']!r}")
+            offset = state["offset"]
+            line = state["line"]
+            column = state["column"]
+            stack = state["stack"]
+            skip = state.get("skip", 0)
+        except (KeyError, TypeError, AttributeError):
+            raise ValueError("resume_from is not a PullParser checkpoint") from None
+        self._skip = skip
+        if offset == 0:
+            return
+        prefix = _resume_prefix(list(stack))
+        self._consume(prefix, len(prefix))
+        if self._raw:
+            self._raw_start()
+        else:
+            self._finalize_pending()
+        self._queue.clear()
+        self._parents.clear()
+        if self._elem_stack:
+            # The text after the checkpoint is the tail of an element that
+            # is not rebuilt; let it land somewhere harmless.
+            self._last_closed = StreamElement("")
+        self._x.total = offset
+        self._x.line = line
+        self._x.byte = column
+        self._mark = (offset, line, column, self._frame)
+        self._resume_offset = offset
+
+    cdef inline bint _keeps_text(self):
+        if self._path is not None:
+            return self._path.capturing()
+        return not self._retain_matched or len(self._elem_stack) > 0
+
     cdef inline void _flush_text(self):
         if not self._text_buf:
             return
+        if not self._keeps_text():
+            self._text_buf = bytearray()
+            return
         text = self._text_buf.decode("utf-8")
         self._text_buf = bytearray()
+        self._attach_text(text)
+
+    cdef inline void _attach_text(self, str text):
         if self._elem_stack:
-            cur = <StreamElement>self._elem_stack[len(self._elem_stack) - 1]
-            if cur._children:
-                (<StreamElement>cur._children[len(cur._children) - 1]).tail = text
+            if self._last_closed is not None:
+                (<StreamElement>self._last_closed).tail = text
             else:
-                cur.text = text
+                (<StreamElement>self._elem_stack[len(self._elem_stack) - 1]).text = text
 
     cdef inline void _finalize_pending(self):
         cdef StreamElement elem
         if self._pending is not None:
             elem = <StreamElement>self._pending
             self._pending = None
-            if self._elem_stack:
+            if self._path is not None:
+                if self._path.enter(elem):
+                    (<StreamElement>self._elem_stack[len(self._elem_stack) - 1])._children.append(elem)
+            elif self._elem_stack:
                 (<StreamElement>self._elem_stack[len(self._elem_stack) - 1])._children.append(elem)
+            if self._tag_filter is not None and elem.tag == self._tag_filter:
+                self._open_matches += 1
             if self._want_start and (self._tag_filter is None or elem.tag == self._tag_filter):
+                self._queue_mark()
                 self._queue.append(("start", elem))
             self._elem_stack.append(elem)
+            if self._track:
+                self._frame = (elem, self._frame)
+            self._last_closed = None
 
-    def feed(self, bytes data):
+    cdef inline void _queue_mark(self):
+        """Move the latest element end behind the events queued so far."""
+        if not self._end_seen:
+            return
+        self._end_seen = False
+        mark = (self._end_total, self._end_line, self._end_byte, self._end_frame)
+        if self._queue:
+            self._queue.append(mark)
+        else:
+            self._mark = mark
+            self._handed = 0
+
+    def feed(self, data):
         """Feed a chunk of well-formed, UTF-8 encoded XML bytes.
 
+        *data* may be ``bytes`` or any contiguous buffer -- a
+        ``bytearray``, ``memoryview`` or ``mmap`` slice -- and is read in
+        place without copying, so a receive buffer can be reused for the
+        next chunk as soon as this returns.
+
         Completed events become available through :meth:`read_events`.
         Raises :class:`PygiXMLError` on malformed XML.
         """
         if self._closed:
             raise PygiXMLError("PullParser is already closed")
 
-        cdef Py_ssize_t i, n = len(data)
-        cdef unsigned char c
+        cdef Py_buffer view
+        PyObject_GetBuffer(data, &view, PyBUF_SIMPLE)
+        try:
+            self._consume(<const unsigned char*>view.buf, <size_t>view.len)
+        finally:
+            PyBuffer_Release(&view)
+
+    cdef int _consume(self, const unsigned char* data, size_t n) except -1:
+        """Tokenize *n* bytes at *data* and turn the tokens into events;
+        the body of :meth:`feed`, also used to feed straight from a
+        memory-mapped file."""
         cdef int ret
-        cdef Py_ssize_t symlen
-        cdef bytes name
-        cdef char *cdata
-        cdef StreamElement elem
+        with nogil:
+            ret = self._feed.run(&self._x, data, n)
+        if self._raw:
+            self._raw_tokens()
+            if ret != YXML_OK:
+                _raise_yxml_error(&self._x, ret)
+            return 0
 
-        for i in range(n):
-            c = data[i]
-            ret = yxml_parse(&self._x, c)
+        cdef const char* arena = self._feed.arena.data()
+        cdef PXFeedToken* tok
+        cdef StreamElement elem
+        cdef size_t i
 
-            if ret == YXML_OK:
-                continue
+        for i in range(self._feed.tokens.size()):
+            tok = &self._feed.tokens[i]
 
-            elif ret == YXML_ELEMSTART:
+            if tok.kind == PX_TOK_START:
                 self._finalize_pending()
                 self._flush_text()
-                symlen = <Py_ssize_t>yxml_symlen(&self._x, self._x.elem)
-                name = self._x.elem[:symlen]
-                self._pending = StreamElement(name.decode("utf-8"))
-
-            elif ret == YXML_CONTENT:
+                name = arena[tok.a_off:tok.a_off + tok.a_len].decode("utf-8")
+                if self._retain_matched and not self._elem_stack \
+                        and name != self._tag_filter:
+                    self._skipped.append(name)
+                    if self._track:
+                        self._frame = (name, self._frame)
+                else:
+                    self._pending = StreamElement(name)
+
+            elif tok.kind == PX_TOK_ATTR:
+                if self._pending is None:   # attribute of a skipped element
+                    continue
+                (<StreamElement>self._pending).attrib[
+                    arena[tok.a_off:tok.a_off + tok.a_len].decode("utf-8")] = \
+                    arena[tok.b_off:tok.b_off + tok.b_len].decode("utf-8")
+
+            elif tok.kind == PX_TOK_TEXT:
+                # A complete run of character data: skip the buffer when
+                # nothing from an earlier chunk is waiting in it.
                 self._finalize_pending()
-                cdata = self._x.data
-                self._text_buf += cdata[:<Py_ssize_t>strlen(cdata)]
+                if self._text_buf:
+                    self._text_buf += arena[tok.a_off:tok.a_off + tok.a_len]
+                    self._flush_text()
+                elif self._keeps_text():
+                    self._attach_text(
+                        arena[tok.a_off:tok.a_off + tok.a_len].decode("utf-8"))
+
+            elif tok.kind == PX_TOK_TEXT_PART:
+                self._finalize_pending()
+                self._text_buf += arena[tok.a_off:tok.a_off + tok.a_len]
 
-            elif ret == YXML_ELEMEND:
+            elif tok.kind == PX_TOK_END:
                 self._finalize_pending()
                 self._flush_text()
-                elem = <StreamElement>self._elem_stack.pop()
-                if self._want_end and (self._tag_filter is None or elem.tag == self._tag_filter):
-                    self._queue.append(("end", elem))
-
-            elif ret == YXML_ATTRSTART:
-                symlen = <Py_ssize_t>yxml_symlen(&self._x, self._x.attr)
-                name = self._x.attr[:symlen]
-                self._cur_attr = name.decode("utf-8")
-                self._attrval_buf = bytearray()
-
-            elif ret == YXML_ATTRVAL:
-                cdata = self._x.data
-                self._attrval_buf += cdata[:<Py_ssize_t>strlen(cdata)]
-
-            elif ret == YXML_ATTREND:
-                (<StreamElement>self._pending).attrib[self._cur_attr] = \
-                    self._attrval_buf.decode("utf-8")
-                self._cur_attr = None
-
-            elif ret == YXML_PISTART:
+                if self._track:
+                    self._frame = self._frame[1]
+                if not self._elem_stack:    # only when retain="matched"
+                    self._skipped.pop()
+                else:
+                    elem = <StreamElement>self._elem_stack.pop()
+                    self._last_closed = elem
+                    if self._tag_filter is not None and elem.tag == self._tag_filter:
+                        self._open_matches -= 1
+                    if self._path is not None:
+                        self._queue_mark()
+                        self._path.leave(elem, self._queue)
+                    elif self._want_end and (self._tag_filter is None or elem.tag == self._tag_filter):
+                        self._queue_mark()
+                        self._queue.append(("end", elem))
+                        if self._release:
+                            self._parents.append(
+                                self._elem_stack[len(self._elem_stack) - 1]
+                                if self._elem_stack else None)
+                # A possible checkpoint, unless inside a match.
+                if self._track and not self._open_matches:
+                    self._end_seen = True
+                    self._end_total = tok.total
+                    self._end_line = tok.line
+                    self._end_byte = tok.byte
+                    self._end_frame = self._frame
+
+            else:   # PX_TOK_PI
                 self._finalize_pending()
                 self._flush_text()
-                symlen = <Py_ssize_t>yxml_symlen(&self._x, self._x.pi)
-                name = self._x.pi[:symlen]
-                self._cur_pi = name.decode("utf-8")
-                self._pi_buf = bytearray()
-
-            elif ret == YXML_PICONTENT:
-                cdata = self._x.data
-                self._pi_buf += cdata[:<Py_ssize_t>strlen(cdata)]
-
-            elif ret == YXML_PIEND:
                 if self._want_pi:
-                    self._queue.append(("pi", (self._cur_pi, self._pi_buf.decode("utf-8"))))
-                self._cur_pi = None
-
-            else:
-                _raise_yxml_error(&self._x, ret)
+                    self._queue_mark()
+                    self._queue.append((
+                        "pi",
+                        (arena[tok.a_off:tok.a_off + tok.a_len].decode("utf-8"),
+                         arena[tok.b_off:tok.b_off + tok.b_len].decode("utf-8"))))
+
+        self._queue_mark()
+        if ret != YXML_OK:
+            _raise_yxml_error(&self._x, ret)
+        return 0
+
+    cdef inline void _raw_start(self):
+        """Queue the start tag whose attributes have all been seen."""
+        if self._raw_tag is not None:
+            if self._want_start:
+                self._queue.append(("start", self._raw_tag,
+                                    tuple(self._raw_attrs) if self._raw_attrs else ()))
+            self._raw_tag = None
+
+    cdef inline void _raw_text(self):
+        """Queue the text collected across feeds, if any."""
+        if self._text_buf:
+            if self._want_text:
+                self._queue.append(("text", self._text_buf.decode("utf-8")))
+            self._text_buf = bytearray()
+
+    cdef int _raw_tokens(self) except -1:
+        """Turn the tokens of one feed into ``mode="raw"`` events: no
+        elements, just the open tag names for the ``"end"`` events."""
+        cdef const char* arena = self._feed.arena.data()
+        cdef PXFeedToken* tok
+        cdef size_t i
+        cdef list names = self._skipped
+
+        for i in range(self._feed.tokens.size()):
+            tok = &self._feed.tokens[i]
+            if tok.kind == PX_TOK_ATTR:
+                if self._want_start:
+                    if self._raw_attrs is None:
+                        self._raw_attrs = []
+                    self._raw_attrs.append(
+                        arena[tok.a_off:tok.a_off + tok.a_len].decode("utf-8"))
+                    self._raw_attrs.append(
+                        arena[tok.b_off:tok.b_off + tok.b_len].decode("utf-8"))
+                continue
+            self._raw_start()
+            if tok.kind == PX_TOK_TEXT:
+                if self._text_buf:
+                    self._text_buf += arena[tok.a_off:tok.a_off + tok.a_len]
+                    self._raw_text()
+                elif self._want_text:
+                    self._queue.append((
+                        "text", arena[tok.a_off:tok.a_off + tok.a_len].decode("utf-8")))
+            elif tok.kind == PX_TOK_TEXT_PART:
+                self._text_buf += arena[tok.a_off:tok.a_off + tok.a_len]
+            elif tok.kind == PX_TOK_START:
+                self._raw_text()
+                self._raw_tag = arena[tok.a_off:tok.a_off + tok.a_len].decode("utf-8")
+                self._raw_attrs = None
+                names.append(self._raw_tag)
+            elif tok.kind == PX_TOK_END:
+                self._raw_text()
+                name = names.pop()
+                if self._want_end:
+                    self._queue.append(("end", name))
+            else:   # PX_TOK_PI
+                self._raw_text()
+                if self._want_pi:
+                    self._queue.append((
+                        "pi",
+                        arena[tok.a_off:tok.a_off + tok.a_len].decode("utf-8"),
+                        arena[tok.b_off:tok.b_off + tok.b_len].decode("utf-8")))
+        return 0
 
     def close(self):
         """Signal end-of-input.
@@ -1815,9 +2570,13 @@ cdef class PullParser:
         cdef int ret = yxml_eof(&self._x)
         if ret < 0:
             _raise_yxml_error(&self._x, ret)
-        self._finalize_pending()
-        self._flush_text()
-        if self._elem_stack:
+        if self._raw:
+            self._raw_start()
+            self._raw_text()
+        else:
+            self._finalize_pending()
+            self._flush_text()
+        if self._elem_stack or self._skipped:
             raise PygiXMLError("unexpected end of input: unclosed element(s)")
 
     def read_events(self):
@@ -1829,14 +2588,72 @@ cdef class PullParser:
         ``"pi"``, *value* is a ``(target, content)`` tuple.
 
         Draining this generator removes the events from the internal
-        queue -- each event is only produced once.
+        queue -- each event is only produced once. With ``release=True``
+        an ``"end"`` element is detached from its parent when the
+        generator is resumed after yielding it, or closed.
         """
+        cdef tuple event
         while self._queue:
-            yield self._queue.popleft()
+            event = <tuple>self._queue.popleft()
+            if len(event) == 4:     # an element boundary for checkpoint()
+                self._mark = event
+                self._handed = 0
+                continue
+            self._handed += 1
+            if self._skip:          # taken before the checkpoint resumed here
+                self._skip -= 1
+                if self._release and event[0] == "end":
+                    _detach_child(self._parents.popleft(), event[1])
+                continue
+            if self._release and event[0] == "end":
+                # Taken off _parents before the yield, so a consumer that
+                # breaks out here cannot leave the two queues out of step.
+                parent = self._parents.popleft()
+                try:
+                    yield event
+                finally:
+                    _detach_child(parent, event[1])
+            else:
+                yield event
+
+    def iterparse(self, source, Py_ssize_t chunk_size=65536):
+        """Feed *source* through this parser and yield its events, as
+        :func:`iterparse` does -- but with the parser at hand, so that
+        :meth:`checkpoint` can be called between events.
+
+        For a parser created with *resume_from*, *source* is read from
+        the checkpoint's offset on; it must then be raw bytes, a path,
+        or a seekable binary file positioned at the start of the
+        document.
+
+        Example::
+
+            parser = pygixml.PullParser(tag="record", retain="matched",
+                                        checkpoints=True)
+            for event, elem in parser.iterparse("big.xml"):
+                handle(elem)
+                save(parser.checkpoint())
+        """
+        yield from _drive_parser(self, source, chunk_size)
+
+
+cdef inline void _detach_child(object parent, object elem):
+    """Remove *elem* from *parent*'s children, searching from the end
+    where a just-closed element sits."""
+    if parent is None:
+        return
+    cdef list children = (<StreamElement>parent)._children
+    cdef Py_ssize_t i
+    for i in range(len(children) - 1, -1, -1):
+        if children[i] is elem:
+            del children[i]
+            return
 
 
-def iterparse(source, events=("end",), tag=None,
-               size_t stack_size=4096, Py_ssize_t chunk_size=65536):
+def iterparse(source, events=None, tag=None,
+               size_t stack_size=4096, Py_ssize_t chunk_size=65536,
+               str retain="all", bint release=False, resume_from=None,
+               str mode="tree"):
     """Incrementally parse a (possibly huge) XML document.
 
     Yields ``(event, element)`` pairs as each element completes, where
@@ -1853,6 +2670,20 @@ def iterparse(source, events=("end",), tag=None,
         (their subtrees are still built normally).
     :param stack_size: see :class:`PullParser`.
     :param chunk_size: how many bytes to read from *source* at a time.
+    :param retain: see :class:`PullParser`; ``"matched"`` builds only
+        the subtrees of elements matching *tag*.
+    :param release: if true, each element is removed from its parent
+        after its ``"end"`` event has been yielded, so memory stays flat
+        without calling ``clear()``.
+    :param resume_from: a :meth:`PullParser.checkpoint` state; parsing
+        continues from that point of *source* (which must then be bytes,
+        a path, or a seekable binary file). Take checkpoints with
+        :meth:`PullParser.iterparse`, which drives the same loop with the
+        parser at hand.
+    :param mode: ``"raw"`` yields the flat tuples of
+        ``PullParser(mode="raw")`` -- ``("start", tag, attrs)``,
+        ``("text", text)``, ``("end", tag)`` -- instead of building
+        elements; *events* then defaults to ``("start", "text", "end")``.
 
     Example -- process every ``<record>`` while keeping memory bounded::
 
@@ -1861,18 +2692,47 @@ def iterparse(source, events=("end",), tag=None,
                 handle(elem)
                 elem.clear()
     """
+    parser = PullParser(events=events, tag=tag, retain=retain,
+                        stack_size=stack_size, release=release,
+                        resume_from=resume_from, mode=mode)
+    yield from _drive_parser(parser, source, chunk_size)
+
+
+def _drive_parser(PullParser parser, source, Py_ssize_t chunk_size):
+    """Feed *source* through *parser* chunk by chunk, yielding its
+    events as they complete.  Shared by :func:`iterparse` and
+    :func:`stream_select`.
+
+    In-memory sources are fed as slices of a ``memoryview``, plain files
+    straight from a read-only memory mapping, and other binary streams
+    are read with ``readinto()`` into one reused buffer, so no per-chunk
+    ``bytes`` object is allocated."""
     cdef bint should_close = False
-    cdef bint first_chunk = True
     cdef object fh
-    cdef bytes chunk
+    cdef object view
+    cdef bytearray buf
+    cdef Py_ssize_t n, pos
 
     if isinstance(source, (bytes, bytearray)):
-        fh = io.BytesIO(bytes(source))
-        should_close = True
-    elif hasattr(source, "read"):
+        view = memoryview(source)
+        pos = 3 if view[:3] == b"\xef\xbb\xbf" else 0   # strip a leading UTF-8 BOM
+        pos += parser._resume_offset
+        while pos < len(view):
+            parser.feed(view[pos:pos + chunk_size])
+            pos += chunk_size
+            yield from parser.read_events()
+        parser.close()
+        yield from parser.read_events()
+        return
+
+    if hasattr(source, "read"):
         fh = source
     elif isinstance(source, (str, os.PathLike)):
-        fh = open(source, "rb")
+        mapped = _map_input(source)
+        if mapped is not None:
+            yield from _drive_mapped(parser, mapped, chunk_size)
+            return
+        fh = _open_input(source)
         should_close = True
     else:
         raise TypeError(
@@ -1880,20 +2740,34 @@ def iterparse(source, events=("end",), tag=None,
             "(expected a path, bytes/bytearray, or a file-like object with .read())"
         )
 
-    parser = PullParser(events=events, tag=tag, stack_size=stack_size)
     try:
-        while True:
-            chunk = fh.read(chunk_size)
-            if not chunk:
-                break
-            if isinstance(chunk, str):
-                chunk = chunk.encode("utf-8")
-            if first_chunk:
-                first_chunk = False
-                if chunk[:3] == b"\xef\xbb\xbf":   # strip a leading UTF-8 BOM
-                    chunk = chunk[3:]
-            parser.feed(chunk)
-            yield from parser.read_events()
+        if parser._resume_offset:
+            _seek_resume(fh, parser._resume_offset)
+        else:
+            head = _read_head(fh)
+            if head[:3] == b"\xef\xbb\xbf":   # strip a leading UTF-8 BOM
+                head = head[3:]
+            if head:
+                parser.feed(head)
+                yield from parser.read_events()
+        if hasattr(fh, "readinto") and not isinstance(fh, io.TextIOBase):
+            buf = bytearray(chunk_size)
+            view = memoryview(buf)
+            while True:
+                n = fh.readinto(buf) or 0
+                if n <= 0:
+                    break
+                parser.feed(view[:n])
+                yield from parser.read_events()
+        else:
+            while True:
+                chunk = fh.read(chunk_size)
+                if not chunk:
+                    break
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                parser.feed(chunk)
+                yield from parser.read_events()
         parser.close()
         yield from parser.read_events()
     finally:
@@ -1901,10 +2775,158 @@ def iterparse(source, events=("end",), tag=None,
             fh.close()
 
 
-def iterfind(source, str tag, size_t stack_size=4096, Py_ssize_t chunk_size=65536):
-    """Shortcut for ``iterparse(source, events=("end",), tag=tag)`` that
-    yields :class:`StreamElement` objects directly (no ``(event, elem)``
-    tuples).
+async def aiterparse(reader, events=("end",), tag=None,
+                     size_t stack_size=4096, Py_ssize_t chunk_size=65536,
+                     str retain="all", bint release=False):
+    """Asynchronous :func:`iterparse` over an ``asyncio`` stream.
+
+    An async generator that awaits ``reader.read(chunk_size)`` -- an
+    :class:`asyncio.StreamReader` or any object with an ``async read(n)``
+    method -- feeds each chunk to a :class:`PullParser` and yields its
+    ``(event, element)`` pairs. The next chunk is only read once the
+    consumer has taken every event of the current one, so a slow
+    consumer applies backpressure to the stream instead of buffering the
+    document.
+
+    Parsing a chunk runs on the event loop thread; keep *chunk_size*
+    modest when many feeds share one loop.
+
+    :param reader: the stream to read from; ``read()`` must return
+        ``bytes`` (``str`` is encoded as UTF-8) and an empty value at EOF.
+    :param events, tag, stack_size, retain, release: see :func:`iterparse`.
+    :param chunk_size: the maximum number of bytes requested per read.
+
+    Example::
+
+        reader, writer = await asyncio.open_connection(host, port)
+        async for event, elem in pygixml.aiterparse(reader, tag="record"):
+            await handle(elem)
+    """
+    parser = PullParser(events=events, tag=tag, retain=retain,
+                        stack_size=stack_size, release=release)
+    cdef bint first_chunk = True
+    head = b""
+    while True:
+        chunk = await reader.read(chunk_size)
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        if first_chunk:
+            # Hold back short reads until a leading BOM can be recognised.
+            if chunk:
+                head += chunk
+                if len(head) < 3:
+                    continue
+            first_chunk = False
+            chunk = head[3:] if head[:3] == b"\xef\xbb\xbf" else head   # strip a leading UTF-8 BOM
+            if not chunk and head:
+                continue
+        if not chunk:
+            break
+        parser.feed(chunk)
+        for event in parser.read_events():
+            yield event
+    parser.close()
+    for event in parser.read_events():
+        yield event
+
+
+cdef object _map_input(path):
+    """Map *path* read-only for sequential reading, or return ``None``
+    when it cannot be parsed in place: compressed, empty, or not a
+    regular file (a pipe, a character device...)."""
+    with open(path, "rb") as f:
+        if not stat.S_ISREG(os.fstat(f.fileno()).st_mode):
+            return None
+        if _sniff_compression(f.read(_SNIFF_SIZE), path) is not None:
+            return None
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            return None
+    if hasattr(mapped, "madvise"):
+        mapped.madvise(mmap.MADV_SEQUENTIAL)
+    return mapped
+
+
+cdef _seek_resume(fh, uint64_t offset):
+    """Position *fh*, open at the start of a document, *offset* bytes
+    past its BOM (if any)."""
+    if isinstance(fh, io.TextIOBase) or not (hasattr(fh, "seekable") and fh.seekable()):
+        raise ValueError("resuming from a checkpoint needs a seekable binary source")
+    start = fh.tell()
+    bom = 3 if _read_head(fh) == b"\xef\xbb\xbf" else 0
+    fh.seek(start + bom + offset)
+
+
+cdef bytes _read_head(fh):
+    """The first three bytes of *fh* (fewer only at EOF), read across
+    as many short reads as a pipe or socket needs, so a leading BOM is
+    recognised whatever the read size."""
+    cdef bytes head = b""
+    while len(head) < 3:
+        chunk = fh.read(3 - len(head))
+        if not chunk:
+            break
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        head += chunk
+    return head
+
+
+cdef bytes _resume_prefix(list stack):
+    """Start tags that re-open the elements of a checkpoint's *stack*.
+    With nothing open past the start of the input the root has already
+    closed, so a stand-in root is opened and closed instead."""
+    if not stack:
+        return b"<_/>"
+    parts = []
+    for tag, attrib in stack:
+        parts.append("<" + tag)
+        for name, value in attrib.items():
+            parts.append(f' {name}="{_escape_resume_attr(value)}"')
+        parts.append(">")
+    return "".join(parts).encode("utf-8")
+
+
+cdef str _escape_resume_attr(str value):
+    return (value.replace("&", "&amp;").replace("<", "&lt;").replace('"', "&quot;")
+            .replace("\t", "&#9;").replace("\n", "&#10;").replace("\r", "&#13;"))
+
+
+def _drive_mapped(PullParser parser, object mapped, Py_ssize_t chunk_size):
+    """:func:`_drive_parser` for a memory-mapped file: each chunk is
+    tokenized in place, with no Python object per chunk."""
+    cdef const unsigned char[::1] data = mapped
+    cdef size_t n = data.shape[0]
+    cdef size_t step = chunk_size if chunk_size > 0 else n
+    cdef size_t pos = 0
+    if n >= 3 and data[0] == 0xEF and data[1] == 0xBB and data[2] == 0xBF:
+        pos = 3                                     # strip a leading UTF-8 BOM
+    pos += parser._resume_offset
+    try:
+        while pos < n:
+            parser._consume(&data[pos], min(step, n - pos))
+            pos += step
+            yield from parser.read_events()
+        parser.close()
+        yield from parser.read_events()
+    finally:
+        data = None
+        mapped.close()
+
+
+def iterfind(source, str tag, size_t stack_size=4096, Py_ssize_t chunk_size=65536,
+             str retain="matched", bint release=False, resume_from=None):
+    """Shortcut for ``iterparse(source, events=("end",), tag=tag,
+    retain="matched")`` that yields :class:`StreamElement` objects
+    directly (no ``(event, elem)`` tuples).
+
+    Only the matching subtrees are built, so memory stays bounded by one
+    record even when the caller never calls ``clear()``. Pass
+    ``retain="all"`` to build the surrounding elements as well, and
+    ``release=True`` to detach each record from its parent once yielded.
+    *resume_from* continues from a :meth:`PullParser.checkpoint` state,
+    as in :func:`iterparse`.
 
     Example::
 
@@ -1912,6 +2934,53 @@ def iterfind(source, str tag, size_t stack_size=4096, Py_ssize_t chunk_size=6553
             handle(record)
             record.clear()
     """
-    for _event, elem in iterparse(source, events=("end",), tag=tag,
-                                   stack_size=stack_size, chunk_size=chunk_size):
+    for _event, elem in iterparse(source, events=("end",), tag=tag, retain=retain,
+                                   stack_size=stack_size, chunk_size=chunk_size,
+                                   release=release, resume_from=resume_from):
         yield elem
+
+
+def stream_select(source, str path, size_t stack_size=4096,
+                  Py_ssize_t chunk_size=65536):
+    """Stream the matches of a simple XPath expression over a (possibly
+    huge) XML document.
+
+    The expression is compiled once into an automaton that runs inside
+    the :class:`PullParser` loop, so only matching subtrees are ever
+    materialized -- everything else is discarded as soon as it closes.
+
+    Supported subset:
+
+    * absolute child steps (``/feed/entry``) and descendant steps
+      (``//entry``, ``/feed//title``), ``*`` as a name wildcard;
+    * attribute predicates ``[@type]``, ``[@type='x']`` / ``[@type="x"]``;
+    * positional predicates ``[n]`` (1-based, among the matching
+      siblings under the same parent); predicates may be chained;
+    * a final ``/text()`` step, yielding the text of each match.
+
+    Anything else (other axes, functions, ``last()``, comparisons other
+    than attribute equality) raises :class:`ValueError`.
+
+    :param source: see :func:`iterparse`.
+    :param path: the XPath expression.
+    :param stack_size: see :class:`PullParser`.
+    :param chunk_size: how many bytes to read from *source* at a time.
+    :returns: a generator of :class:`StreamElement` (or ``str`` for
+        ``/text()``), yielded as each match completes -- a match nested
+        in another match is yielded before its enclosing one.
+
+    Example::
+
+        for title in pygixml.stream_select("feed.xml",
+                                           "/feed/entry[@type='x']/title"):
+            print(title.text)
+    """
+    cdef _StreamPath compiled = _StreamPath(path)    # fail fast on bad syntax
+    parser = PullParser(events=("end",), stack_size=stack_size)
+    parser._path = compiled
+    return _select_values(_drive_parser(parser, source, chunk_size))
+
+
+def _select_values(events):
+    for _event, value in events:
+        yield value
@@ -0,0 +1,5 @@
+// Tests compatibility with string/iostream
+#include <string>
+#include "../src/pugixml.hpp"
+#include <istream>
+#include <ostream>
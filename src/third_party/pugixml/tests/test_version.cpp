@@ -0,0 +1,5 @@
+#include "../src/pugixml.hpp"
+
+#if PUGIXML_VERSION != 1160 // 1.16
+#error Unexpected pugixml version
+#endif
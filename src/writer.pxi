@@ -0,0 +1,957 @@
+# writer.pxi
+# ----------
+# Constant-memory streaming XML writer (pygixml.XMLWriter).
+# Include AFTER dictify.pxi: the C++ below reuses its xml_escape_text /
+# xml_escape_attr routines, and pygixml_spec_utf8 from pygixml_cy.pyx.
+#
+# Output is assembled in one std::string that is flushed to the sink
+# (a FILE* for paths, the object's .write() for file-like objects) every
+# time it grows past `buffer_size` bytes, so memory is bounded by the
+# buffer plus one name per open element -- independent of output size.
+
+import warnings
+
+from cpython.ref cimport PyObject
+from libc.stdio cimport FILE, fclose
+
+
+cdef extern from *:
+    """
+    #include <string>
+    #include <vector>
+    #include <cstdio>
+    #include "pugixml.hpp"
+
+    // XML Name check, with the same character classes as yxml: ASCII is
+    // held to the spec, any non-ASCII (UTF-8) byte is accepted.
+    static inline bool px_is_name_start(unsigned char c) {
+        return (c >= 'a' && c <= 'z') || (c >= 'A' && c <= 'Z') ||
+               c == ':' || c == '_' || c >= 128;
+    }
+
+    static int px_check_name(const char* s, Py_ssize_t n, const char* what) {
+        bool ok = n > 0 && px_is_name_start((unsigned char)s[0]);
+        for (Py_ssize_t i = 1; ok && i < n; ++i) {
+            unsigned char c = (unsigned char)s[i];
+            ok = px_is_name_start(c) || (c >= '0' && c <= '9') ||
+                 c == '-' || c == '.';
+        }
+        if (ok) return 0;
+        PyObject* r = PyUnicode_DecodeUTF8(s, n, "replace");
+        if (r) {
+            PyErr_Format(PyExc_ValueError, "invalid XML %s: %R", what, r);
+            Py_DECREF(r);
+        }
+        return -1;
+    }
+
+    struct PXWriterLevel {
+        std::string tag;
+        bool has_elem = false;   // wrote a child element / subtree
+        bool has_text = false;   // wrote text directly inside this element
+    };
+
+    struct PXWriter {
+        std::string buf;
+        std::vector<PXWriterLevel> levels;
+        std::string indent;
+        bool   pretty     = false;
+        bool   start_open = false;   // "<tag attrs" written, '>' still pending
+        bool   wrote_any  = false;
+        bool   failed     = false;   // a sink write raised; Python error is set
+        bool   text_mode  = false;   // sink expects str, not bytes
+        size_t flush_at   = 65536;
+        unsigned int flags = pugi::format_default;   // FormatFlags
+        FILE*     fp = nullptr;
+        PyObject* fh = nullptr;      // borrowed; owned by the Cython wrapper
+
+        bool flush() {
+            if (failed) return false;
+            if (buf.empty()) return true;
+            if (fp) {
+                if (fwrite(buf.data(), 1, buf.size(), fp) != buf.size()) {
+                    PyErr_SetString(PyExc_OSError, "cannot write XML output");
+                    failed = true;
+                    return false;
+                }
+                buf.clear();
+                return true;
+            }
+            if (!fh) { buf.clear(); return true; }
+
+            PyObject* chunk;
+            Py_ssize_t consumed = (Py_ssize_t)buf.size();
+            if (text_mode) {
+                // Never split a multi-byte UTF-8 sequence across two str
+                // chunks: keep an incomplete tail in the buffer.
+                chunk = PyUnicode_DecodeUTF8Stateful(
+                    buf.data(), (Py_ssize_t)buf.size(), "strict", &consumed);
+            } else {
+                chunk = PyBytes_FromStringAndSize(buf.data(), (Py_ssize_t)buf.size());
+            }
+            if (!chunk) { failed = true; return false; }
+            PyObject* r = PyObject_CallMethod(fh, "write", "O", chunk);
+            Py_DECREF(chunk);
+            if (!r) { failed = true; return false; }
+            Py_DECREF(r);
+            buf.erase(0, (size_t)consumed);
+            return true;
+        }
+
+        int flush_checked() {
+            return flush() ? 0 : -1;
+        }
+
+        inline bool maybe_flush() {
+            return buf.size() < flush_at ? true : flush();
+        }
+
+        inline void close_start() {
+            if (start_open) { buf += '>'; start_open = false; }
+        }
+
+        // Newline + indentation before a child element -- skipped inside
+        // elements that already hold text, so mixed content is never
+        // altered by pretty-printing.
+        inline void break_line() {
+            if (!pretty) return;
+            if (levels.empty()) {
+                if (wrote_any) buf += '\\n';
+                return;
+            }
+            if (levels.back().has_text) return;
+            buf += '\\n';
+            for (size_t i = 0; i < levels.size(); ++i) buf += indent;
+        }
+
+        int start(PyObject* tag, PyObject* attrs) {
+            if (!PyUnicode_Check(tag)) {
+                PyErr_Format(PyExc_TypeError, "tag must be str, got %.200s",
+                             Py_TYPE(tag)->tp_name);
+                return -1;
+            }
+            Py_ssize_t n;
+            const char* t = PyUnicode_AsUTF8AndSize(tag, &n);
+            if (!t) return -1;
+            if (n == 0) {
+                PyErr_SetString(PyExc_ValueError, "tag must not be empty");
+                return -1;
+            }
+            if (px_check_name(t, n, "tag name") < 0) return -1;
+            close_start();
+            size_t mark = buf.size();
+            break_line();
+            buf += '<';
+            buf.append(t, (size_t)n);
+            if (attrs && attrs != Py_None && write_attrs(attrs) < 0) {
+                buf.resize(mark);   // leave no half-written start tag behind
+                return -1;
+            }
+            if (!levels.empty()) levels.back().has_elem = true;
+            start_open = true;
+            wrote_any = true;
+            PXWriterLevel lv;
+            lv.tag.assign(t, (size_t)n);
+            levels.push_back(std::move(lv));
+            return maybe_flush() ? 0 : -1;
+        }
+
+        int write_attrs(PyObject* attrs) {
+            if (!PyDict_Check(attrs)) {
+                PyErr_Format(PyExc_TypeError, "attrs must be a dict, got %.200s",
+                             Py_TYPE(attrs)->tp_name);
+                return -1;
+            }
+            PyObject *k, *v;
+            Py_ssize_t pos = 0;
+            while (PyDict_Next(attrs, &pos, &k, &v)) {
+                if (v == Py_None) continue;
+                PyObject *kt, *vt;
+                Py_ssize_t kn, vn;
+                const char* ks = pygixml_spec_utf8(k, &kn, &kt);
+                if (!ks) return -1;
+                if (px_check_name(ks, kn, "attribute name") < 0) {
+                    Py_XDECREF(kt);
+                    return -1;
+                }
+                const char* vs = pygixml_spec_utf8(v, &vn, &vt);
+                if (!vs) { Py_XDECREF(kt); return -1; }
+                if (pretty && (flags & pugi::format_indent_attributes)) {
+                    buf += '\\n';
+                    for (size_t i = 0; i <= levels.size(); ++i) buf += indent;
+                } else {
+                    buf += ' ';
+                }
+                buf.append(ks, (size_t)kn);
+                char q = (flags & pugi::format_attribute_single_quote) ? '\\'' : '"';
+                buf += '=';
+                buf += q;
+                if (flags & pugi::format_no_escapes) buf.append(vs, (size_t)vn);
+                else xml_escape_attr(vs, buf);
+                buf += q;
+                Py_XDECREF(kt);
+                Py_XDECREF(vt);
+            }
+            return 0;
+        }
+
+        int text(PyObject* value) {
+            PyObject* tmp;
+            Py_ssize_t n;
+            const char* s = pygixml_spec_utf8(value, &n, &tmp);
+            if (!s) return -1;
+            close_start();
+            if (n > 0) {
+                if (flags & pugi::format_no_escapes) buf.append(s, (size_t)n);
+                else xml_escape_text(s, buf);
+                if (!levels.empty()) levels.back().has_text = true;
+                wrote_any = true;
+            }
+            Py_XDECREF(tmp);
+            return maybe_flush() ? 0 : -1;
+        }
+
+        int end() {
+            if (start_open && !(flags & pugi::format_no_empty_element_tags)) {
+                buf += "/>";
+                start_open = false;
+            } else {
+                close_start();
+                const PXWriterLevel& lv = levels.back();
+                if (pretty && lv.has_elem && !lv.has_text) {
+                    buf += '\\n';
+                    for (size_t i = 1; i < levels.size(); ++i) buf += indent;
+                }
+                buf += "</";
+                buf += lv.tag;
+                buf += '>';
+            }
+            levels.pop_back();
+            return maybe_flush() ? 0 : -1;
+        }
+    };
+
+    // pugixml serializer sink that appends into the writer's buffer,
+    // flushing as it goes so a huge subtree never sits in memory whole.
+    struct PXSubtreeSink : pugi::xml_writer {
+        PXWriter* w;
+        explicit PXSubtreeSink(PXWriter* writer) : w(writer) {}
+        void write(const void* data, size_t size) override {
+            // Flush *before* appending so the final chunk (and its
+            // trailing newline) is still in the buffer afterwards.
+            if (!w->maybe_flush()) return;
+            w->buf.append(static_cast<const char*>(data), size);
+        }
+    };
+
+    static int px_write_subtree(PXWriter* w, pugi::xml_node node) {
+        w->close_start();
+        // pugixml indents the subtree's first line itself (from `depth`),
+        // so only the line break is ours to write here.
+        bool indented = w->pretty &&
+            (w->levels.empty() || !w->levels.back().has_text);
+        if (indented && (!w->levels.empty() || w->wrote_any)) w->buf += '\\n';
+        if (!w->levels.empty()) w->levels.back().has_elem = true;
+        unsigned int flags = (indented ? pugi::format_indent : pugi::format_raw) |
+            (w->flags & ~(pugi::format_indent | pugi::format_raw));
+        PXSubtreeSink sink(w);
+        node.print(sink, w->indent.c_str(), flags, pugi::encoding_utf8,
+                   (unsigned int)w->levels.size());
+        if (w->failed) return -1;
+        if (indented && !w->buf.empty() && w->buf.back() == '\\n')
+            w->buf.pop_back();
+        w->wrote_any = true;
+        return w->maybe_flush() ? 0 : -1;
+    }
+
+    static FILE* px_open_file(const char* path, bool text) {
+        return fopen(path, text ? "w" : "wb");
+    }
+    """
+    cdef cppclass PXWriterLevel:
+        string tag
+
+    cdef cppclass PXWriter:
+        string buf
+        vector[PXWriterLevel] levels
+        string indent
+        bint pretty
+        bint wrote_any
+        bint text_mode
+        size_t flush_at
+        unsigned int flags
+        FILE* fp
+        PyObject* fh
+        int flush_checked() except -1
+        int start(object tag, object attrs) except -1
+        int text(object value) except -1
+        int end() except -1
+
+    int px_write_subtree(PXWriter* w, xml_node node) except -1
+    FILE* px_open_file(const char* path, bint text)
+
+
+cdef class XMLWriter:
+    """Write XML incrementally in constant memory.
+
+    ``XMLWriter`` emits start tags, text and end tags straight into a
+    fixed-size output buffer that is flushed to *target* whenever it
+    fills up, so memory stays at ``O(depth)`` no matter how large the
+    output grows — no :class:`XMLDocument` is ever built.  Text and
+    attribute values are escaped with the same routines as
+    :func:`pygixml.dictify.unparse`.
+
+    :param target: output file path (``str``/``os.PathLike``), or a
+        file-like object with ``.write()``.  Binary objects receive
+        UTF-8 ``bytes``; text objects (:class:`io.TextIOBase`) receive
+        ``str``.  Paths ending in ``.gz``, ``.xz`` or ``.zz``/``.zlib``
+        are written compressed.
+    :param indent: ``None`` or ``""`` (default) for compact output, or an
+        indentation string / number of spaces for pretty-printing.
+        Elements that contain text are never re-indented.
+    :param declaration: write an ``<?xml version="1.0" encoding="UTF-8"?>``
+        header first.
+    :param buffer_size: flush threshold in bytes.
+    :param flags: :class:`FormatFlags`.  ``RAW`` forces compact output,
+        ``NO_DECLARATION`` omits the header, ``WRITE_BOM`` writes a UTF-8
+        BOM first, ``SAVE_FILE_TEXT`` opens a *path* target in text mode,
+        and ``NO_ESCAPES``, ``NO_EMPTY_ELEMENT_TAGS``,
+        ``ATTRIBUTE_SINGLE_QUOTE`` and ``INDENT_ATTRIBUTES`` behave as in
+        pugixml.  The flags are also passed on to :meth:`write_subtree`.
+
+    Output reaches *target* only through :meth:`flush` and :meth:`close`.
+    A writer that is not closed -- a ``with`` block left by an exception,
+    or one garbage-collected while open (which also emits a
+    ``ResourceWarning``) -- discards what it still buffers, so only
+    output flushed before is written.
+
+    Example::
+
+        with pygixml.XMLWriter("out.xml", indent=2) as w:
+            w.start("catalog", {"version": "1"})
+            for row in rows:
+                w.element("item", {"id": row.id}, row.name)
+            w.end()
+    """
+
+    cdef PXWriter* _w
+    cdef object _fh
+    cdef bint _owns_fh
+    cdef bint _closed
+    cdef bint _opened      # __cinit__ completed
+    cdef bint _root_done   # the (single) root element has been written
+
+    def __cinit__(self, target, indent=None, bint declaration=True,
+                  size_t buffer_size=65536, flags=FormatFlags.DEFAULT):
+        cdef unsigned int fmt = <unsigned int>flags
+        self._w = new PXWriter()
+        self._closed = False
+        self._fh = None
+        self._w.flush_at = buffer_size if buffer_size > 0 else 1
+        self._w.flags = fmt
+
+        if isinstance(indent, int):
+            indent = " " * indent
+        if indent and not (fmt & format_raw):
+            self._w.pretty = True
+            self._w.indent = (<str>indent).encode("utf-8")
+
+        cdef bytes path_b
+        if hasattr(target, "write"):
+            self._fh = target
+            self._w.fh = <PyObject*>target
+            self._w.text_mode = isinstance(target, io.TextIOBase)
+        elif isinstance(target, (str, os.PathLike)):
+            path_b = os.fsencode(target)
+            try:
+                compressed = _open_compressed_writer(target)
+            except OSError:
+                raise PygiXMLError(f"cannot open XML output: {os.fsdecode(path_b)}")
+            if compressed is not None:
+                self._fh = compressed
+                self._owns_fh = True
+                self._w.fh = <PyObject*>compressed
+            else:
+                self._w.fp = px_open_file(path_b, fmt & format_save_file_text)
+                if self._w.fp is NULL:
+                    raise PygiXMLError(f"cannot open XML output: {os.fsdecode(path_b)}")
+        else:
+            raise TypeError(
+                f"unsupported target type: {type(target)!r} "
+                "(expected a path or a file-like object with .write())"
+            )
+
+        if fmt & format_write_bom:
+            self._w.buf.append(b"\xef\xbb\xbf")
+        if declaration and not (fmt & format_no_declaration):
+            self._w.buf.append(b'<?xml version="1.0" encoding="UTF-8"?>')
+            self._w.wrote_any = True
+        self._opened = True
+
+    def __del__(self):
+        if self._opened and not self._closed:
+            warnings.warn("XMLWriter was never closed; its buffered output "
+                          "is discarded", ResourceWarning, source=self)
+
+    def __dealloc__(self):
+        # Never writes: the target may already be cleared (GC cycles).
+        if self._w is not NULL:
+            if self._w.fp is not NULL:
+                fclose(self._w.fp)
+            del self._w
+            self._w = NULL
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._release()
+
+    cdef inline _check_open(self):
+        if self._closed:
+            raise PygiXMLError("XMLWriter is already closed")
+
+    cdef inline _check_new_root(self):
+        if self._w.levels.empty() and self._root_done:
+            raise PygiXMLError("document already has a root element")
+
+    cdef inline _ended(self):
+        if self._w.levels.empty():
+            self._root_done = True
+
+    @property
+    def depth(self):
+        """Number of currently open elements."""
+        return self._w.levels.size()
+
+    @property
+    def closed(self):
+        """``True`` once :meth:`close` has been called."""
+        return self._closed
+
+    def start(self, str tag, dict attrs=None):
+        """Open a new element ``<tag attrs>``.
+
+        Attribute values that are not ``str`` are converted with
+        ``str()``; attributes whose value is ``None`` are skipped.
+        """
+        self._check_open()
+        self._check_new_root()
+        self._w.start(tag, attrs)
+
+    def text(self, value):
+        """Write escaped text content inside the current element.
+
+        Raises:
+            PygiXMLError: If no element is open and *value* is not
+                whitespace.
+        """
+        self._check_open()
+        if self._w.levels.empty() and not (
+                isinstance(value, str) and (not value or value.isspace())):
+            raise PygiXMLError("text is only allowed inside the root element")
+        self._w.text(value)
+
+    def end(self, str tag=None):
+        """Close the current element.
+
+        If *tag* is given it must match the element being closed.
+
+        Raises:
+            PygiXMLError: If no element is open, or *tag* does not match.
+        """
+        self._check_open()
+        if self._w.levels.empty():
+            raise PygiXMLError("end() called with no open element")
+        cdef string open_tag
+        if tag is not None:
+            open_tag = self._w.levels.back().tag
+            if open_tag != <string>tag.encode("utf-8"):
+                raise PygiXMLError(
+                    f"end({tag!r}) does not match open element "
+                    f"{open_tag.decode('utf-8')!r}")
+        self._w.end()
+        self._ended()
+
+    def element(self, str tag, dict attrs=None, text=None):
+        """Write a complete element in one call — equivalent to
+        ``start(tag, attrs)``, ``text(text)`` (when not ``None``) and
+        ``end()``."""
+        self._check_open()
+        self._check_new_root()
+        self._w.start(tag, attrs)
+        if text is not None:
+            self._w.text(text)
+        self._w.end()
+        self._ended()
+
+    def write_subtree(self, node):
+        """Serialize an existing :class:`XMLNode` at the current
+        position — or, for an :class:`XMLDocument`, all of its top-level
+        nodes (comments and processing instructions as well as the root
+        element; its XML declaration is left to the writer).
+
+        The subtree is streamed through pugixml's serializer straight
+        into the output buffer.
+
+        Raises:
+            PygiXMLError: If this would write a second root element, or
+                text outside the root element.
+        """
+        self._check_open()
+        cdef xml_node child
+        if isinstance(node, XMLDocument):
+            child = pygixml_document_node((<XMLDocument>node)._doc).first_child()
+            while child.type() != node_null:
+                if child.type() != node_declaration:
+                    self._write_node(child)
+                child = child.next_sibling()
+            return
+        if not isinstance(node, XMLNode):
+            raise TypeError(f"expected XMLNode, got {type(node).__name__!r}")
+        if (<XMLNode>node)._node.type() == node_null:
+            raise PygiXMLNullNodeError("Cannot write a null node")
+        self._write_node((<XMLNode>node)._node)
+
+    cdef _write_node(self, xml_node node):
+        cdef xml_node_type kind = node.type()
+        if self._w.levels.empty():
+            if kind == node_pcdata or kind == node_cdata:
+                raise PygiXMLError("text is only allowed inside the root element")
+            if kind == node_element:
+                self._check_new_root()
+        px_write_subtree(self._w, node)
+        if kind == node_element:
+            self._ended()
+
+    def flush(self):
+        """Write any buffered output to the target."""
+        self._check_open()
+        self._w.flush_checked()
+
+    cdef _release(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._w.fp is not NULL:
+            fclose(self._w.fp)
+            self._w.fp = NULL
+        self._w.fh = NULL
+        fh, self._fh = self._fh, None
+        if self._owns_fh:
+            fh.close()
+
+    def close(self):
+        """Flush all output and release the target.
+
+        Files opened from a path are closed; file-like objects passed in
+        by the caller are flushed but left open.  Safe to call multiple
+        times.
+
+        Raises:
+            PygiXMLError: If elements are still open.
+        """
+        if self._closed:
+            return
+        if not self._w.levels.empty():
+            open_tag = self._w.levels.back().tag.decode("utf-8")
+            raise PygiXMLError(
+                f"cannot close XMLWriter: {self._w.levels.size()} element(s) "
+                f"still open (innermost {open_tag!r})")
+        if self._w.pretty and self._w.wrote_any:
+            self._w.buf.append(b"\n")
+        try:
+            self._w.flush_checked()
+        finally:
+            self._release()
+
+
+# ---------------------------------------------------------------------------
+# Serializing existing nodes: to_bytes() / write() / iter_serialize()
+# ---------------------------------------------------------------------------
+#
+# All three feed pugixml xml_writer sinks -- no ostringstream and no
+# Python str.  to_bytes() collects the output in one std::string and
+# copies it into a bytes object once; write() and iter_serialize() never
+# hold more than a chunk (or batch) of it.  The trailing newline pugixml
+# emits is dropped, exactly like to_string().
+
+cdef extern from *:
+    """
+    #include <string>
+    #include <cstring>
+    #include <vector>
+    #include "pugixml.hpp"
+
+    // Collects pugixml's output; the bytes object is created once from
+    // it at the end.
+    struct PXStringSink : pugi::xml_writer {
+        std::string* out;
+        explicit PXStringSink(std::string* target) : out(target) {}
+        void write(const void* data, size_t size) override {
+            out->append(static_cast<const char*>(data), size);
+        }
+    };
+
+    static PyObject* px_node_to_bytes(pugi::xml_node node, const char* indent,
+                                      unsigned int flags) {
+        std::string out;
+        if (node.type() != pugi::node_null) {
+            PXStringSink sink(&out);
+            node.print(sink, indent, flags, pugi::encoding_utf8);
+        }
+        if (!out.empty() && out.back() == '\\n') out.pop_back();
+        return PyBytes_FromStringAndSize(out.data(), (Py_ssize_t)out.size());
+    }
+
+    // Cuts pugixml's output into chunks of exactly `chunk` bytes (the
+    // last one may be shorter).  At least one byte is always held back
+    // so the trailing newline can still be dropped in finish().
+    struct PXChunkSink : pugi::xml_writer {
+        std::string buf;
+        size_t chunk = 65536;
+        bool failed = false;
+        bool strip_newline = true;
+
+        // Hand `n` bytes on; returns how many were consumed, -1 on error.
+        virtual Py_ssize_t emit(const char* p, size_t n) = 0;
+
+        void write(const void* data, size_t size) override {
+            if (failed) return;
+            buf.append(static_cast<const char*>(data), size);
+            size_t off = 0;
+            while (buf.size() - off > chunk) {
+                Py_ssize_t c = emit(buf.data() + off, chunk);
+                if (c < 0) { failed = true; return; }
+                if (c == 0) break;
+                off += (size_t)c;
+            }
+            if (off) buf.erase(0, off);
+        }
+
+        bool finish() {
+            if (failed) return false;
+            if (strip_newline && !buf.empty() && buf.back() == '\\n') buf.pop_back();
+            while (!buf.empty()) {
+                Py_ssize_t c = emit(buf.data(), buf.size());
+                if (c <= 0) { failed = true; return false; }
+                buf.erase(0, (size_t)c);
+            }
+            return true;
+        }
+    };
+
+    // Chunks go to a file-like object's .write(): bytes, or str for
+    // text streams (never splitting a UTF-8 sequence between two str).
+    struct PXFileChunkSink : PXChunkSink {
+        PyObject* fh = nullptr;
+        bool text_mode = false;
+
+        Py_ssize_t emit(const char* p, size_t n) override {
+            Py_ssize_t consumed = (Py_ssize_t)n;
+            PyObject* piece;
+            if (text_mode) {
+                piece = PyUnicode_DecodeUTF8Stateful(p, (Py_ssize_t)n, "strict", &consumed);
+            } else {
+                piece = PyBytes_FromStringAndSize(p, (Py_ssize_t)n);
+            }
+            if (!piece) return -1;
+            PyObject* r = PyObject_CallMethod(fh, "write", "O", piece);
+            Py_DECREF(piece);
+            if (!r) return -1;
+            Py_DECREF(r);
+            return consumed;
+        }
+    };
+
+    static int px_node_write(pugi::xml_node node, const char* indent,
+                             unsigned int flags, PyObject* fh, bool text_mode,
+                             size_t chunk) {
+        if (node.type() == pugi::node_null) return 0;
+        PXFileChunkSink sink;
+        sink.fh = fh;
+        sink.text_mode = text_mode;
+        // A 4-byte window always holds at least one complete code point.
+        sink.chunk = chunk > 4 ? chunk : (text_mode ? 4 : (chunk ? chunk : 1));
+        node.print(sink, indent, flags, pugi::encoding_utf8);
+        return sink.finish() ? 0 : -1;
+    }
+
+    // Whole-document save (declaration and all, like save_file) into a
+    // Python writer -- used for compressed save_file() output.
+    static int px_document_save(pugi::xml_document* doc, const char* indent,
+                                unsigned int flags, PyObject* fh) {
+        PXFileChunkSink sink;
+        sink.fh = fh;
+        sink.strip_newline = false;
+        doc->save(sink, indent, flags, pugi::encoding_utf8);
+        return sink.finish() ? 0 : -1;
+    }
+
+    // pugixml's serializer is push-only, so iter_serialize() walks the
+    // tree itself -- the same walk as pugixml's node_output() -- and can
+    // stop between any two nodes.  Each node is still written by
+    // pugixml: a subtree with no child elements is printed whole, and
+    // for an element that is descended into, a childless copy of it is
+    // printed and split into its start and end tag.  next() runs on the
+    // calling thread, with the GIL held, until a batch is complete.
+    //
+    // Batches are whole multiples of the chunk size and at least
+    // PX_SERIALIZE_BATCH bytes; _SerializedChunks slices them back into
+    // chunks.
+    static const size_t PX_SERIALIZE_BATCH = 65536;
+
+    struct PXSerializeStream {
+        enum { PX_ENTER, PX_LEAVE, PX_DONE };
+        enum { PX_NEWLINE = 1, PX_INDENT = 2 };   // pugixml's indent_flags
+
+        pugi::xml_node root, node;
+        std::string indent;
+        unsigned int flags = pugi::format_default;
+        size_t indent_length = 0;
+        unsigned int depth = 0;
+        unsigned int indent_flags = PX_INDENT;
+        int state = PX_ENTER;
+        size_t batch = PX_SERIALIZE_BATCH;
+        std::string out;
+        std::vector<std::string> end_tags;  // of the elements descended into
+        pugi::xml_document scratch;
+
+        bool raw() const { return (flags & pugi::format_raw) != 0; }
+
+        void line_break() {
+            if ((indent_flags & PX_NEWLINE) && !raw()) out += '\\n';
+            if ((indent_flags & PX_INDENT) && indent_length)
+                for (unsigned int i = 0; i < depth; ++i) out += indent;
+        }
+
+        // pugixml prints a non-text root with its indentation and a
+        // trailing newline; both are the walk's own business here.
+        void print_trimmed(pugi::xml_node n, unsigned int extra_flags) {
+            size_t at = out.size();
+            PXStringSink sink(&out);
+            n.print(sink, indent.c_str(), flags | extra_flags,
+                    pugi::encoding_utf8, depth);
+            out.erase(at, (size_t)depth * indent_length);
+            if (!raw() && out.size() > at && out.back() == '\\n') out.pop_back();
+        }
+
+        static bool descends(pugi::xml_node n) {
+            if (n.type() != pugi::node_element || *n.value()) return false;
+            for (pugi::xml_node c = n.first_child(); c; c = c.next_sibling())
+                if (c.type() == pugi::node_element) return true;
+            return false;
+        }
+
+        void enter() {
+            pugi::xml_node_type type = node.type();
+            if (type == pugi::node_pcdata || type == pugi::node_cdata) {
+                PXStringSink sink(&out);
+                node.print(sink, indent.c_str(), flags, pugi::encoding_utf8, depth);
+                indent_flags = 0;
+                state = PX_LEAVE;
+                return;
+            }
+            if (type == pugi::node_document) {
+                indent_flags = PX_INDENT;
+                if (node.first_child()) node = node.first_child();
+                else state = PX_LEAVE;
+                return;
+            }
+            line_break();
+            if (descends(node)) {
+                scratch.reset();
+                pugi::xml_node copy = scratch.append_child(node.name());
+                for (pugi::xml_attribute a = node.first_attribute(); a;
+                     a = a.next_attribute())
+                    copy.append_attribute(a.name()).set_value(a.value());
+                print_trimmed(copy, pugi::format_no_empty_element_tags);
+                // "</name>", with pugixml's stand-in for an empty name
+                size_t end_len = 3 + strlen(*node.name() ? node.name() : ":anonymous");
+                end_tags.push_back(out.substr(out.size() - end_len));
+                out.resize(out.size() - end_len);
+                indent_flags = PX_NEWLINE | PX_INDENT;
+                node = node.first_child();
+                ++depth;
+                return;
+            }
+            print_trimmed(node, 0);
+            indent_flags = PX_NEWLINE | PX_INDENT;
+            state = PX_LEAVE;
+        }
+
+        void leave() {
+            if (node == root) { state = PX_DONE; return; }
+            if (node.next_sibling()) {
+                node = node.next_sibling();
+                state = PX_ENTER;
+                return;
+            }
+            node = node.parent();
+            if (node.type() == pugi::node_element) {
+                --depth;
+                line_break();
+                out += end_tags.back();
+                end_tags.pop_back();
+                indent_flags = PX_NEWLINE | PX_INDENT;
+            }
+        }
+
+        // The next batch, or false once exhausted.  At least one byte is
+        // held back until the end, where pugixml's trailing newline is
+        // dropped as in to_bytes().
+        bool next(std::string& result) {
+            while (state != PX_DONE && out.size() <= batch) {
+                if (state == PX_ENTER) enter();
+                else leave();
+            }
+            if (state != PX_DONE) {
+                result.assign(out, 0, batch);
+                out.erase(0, batch);
+                return true;
+            }
+            if (!out.empty() && out.back() == '\\n') out.pop_back();
+            if (out.empty()) return false;
+            result.swap(out);
+            out.clear();
+            return true;
+        }
+    };
+
+    static PXSerializeStream* px_serialize_stream_new(
+            pugi::xml_node node, const char* indent, unsigned int flags,
+            size_t chunk) {
+        PXSerializeStream* s = new PXSerializeStream();
+        s->root = s->node = node;
+        s->indent = indent;
+        s->flags = flags;
+        s->indent_length = ((flags & (pugi::format_indent | pugi::format_indent_attributes)) &&
+                            !(flags & pugi::format_raw)) ? s->indent.size() : 0;
+        if (!chunk) chunk = 1;
+        s->batch = chunk >= PX_SERIALIZE_BATCH ? chunk
+            : (PX_SERIALIZE_BATCH + chunk - 1) / chunk * chunk;
+        return s;
+    }
+    """
+    object px_node_to_bytes(xml_node node, const char* indent, unsigned int flags)
+    int px_node_write(xml_node node, const char* indent, unsigned int flags,
+                      PyObject* fh, bint text_mode, size_t chunk) except -1
+
+    cdef cppclass PXSerializeStream:
+        bint next(string& out) except +
+
+    int px_document_save(xml_document* doc, const char* indent,
+                         unsigned int flags, PyObject* fh) except -1
+
+    PXSerializeStream* px_serialize_stream_new(
+        xml_node node, const char* indent, unsigned int flags,
+        size_t chunk) except +
+
+
+cdef bytes _indent_arg(indent):
+    """Normalize an ``indent`` argument (``str`` or number of spaces)
+    to UTF-8 bytes, the way :meth:`XMLNode.to_string` does."""
+    if isinstance(indent, int):
+        return (" " * indent).encode("utf-8")
+    return (<str>indent).encode("utf-8")
+
+
+cdef bytes _serialize_to_bytes(xml_node node, indent, flags):
+    return px_node_to_bytes(node, _indent_arg(indent), <unsigned int>flags)
+
+
+cdef _serialize_to_file(xml_node node, fileobj, indent, size_t chunk_size, flags):
+    if not hasattr(fileobj, "write"):
+        raise TypeError(
+            f"expected a file-like object with .write(), "
+            f"got {type(fileobj).__name__!r}")
+    px_node_write(node, _indent_arg(indent), <unsigned int>flags,
+                  <PyObject*>fileobj, isinstance(fileobj, io.TextIOBase),
+                  chunk_size)
+
+
+cdef _save_to_writer(xml_document* doc, writer, bytes indent, flags):
+    px_document_save(doc, indent, <unsigned int>flags, <PyObject*>writer)
+
+
+cdef class _SerializedChunks:
+    """Iterator returned by ``iter_serialize()``: yields the serialized
+    XML as ``bytes`` chunks of *chunk_size* bytes (the last one may be
+    shorter).
+
+    Serialization is driven lazily by ``next()``, one batch of at least
+    64 KB worth of chunks at a time, on the calling thread.  The
+    document is registered like an indexed one, so adding, removing or
+    renaming nodes before the iterator is exhausted bumps its generation
+    and the next batch raises ``RuntimeError`` instead of walking freed
+    nodes.
+    """
+
+    cdef PXSerializeStream* _s
+    cdef object _owner
+    cdef bytes _batch
+    cdef Py_ssize_t _pos
+    cdef Py_ssize_t _chunk
+    cdef xml_node _doc_node
+    cdef _DocIndexes _state
+    cdef size_t _generation
+
+    def __dealloc__(self):
+        self._stop()
+
+    cdef void _stop(self) noexcept:
+        del self._s
+        self._s = NULL
+        if self._state is None:
+            return
+        self._state.serializers -= 1
+        # Only while it is still this document's: one that was freed
+        # meanwhile has dropped its entry already.
+        if _INDEXED_DOCS.get(px_document_key(self._doc_node)) is self._state:
+            _release_doc_indexes(self._doc_node, self._state)
+        self._state = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        cdef string batch
+        cdef bint more
+        cdef Py_ssize_t start = self._pos
+        if self._batch is not None and start < len(self._batch):
+            self._pos = start + self._chunk
+            return self._batch[start:self._pos]
+        if self._s is NULL:
+            raise StopIteration
+        if self._state.generation != self._generation:
+            self._stop()
+            raise RuntimeError("document changed during iter_serialize()")
+        more = self._s.next(batch)
+        if not more:
+            self._stop()
+            self._batch = None
+            self._owner = None
+            raise StopIteration
+        self._batch = <bytes>batch
+        if len(self._batch) <= self._chunk:
+            self._pos = len(self._batch)
+            return self._batch
+        self._pos = self._chunk
+        return self._batch[:self._chunk]
+
+
+cdef _serialize_chunks(owner, xml_node node, indent, size_t chunk_size, flags):
+    cdef _SerializedChunks it = _SerializedChunks.__new__(_SerializedChunks)
+    it._owner = owner
+    it._chunk = chunk_size if chunk_size else 1
+    if node.type() != node_null:
+        it._s = px_serialize_stream_new(node, _indent_arg(indent),
+                                        <unsigned int>flags, chunk_size)
+        it._doc_node = node.root()
+        it._state = _doc_indexes(it._doc_node, True)
+        it._state.serializers += 1
+        it._generation = it._state.generation
+    return it
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Tests for XMLDocument.index_by_attr (AttrIndex)
+"""
+
+import gc
+
+import pytest
+import pygixml
+from pygixml import objectify
+
+
+XML = (
+    "<db>"
+    "<person id='p1'><name>Ann</name></person>"
+    "<person id='p2'><name>Bob</name></person>"
+    "<group id='g1'><member ref='p2'/><member ref='p1'/><member ref='p9'/></group>"
+    "<alias id='p2'/>"
+    "</db>"
+)
+
+
+@pytest.fixture
+def doc():
+    return pygixml.parse_string(XML)
+
+
+def _names(nodes):
+    return [None if n is None else n.name for n in nodes]
+
+
+class TestLookups:
+    def test_get(self, doc):
+        ids = doc.index_by_attr("id")
+        assert ids.get("p1").child("name").text() == "Ann"
+        assert ids.get("g1").name == "group"
+
+    def test_get_returns_first_in_document_order(self, doc):
+        assert doc.index_by_attr("id").get("p2").name == "person"
+
+    def test_get_missing(self, doc):
+        ids = doc.index_by_attr("id")
+        assert ids.get("nope") is None
+        assert ids.get("nope", "dflt") == "dflt"
+
+    def test_get_all(self, doc):
+        ids = doc.index_by_attr("id")
+        assert _names(ids.get_all("p2")) == ["person", "alias"]
+        assert ids.get_all("nope") == []
+
+    def test_contains(self, doc):
+        ids = doc.index_by_attr("id")
+        assert "g1" in ids
+        assert "p9" not in ids
+        assert 1 not in ids
+
+    def test_len_counts_distinct_values(self, doc):
+        assert len(doc.index_by_attr("id")) == 3
+        assert len(doc.index_by_attr("ref")) == 3
+
+    def test_lookup(self, doc):
+        ids = doc.index_by_attr("id")
+        refs = [m.attribute("ref").value
+                for m in doc.root.children(True, tag="member")]
+        assert _names(ids.lookup(refs)) == ["person", "person", None]
+        assert ids.lookup(iter([])) == []
+
+    def test_lookup_rejects_non_str(self, doc):
+        with pytest.raises(TypeError):
+            doc.index_by_attr("id").lookup([1])
+
+    def test_tag_filter(self, doc):
+        people = doc.index_by_attr("id", tag="person")
+        assert _names(people.get_all("p2")) == ["person"]
+        assert "g1" not in people
+        assert people.tag == "person"
+        assert people.attr == "id"
+
+    def test_empty_attr_name(self, doc):
+        with pytest.raises(ValueError):
+            doc.index_by_attr("")
+
+    def test_repr(self, doc):
+        assert repr(doc.index_by_attr("id", tag="person")) == \
+            "AttrIndex('id', tag='person')"
+
+    def test_direct_construction(self, doc):
+        assert pygixml.AttrIndex(doc, "ref").get("p1").name == "member"
+
+    def test_keeps_document_alive(self):
+        ids = pygixml.parse_string(XML).index_by_attr("id")
+        gc.collect()
+        assert ids.get("p1").child("name").text() == "Ann"
+
+
+class TestInvalidation:
+    def test_other_documents_edits_do_not_rebuild(self, doc):
+        class Counting(pygixml.AttrIndex):
+            rebuilds = 0
+
+            def refresh(self):
+                Counting.rebuilds += 1
+                return super().refresh()
+
+        ids = Counting(doc, "id")
+        other = pygixml.parse_string(XML)
+        other_ids = other.index_by_attr("id")
+        Counting.rebuilds = 0
+        for i in range(5):
+            other.root.child("person").attribute("id").value = f"x{i}"
+            other.root.append_attribute("n").value = str(i)
+            assert ids.get("p1") is not None
+        assert Counting.rebuilds == 0
+        assert "x4" in other_ids and "p1" not in other_ids
+        doc.root.child("person").attribute("id").value = "p7"
+        assert "p7" in ids and Counting.rebuilds == 1
+
+    def test_attribute_value_change(self, doc):
+        ids = doc.index_by_attr("id")
+        ids.get("p1").attribute("id").value = "p7"
+        assert "p1" not in ids
+        assert ids.get("p7").child("name").text() == "Ann"
+
+    def test_attribute_reached_through_xpath(self, doc):
+        ids = doc.index_by_attr("id")
+        doc.root.select_node("//alias/@id").attribute.value = "a1"
+        assert ids.get("a1").name == "alias"
+        doc.root.child("person").first_attribute().name = "key"
+        assert _names(ids.get_all("p2")) == ["person"] and "p1" not in ids
+
+    def test_attribute_added_and_removed(self, doc):
+        ids = doc.index_by_attr("id")
+        doc.root.child("group").child("member").append_attribute("id").value = "m1"
+        assert ids.get("m1").name == "member"
+        alias = doc.root.child("alias")
+        alias.remove_attribute(alias.attribute("id"))
+        assert _names(ids.get_all("p2")) == ["person"]
+
+    def test_attribute_renamed(self, doc):
+        ids = doc.index_by_attr("id")
+        doc.root.child("alias").attribute("id").name = "key"
+        assert len(ids.get_all("p2")) == 1
+
+    def test_element_removed(self, doc):
+        ids = doc.index_by_attr("id")
+        doc.root.remove_all(tag="person")
+        assert ids.lookup(["p1", "p2"])[0] is None
+        assert ids.get("p2").name == "alias"
+
+    def test_element_renamed_with_tag_filter(self, doc):
+        people = doc.index_by_attr("id", tag="person")
+        doc.root.child("alias").name = "person"
+        assert len(people.get_all("p2")) == 2
+
+    def test_build_and_reload(self, doc):
+        ids = doc.index_by_attr("id")
+        doc.root.build(("person", {"id": "p3"}))
+        assert "p3" in ids
+        doc.load_string("<r><x id='only'/></r>")
+        assert "p1" not in ids
+        assert ids.get("only").name == "x"
+
+    def test_objectify_edits(self, doc):
+        ids = doc.index_by_attr("id")
+        root = objectify.from_node(doc.root)
+        root.alias.id = "a1"
+        assert ids.get("a1").name == "alias"
+        del root.alias.id
+        assert "a1" not in ids
+
+    def test_refresh(self, doc):
+        ids = doc.index_by_attr("id")
+        assert ids.refresh() == 4
+
+    def test_independent_of_tag_index(self, doc):
+        ids = doc.index_by_attr("id")
+        doc.build_index()
+        doc.build_index(tags=False)
+        doc.root.child("person").attribute("id").value = "q"
+        assert "q" in ids
+        assert len(doc.root.select_nodes("//person")) == 2
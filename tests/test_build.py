@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests for the declarative tree builder (XMLNode.build / XMLDocument.build)
+"""
+
+import pytest
+import pygixml
+
+
+class TestBuildElements:
+    """Element tuples, attributes, text and children"""
+
+    def test_single_element(self):
+        doc = pygixml.parse_string("<root/>")
+        assert doc.root.build(("item",)) == 1
+        assert doc.root.child("item").name == "item"
+
+    def test_attributes_and_text(self):
+        doc = pygixml.parse_string("<root/>")
+        doc.root.build(("item", {"id": "1", "count": 3}, "hello"))
+        item = doc.root.child("item")
+        assert item.attribute("id").value == "1"
+        assert item.attribute("count").value == "3"
+        assert item.text() == "hello"
+
+    def test_none_attribute_is_skipped(self):
+        doc = pygixml.parse_string("<root/>")
+        doc.root.build(("item", {"id": "1", "skip": None}))
+        item = doc.root.child("item")
+        assert item.attribute("skip").name is None
+
+    def test_nested_children(self):
+        doc = pygixml.parse_string("<root/>")
+        count = doc.root.build(
+            ("item", {"id": "1"}, [("name", "x"), ("tags", [("tag", "a"), ("tag", "b")])])
+        )
+        assert count == 5
+        assert doc.root.select_node("item/name").node.text() == "x"
+        assert len(doc.root.select_nodes("item/tags/tag")) == 2
+
+    def test_nested_tuple_child(self):
+        doc = pygixml.parse_string("<root/>")
+        doc.root.build(("a", ("b", "x")))
+        assert doc.root.child("a").child("b").text() == "x"
+
+    def test_mixed_content_order(self):
+        doc = pygixml.parse_string("<root/>")
+        doc.root.build(("p", ["one ", ("b", "two"), " three"]))
+        p = doc.root.child("p")
+        assert p.text(join="") == "one two three"
+
+    def test_text_is_escaped_on_output(self):
+        doc = pygixml.parse_string("<root/>")
+        doc.root.build(("item", {"q": 'a"b'}, "x < y & z"))
+        xml = doc.root.to_string()
+        assert "x &lt; y &amp; z" in xml
+        assert 'q="a&quot;b"' in xml
+
+    def test_unicode(self):
+        doc = pygixml.parse_string("<root/>")
+        doc.root.build(("شهر", {"نام": "تهران"}, "متن"))
+        elem = doc.root.first_child()
+        assert elem.name == "شهر"
+        assert elem.attribute("نام").value == "تهران"
+        assert elem.text() == "متن"
+
+
+class TestBuildIterables:
+    """Top-level lists, generators and documents"""
+
+    def test_list_of_records(self):
+        doc = pygixml.parse_string("<root/>")
+        records = [("item", {"id": str(i)}) for i in range(5)]
+        assert doc.root.build(records) == 5
+        assert [c.attribute("id").value for c in doc.root.children()] == \
+            ["0", "1", "2", "3", "4"]
+
+    def test_generator_of_records(self):
+        doc = pygixml.parse_string("<root/>")
+        assert doc.root.build(("item", str(i)) for i in range(100)) == 100
+        assert len(doc.root.select_nodes("item")) == 100
+
+    def test_appends_after_existing_children(self):
+        doc = pygixml.parse_string("<root><first/></root>")
+        doc.root.build(("second",))
+        assert [c.name for c in doc.root.children()] == ["first", "second"]
+
+    def test_document_build(self):
+        doc = pygixml.XMLDocument()
+        assert doc.build(("catalog", [("item", {"id": "1"}, "a")])) == 2
+        assert doc.root.name == "catalog"
+        assert doc.root.child("item").text() == "a"
+
+    def test_same_as_manual_construction(self):
+        manual = pygixml.XMLDocument()
+        root = manual.append_child("root")
+        item = root.append_child("item")
+        item.append_attribute("id").value = "7"
+        item.append_child("name").value = "n"
+
+        built = pygixml.XMLDocument()
+        built.build(("root", ("item", {"id": "7"}, ("name", "n"))))
+        assert built.to_string() == manual.to_string()
+
+
+class TestBuildErrors:
+    """Invalid specs and invalid targets"""
+
+    @pytest.mark.parametrize("spec", [5, {"a": "b"}, (1,)])
+    def test_type_errors(self, spec):
+        doc = pygixml.parse_string("<root/>")
+        with pytest.raises(TypeError):
+            doc.root.build(spec)
+
+    @pytest.mark.parametrize("spec", [("a", b"x"), ("a", {"k": b"v"}),
+                                      ("a", {b"k": "v"})])
+    def test_bytes_rejected(self, spec):
+        doc = pygixml.parse_string("<root/>")
+        with pytest.raises(TypeError):
+            doc.root.build(spec)
+
+    @pytest.mark.parametrize("spec", [(), ("",), ("a\0b",), ("a", {"": "v"}),
+                                      ("a", {"k\0": "v"})])
+    def test_value_errors(self, spec):
+        doc = pygixml.parse_string("<root/>")
+        with pytest.raises(ValueError):
+            doc.root.build(spec)
+
+    def test_deep_nesting_raises_recursion_error(self):
+        spec = ("leaf",)
+        for _ in range(200000):
+            spec = ("n", spec)
+        doc = pygixml.parse_string("<root/>")
+        with pytest.raises(RecursionError):
+            doc.root.build(spec)
+
+    def test_null_node(self):
+        doc = pygixml.parse_string("<root/>")
+        with pytest.raises(pygixml.PygiXMLNullNodeError):
+            doc.root.child("missing").build(("x",))
+
+    def test_text_node_cannot_have_children(self):
+        doc = pygixml.parse_string("<root>text</root>")
+        with pytest.raises(pygixml.PygiXMLError):
+            doc.root.first_child().build(("x",))
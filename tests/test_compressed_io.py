@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for transparent gzip / zlib / xz input and output
+"""
+
+import gzip
+import json
+import lzma
+import os
+import zlib
+
+import pytest
+import pygixml
+from pygixml import jsonify, objectify
+
+XML = (b'<?xml version="1.0"?><root>'
+       + b"".join(b'<rec id="%d"><n>v%d</n></rec>' % (i, i) for i in range(200))
+       + b"</root>")
+
+CODECS = {
+    "gzip": (".gz", gzip.compress, gzip.decompress),
+    "xz": (".xz", lzma.compress, lzma.decompress),
+    "zlib": (".zz", zlib.compress, zlib.decompress),
+}
+
+
+@pytest.fixture(params=sorted(CODECS))
+def codec(request):
+    return CODECS[request.param]
+
+
+@pytest.fixture
+def compressed(tmp_path, codec):
+    ext, compress, _ = codec
+    path = tmp_path / ("data.xml" + ext)
+    path.write_bytes(compress(XML))
+    return str(path)
+
+
+class TestCompressedInput:
+    """Compression is detected from magic bytes on every reader"""
+
+    def test_parse_file(self, compressed):
+        doc = pygixml.parse_file(compressed)
+        assert len(doc.root.select_nodes("rec")) == 200
+        assert doc.root.select_node("rec[@id='7']/n").node.text() == "v7"
+
+    def test_parse_file_with_flags(self, compressed):
+        doc = pygixml.parse_file(compressed, pygixml.ParseFlags.MINIMAL)
+        assert doc.root.first_child().name == "rec"
+
+    def test_detection_ignores_extension(self, tmp_path):
+        path = tmp_path / "no_extension"
+        path.write_bytes(gzip.compress(XML))
+        doc = pygixml.parse_file(str(path))
+        assert doc.root.name == "root"
+
+    def test_zlib_without_extension(self, tmp_path):
+        path = tmp_path / "no_extension"
+        path.write_bytes(zlib.compress(XML))
+        assert pygixml.parse_file(str(path)).root.name == "root"
+
+    @pytest.mark.parametrize("text", [b"hb<a/>", b"Xf<a/>", b"8(<a/>"])
+    def test_text_with_zlib_like_header(self, tmp_path, text):
+        path = tmp_path / "fragment.txt"
+        path.write_bytes(text)
+        flags = pygixml.ParseFlags.DEFAULT | pygixml.ParseFlags.FRAGMENT
+        doc = pygixml.parse_file(str(path), flags)
+        assert doc.first_child().value == text[:2].decode()
+        assert doc.first_child().next_sibling.name == "a"
+
+    def test_iterfind(self, compressed):
+        ids = [e.attrib["id"] for e in pygixml.iterfind(compressed, "rec")]
+        assert ids == [str(i) for i in range(200)]
+
+    def test_objectify_from_file(self, tmp_path, codec):
+        ext, compress, _ = codec
+        path = tmp_path / ("data.xml" + ext)
+        path.write_bytes(compress(b"<root><rec/><rec/></root>"))
+        root = objectify.from_file(str(path))
+        assert len(root.findall("rec")) == 2
+
+    def test_stream_dump(self, compressed, tmp_path):
+        out = str(tmp_path / "out.json")
+        jsonify.stream_dump(compressed, out)
+        with open(out) as f:
+            assert len(json.load(f)["root"]["rec"]) == 200
+
+    def test_stream_jsonl(self, compressed, tmp_path):
+        out = str(tmp_path / "out.jsonl")
+        assert jsonify.stream_jsonl(compressed, out, "rec") == 200
+        with open(out) as f:
+            assert json.loads(f.readline()) == {"@id": "0", "n": "v0"}
+
+    def test_truncated_input(self, tmp_path):
+        path = str(tmp_path / "bad.xml.gz")
+        with open(path, "wb") as f:
+            f.write(gzip.compress(XML)[:60])
+        with pytest.raises(pygixml.PygiXMLError):
+            pygixml.parse_file(path)
+        with pytest.raises(pygixml.PygiXMLError, match="cannot read XML input"):
+            jsonify.stream_jsonl(path, str(tmp_path / "o.jsonl"), "rec")
+        assert not pygixml.XMLDocument().load_file(path)
+
+
+class TestCompressedOutput:
+    """Compression is chosen from the output path's extension"""
+
+    def test_save_file(self, tmp_path, codec):
+        ext, _, decompress = codec
+        doc = pygixml.parse_string(XML.decode())
+        path = str(tmp_path / ("out.xml" + ext))
+        doc.save_file(path, flags=pygixml.FormatFlags.RAW)
+        with open(path, "rb") as f:
+            data = decompress(f.read())
+        assert data.startswith(b"<?xml")
+        assert data.endswith(doc.to_bytes(flags=pygixml.FormatFlags.RAW))
+
+    def test_save_and_reload(self, tmp_path, codec):
+        doc = pygixml.parse_string(XML.decode())
+        path = str(tmp_path / ("out.xml" + codec[0]))
+        doc.save_file(path)
+        again = pygixml.parse_file(path)
+        assert len(again.root.select_nodes("rec")) == 200
+
+    def test_stream_jsonl_compressed_output(self, compressed, tmp_path):
+        out = str(tmp_path / "out.jsonl.gz")
+        assert jsonify.stream_jsonl(compressed, out, "rec") == 200
+        with gzip.open(out, "rt") as f:
+            assert len(f.read().splitlines()) == 200
+
+    def test_stream_dump_rejects_compressed_output(self, compressed, tmp_path):
+        with pytest.raises(pygixml.PygiXMLError):
+            jsonify.stream_dump(compressed, str(tmp_path / "out.json.gz"))
+
+    def test_xml_writer(self, tmp_path, codec):
+        ext, _, decompress = codec
+        path = str(tmp_path / ("out.xml" + ext))
+        with pygixml.XMLWriter(path, declaration=False) as w:
+            w.element("r", None, "x")
+        with open(path, "rb") as f:
+            assert decompress(f.read()) == b"<r>x</r>"
+
+    def test_plain_output_unchanged(self, tmp_path):
+        doc = pygixml.parse_string("<root/>")
+        path = str(tmp_path / "out.xml")
+        doc.save_file(path)
+        with open(path, "rb") as f:
+            assert f.read().startswith(b"<?xml")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for FormatFlags enum in pygixml
+"""
+
+import io
+import os
+import tempfile
+
+import pytest
+import pygixml
+
+F = pygixml.FormatFlags
+XML = '<root a="1"><item id="x&amp;y">v &lt; w</item><empty/></root>'
+
+
+@pytest.fixture
+def doc():
+    return pygixml.parse_string(XML)
+
+
+class TestFormatFlagsEnum:
+    """Test FormatFlags enum"""
+
+    def test_format_flags_is_intflag(self):
+        from enum import IntFlag
+        assert issubclass(F, IntFlag)
+
+    def test_pugixml_values(self):
+        assert F.INDENT == 0x01
+        assert F.RAW == 0x04
+        assert F.NO_DECLARATION == 0x08
+        assert F.ATTRIBUTE_SINGLE_QUOTE == 0x200
+        assert F.DEFAULT == F.INDENT
+
+    def test_bitwise_or(self):
+        combined = F.RAW | F.NO_DECLARATION
+        assert F.RAW in combined
+        assert F.INDENT not in combined
+
+
+class TestToStringFlags:
+    """to_string() / to_bytes() honour the flags"""
+
+    def test_default_unchanged(self, doc):
+        assert doc.to_string(flags=F.DEFAULT) == doc.to_string()
+
+    def test_raw(self, doc):
+        assert doc.to_string(flags=F.RAW) == \
+            '<root a="1"><item id="x&amp;y">v &lt; w</item><empty/></root>'
+
+    def test_raw_ignores_indent(self, doc):
+        assert doc.to_string(4, flags=F.RAW) == doc.to_string("", flags=F.RAW)
+
+    def test_no_escapes(self, doc):
+        xml = doc.root.child("item").to_string(flags=F.RAW | F.NO_ESCAPES)
+        assert xml == '<item id="x&y">v < w</item>'
+
+    def test_single_quote(self, doc):
+        assert doc.root.to_string(flags=F.RAW | F.ATTRIBUTE_SINGLE_QUOTE) \
+            .startswith("<root a='1'>")
+
+    def test_no_empty_element_tags(self, doc):
+        xml = doc.root.child("empty").to_string(flags=F.RAW | F.NO_EMPTY_ELEMENT_TAGS)
+        assert xml == "<empty></empty>"
+
+    def test_to_bytes_matches_to_string(self, doc):
+        flags = F.RAW | F.ATTRIBUTE_SINGLE_QUOTE
+        assert doc.to_bytes(flags=flags) == doc.to_string(flags=flags).encode()
+
+    def test_write_and_iter_serialize(self, doc):
+        out = io.BytesIO()
+        doc.write(out, flags=F.RAW)
+        assert out.getvalue() == doc.to_bytes(flags=F.RAW)
+        assert b"".join(doc.iter_serialize(5, flags=F.RAW)) == out.getvalue()
+
+
+class TestSaveFileFlags:
+    """save_file() honours the flags"""
+
+    def _save(self, doc, **kwargs):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.xml")
+            doc.save_file(path, **kwargs)
+            with open(path, "rb") as f:
+                return f.read()
+
+    def test_default_has_declaration(self, doc):
+        assert self._save(doc).startswith(b"<?xml")
+
+    def test_raw_no_declaration(self, doc):
+        data = self._save(doc, flags=F.RAW | F.NO_DECLARATION)
+        assert data == doc.to_bytes(flags=F.RAW)
+
+    def test_write_bom(self, doc):
+        assert self._save(doc, flags=F.WRITE_BOM).startswith(b"\xef\xbb\xbf")
+
+
+class TestXMLWriterFlags:
+    """XMLWriter honours the flags for its own events and subtrees"""
+
+    def _write(self, build, **kwargs):
+        out = io.BytesIO()
+        with pygixml.XMLWriter(out, **kwargs) as w:
+            build(w)
+        return out.getvalue()
+
+    def test_no_declaration(self):
+        data = self._write(lambda w: w.element("r"), flags=F.NO_DECLARATION)
+        assert data == b"<r/>"
+
+    def test_raw_disables_indent(self):
+        def build(w):
+            w.start("r")
+            w.element("a")
+            w.end()
+        data = self._write(build, indent=2, flags=F.RAW | F.NO_DECLARATION)
+        assert data == b"<r><a/></r>"
+
+    def test_write_bom(self):
+        data = self._write(lambda w: w.element("r"), flags=F.WRITE_BOM)
+        assert data.startswith(b"\xef\xbb\xbf<?xml")
+
+    def test_escaping_and_quotes(self):
+        data = self._write(
+            lambda w: w.element("r", {"q": "a&b"}, "x<y"),
+            declaration=False,
+            flags=F.NO_ESCAPES | F.ATTRIBUTE_SINGLE_QUOTE | F.NO_EMPTY_ELEMENT_TAGS)
+        assert data == b"<r q='a&b'>x<y</r>"
+
+    def test_no_empty_element_tags(self):
+        data = self._write(lambda w: w.element("r"), declaration=False,
+                           flags=F.NO_EMPTY_ELEMENT_TAGS)
+        assert data == b"<r></r>"
+
+    def test_indent_attributes(self):
+        data = self._write(lambda w: w.element("r", {"a": "1", "b": "2"}),
+                           indent=2, declaration=False, flags=F.INDENT_ATTRIBUTES)
+        assert data == b'<r\n  a="1"\n  b="2"/>\n'
+
+    def test_flags_reach_subtree(self, doc):
+        def build(w):
+            w.start("wrap")
+            w.write_subtree(doc.root.child("empty"))
+            w.end()
+        data = self._write(build, declaration=False, flags=F.NO_EMPTY_ELEMENT_TAGS)
+        assert data == b"<wrap><empty></empty></wrap>"
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for pygixml.parallel_iterfind (record-boundary splitting of one file)
+"""
+
+import gzip
+import pickle
+
+import pytest
+import pygixml
+
+
+DOC = (
+    b"<?xml version='1.0'?>\n"
+    b"<!DOCTYPE db [<!ENTITY x 'y'> <!-- don't <rec id='dtd'/> -->]>\n"
+    b"<db>\n"
+    b"  <rec id='1' note=\"a>b\"><v>one</v></rec>\n"
+    b"  <!-- <rec id='comment'> -->\n"
+    b"  <rec id='2' end='/>'><v><![CDATA[</rec><rec id='cdata'>]]></v></rec>\n"
+    b"  <?pi <rec id='pi'>?>\n"
+    b"  <group>\n"
+    b"    <rec id='3'><rec id='3.1'/><rec id='3.2'><v>in</v></rec></rec>\n"
+    b"    <rec id='4'/>text<rec id='5'>five</rec>\n"
+    b"  </group>\n"
+    b"  <records><rec\tid='6'\n>six</rec></records>\n"
+    b"</db>\n"
+)
+
+
+def _ids(elements):
+    return [e.get("id") for e in elements]
+
+
+def _count(records):
+    return sum(1 for _ in records)
+
+
+def _texts(records):
+    return [r.findtext("v") for r in records]
+
+
+@pytest.fixture
+def path(tmp_path):
+    p = tmp_path / "records.xml"
+    p.write_bytes(DOC)
+    return p
+
+
+class TestMatchesIterfind:
+    def test_default(self, path):
+        expected = _ids(pygixml.iterfind(str(path), "rec"))
+        assert expected == ["1", "2", "3.1", "3.2", "3", "4", "5", "6"]
+        assert _ids(pygixml.parallel_iterfind(str(path), "rec", workers=2)) == expected
+
+    def test_every_cut_position(self, path):
+        expected = [(e.get("id"), e.text, len(e))
+                    for e in pygixml.iterfind(path, "rec")]
+        for size in range(1, len(DOC) + 1, 3):
+            got = [(e.get("id"), e.text, len(e)) for e in pygixml.parallel_iterfind(
+                path, "rec", workers=3, backend="thread", range_size=size)]
+            assert got == expected, size
+
+    def test_subtrees_survive_the_process_pool(self, path):
+        recs = list(pygixml.parallel_iterfind(path, "rec", workers=2,
+                                              range_size=64))
+        assert recs[1].attrib == {"id": "2", "end": "/>"}
+        assert recs[1].findtext("v") == "</rec><rec id='cdata'>"
+        assert _ids(recs[4]) == ["3.1", "3.2"]
+        assert recs[6].text == "five" and recs[6].tail is None
+
+    def test_no_records(self, tmp_path):
+        p = tmp_path / "empty.xml"
+        p.write_bytes(b"<db><other/></db>")
+        assert list(pygixml.parallel_iterfind(p, "rec", workers=2)) == []
+
+
+class TestReducer:
+    def test_ordered_results_per_range(self, path):
+        parts = list(pygixml.parallel_iterfind(path, "rec", workers=2,
+                                               reducer=_texts, range_size=150))
+        assert len(parts) > 1
+        assert sum(parts, []) == _texts(pygixml.iterfind(path, "rec"))
+
+    def test_unordered(self, path):
+        total = sum(pygixml.parallel_iterfind(path, "rec", workers=3, ordered=False,
+                                              reducer=_count, range_size=40))
+        assert total == 8
+
+    def test_thread_backend_accepts_lambdas(self, path):
+        ids = pygixml.parallel_iterfind(path, "rec", backend="thread",
+                                        reducer=lambda recs: _ids(recs))
+        assert sum(ids, []) == _ids(pygixml.iterfind(path, "rec"))
+
+
+class TestInputs:
+    def test_compressed_file_falls_back(self, tmp_path):
+        p = tmp_path / "records.xml.gz"
+        p.write_bytes(gzip.compress(DOC))
+        assert _ids(pygixml.parallel_iterfind(p, "rec")) == \
+            _ids(pygixml.iterfind(p, "rec"))
+        assert list(pygixml.parallel_iterfind(p, "rec", reducer=_count)) == [8]
+
+    def test_malformed_record(self, tmp_path):
+        p = tmp_path / "bad.xml"
+        p.write_bytes(b"<db><rec><a></b></rec></db>")
+        with pytest.raises(pygixml.PygiXMLError):
+            list(pygixml.parallel_iterfind(p, "rec", backend="thread"))
+
+    def test_error_reports_file_offset(self, tmp_path):
+        data = b"<db>\n" + b"<rec id='1'/>\n" * 20 + b"<rec>\n<a></b></rec>\n</db>"
+        p = tmp_path / "bad.xml"
+        p.write_bytes(data)
+        with pytest.raises(pygixml.PygiXMLError,
+                           match=rf"\(file offset {data.index(b'</b>') + 2}\)$"):
+            list(pygixml.parallel_iterfind(p, "rec", backend="thread", range_size=64))
+
+    def test_unclosed_record(self, tmp_path):
+        p = tmp_path / "cut.xml"
+        p.write_bytes(b"<db><rec id='1'/><rec id='2'><v>")
+        with pytest.raises(pygixml.PygiXMLError):
+            list(pygixml.parallel_iterfind(p, "rec", backend="thread"))
+
+    def test_early_close(self, path):
+        gen = pygixml.parallel_iterfind(path, "rec", workers=2, range_size=32)
+        assert next(gen).get("id") == "1"
+        gen.close()
+
+    @pytest.mark.parametrize("kwargs, exc", [
+        ({"workers": 0}, ValueError),
+        ({"backend": "fibers"}, ValueError),
+        ({"range_size": 0}, ValueError),
+    ])
+    def test_bad_arguments(self, path, kwargs, exc):
+        with pytest.raises(exc):
+            next(pygixml.parallel_iterfind(path, "rec", **kwargs))
+
+    def test_bad_tag_and_source(self, path):
+        with pytest.raises(ValueError):
+            next(pygixml.parallel_iterfind(path, ""))
+        with pytest.raises(TypeError):
+            next(pygixml.parallel_iterfind(DOC, "rec"))
+
+
+class TestStreamElementPickle:
+    def test_round_trip(self):
+        elem = next(pygixml.iterfind(b"<r><a k='v'>t<b/>tail</a></r>", "a"))
+        copy = pickle.loads(pickle.dumps(elem))
+        assert (copy.tag, copy.attrib, copy.text) == ("a", {"k": "v"}, "t")
+        assert copy[0].tag == "b" and copy[0].tail == "tail"
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for pygixml.QuerySet (many expressions, one traversal)
+"""
+
+import pytest
+import pygixml
+
+
+XML = (
+    "<lib>"
+    "<shelf n='1'><book id='a' lang='en'><title>A</title></book>"
+    "<book id='b'><title>B</title><note><title>inner</title></note></book></shelf>"
+    "<shelf n='2'><book id='c' lang='en'><title>C</title></book>text</shelf>"
+    "</lib>"
+)
+
+PATHS = [
+    "//book",
+    "/lib/shelf/book/title",
+    "//book[@lang='en']/@id",
+    "//book[2]",
+    "//title/text()",
+    "//@id",
+    "shelf[2]/book",
+    "*/book[1]/title",
+    "//shelf//title",
+    "//book/@*",
+    "//*[@lang][1]",
+]
+
+
+def _key(item):
+    if isinstance(item, pygixml.XMLAttribute):
+        return ("@", item.name, item.value)
+    return (item.type, item.name, item.value)
+
+
+@pytest.fixture
+def doc():
+    return pygixml.parse_string(XML)
+
+
+class TestNativePaths:
+    """Path-style expressions match select_nodes()"""
+
+    @pytest.mark.parametrize("context", ["doc", "root"])
+    def test_matches_select_nodes(self, doc, context):
+        ctx = doc if context == "doc" else doc.root
+        result = pygixml.QuerySet(PATHS).evaluate(ctx)
+        for expr in PATHS:
+            expected = [m.attribute if m.attribute else m.node
+                        for m in doc.root.select_nodes(expr)] \
+                if context == "root" or expr.startswith("/") else None
+            if expected is None:
+                continue
+            assert sorted(map(_key, result[expr])) == sorted(map(_key, expected)), expr
+
+    def test_all_native(self):
+        qs = pygixml.QuerySet(PATHS)
+        assert qs.native == PATHS
+        assert qs.fallback == []
+
+    def test_document_order(self, doc):
+        titles = pygixml.QuerySet(["//title"]).evaluate(doc)["//title"]
+        assert [t.child_value() for t in titles] == ["A", "B", "inner", "C"]
+
+    def test_relative_from_element(self, doc):
+        shelf = doc.root.child("shelf")
+        result = pygixml.QuerySet(["book/@id", "/lib/shelf/@n"]).evaluate(shelf)
+        assert [a.value for a in result["book/@id"]] == ["a", "b"]
+        assert [a.value for a in result["/lib/shelf/@n"]] == ["1", "2"]
+
+    def test_text_nodes(self, doc):
+        result = pygixml.QuerySet(["/lib/shelf/text()"]).evaluate(doc)
+        assert [n.value for n in result["/lib/shelf/text()"]] == ["text"]
+
+
+class TestFallback:
+    """Other expressions are evaluated one by one"""
+
+    def test_typed_results(self, doc):
+        exprs = ["count(//book)", "string(//title)", "boolean(//missing)",
+                 "//book[last()]/@id", "//book | //shelf", "@n"]
+        qs = pygixml.QuerySet(exprs)
+        assert qs.fallback == exprs
+        result = qs.evaluate(doc.root)
+        assert result["count(//book)"] == 3.0
+        assert result["string(//title)"] == "A"
+        assert result["boolean(//missing)"] is False
+        assert [a.value for a in result["//book[last()]/@id"]] == ["b", "c"]
+        assert len(result["//book | //shelf"]) == 5
+        assert result["@n"] == []
+
+    def test_document_order(self, doc):
+        exprs = ["//title[.='inner']/ancestor::*", "//book[@id='c'] | //book[@id='a']",
+                 "//book[@id='c']/preceding::book"]
+        result = pygixml.QuerySet(exprs).evaluate(doc)
+        assert [n.name for n in result[exprs[0]]] == ["lib", "shelf", "book", "note"]
+        assert [n.attribute("id").value for n in result[exprs[1]]] == ["a", "c"]
+        assert [n.attribute("id").value for n in result[exprs[2]]] == ["a", "b"]
+
+    def test_mixed(self, doc):
+        qs = pygixml.QuerySet(["//book/@id", "count(//book)", "//book/@id"])
+        assert len(qs) == 2
+        result = qs.evaluate(doc)
+        assert set(result) == {"//book/@id", "count(//book)"}
+        assert [a.value for a in result["//book/@id"]] == ["a", "b", "c"]
+
+
+class TestErrors:
+
+    def test_invalid_expression(self):
+        with pytest.raises(RuntimeError):
+            pygixml.QuerySet(["//book[", "//book"])
+
+    def test_bad_context(self):
+        with pytest.raises(TypeError):
+            pygixml.QuerySet(["//a"]).evaluate("<a/>")
+
+    def test_null_context(self, doc):
+        with pytest.raises(pygixml.PygiXMLNullNodeError):
+            pygixml.QuerySet(["a"]).evaluate(doc.root.child("missing"))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for pygixml.build_record_index / pygixml.RecordFile
+"""
+
+import gzip
+import os
+
+import pytest
+import pygixml
+
+
+DOC = (
+    b"\xef\xbb\xbf<?xml version='1.0'?>\n"
+    b"<db>\n"
+    b"  <!-- <rec id='comment'/> -->\n"
+    b"  <rec id='a'><name>Ann</name><rec id='inner'/></rec>\n"
+    b"  <group><rec\n    id='b' x='1'><name>B<i/>ob</name></rec></group>\n"
+    b"  <rec><name>  no id </name><![CDATA[</rec>]]></rec>\n"
+    b"  <rec id='a'>duplicate</rec>\n"
+    b"</db>\n"
+)
+
+
+@pytest.fixture
+def path(tmp_path):
+    p = tmp_path / "records.xml"
+    p.write_bytes(DOC)
+    return p
+
+
+@pytest.fixture
+def records(path):
+    pygixml.build_record_index(path, "rec")
+    with pygixml.RecordFile(path) as rf:
+        yield rf
+
+
+class TestBuild:
+    def test_default_index_path(self, path):
+        index = pygixml.build_record_index(path, "rec")
+        assert index == str(path) + ".pgxidx"
+        assert os.path.exists(index)
+
+    def test_byte_ranges(self, records):
+        assert len(records) == 4
+        assert records.raw(0) == b"<rec id='a'><name>Ann</name><rec id='inner'/></rec>"
+        assert records.raw(1).startswith(b"<rec\n    id='b'")
+        assert records.raw(2).endswith(b"]]></rec>")
+
+    def test_child_text_key(self, path, tmp_path):
+        index = pygixml.build_record_index(path, "rec", key="name",
+                                           index_path=tmp_path / "by-name")
+        with pygixml.RecordFile(path, index) as rf:
+            assert rf.keys() == ["Ann", "B", "  no id "]
+            assert rf.get("B").get("id") == "b"
+
+    def test_no_keys(self, path):
+        pygixml.build_record_index(path, "rec", key=None)
+        with pygixml.RecordFile(path) as rf:
+            assert rf[3].text == "duplicate"
+            with pytest.raises(ValueError):
+                rf.get("a")
+
+    def test_no_records(self, tmp_path):
+        p = tmp_path / "empty.xml"
+        p.write_bytes(b"<db><other/></db>")
+        pygixml.build_record_index(p, "rec")
+        with pygixml.RecordFile(p) as rf:
+            assert len(rf) == 0 and list(rf) == []
+
+    def test_malformed(self, tmp_path):
+        p = tmp_path / "bad.xml"
+        p.write_bytes(b"<db><rec></db>")
+        with pytest.raises(pygixml.PygiXMLError):
+            pygixml.build_record_index(p, "rec")
+
+    def test_rejected_inputs(self, tmp_path, path):
+        gz = tmp_path / "records.xml.gz"
+        gz.write_bytes(gzip.compress(DOC))
+        with pytest.raises(ValueError):
+            pygixml.build_record_index(gz, "rec")
+        with pytest.raises(ValueError):
+            pygixml.build_record_index(path, "")
+        with pytest.raises(ValueError):
+            pygixml.build_record_index(path, "rec", key="@")
+        with pytest.raises(TypeError):
+            pygixml.build_record_index(DOC, "rec")
+
+
+class TestRecordFile:
+    def test_getitem(self, records):
+        first = records[0]
+        assert first.tag == "rec" and first.findtext("name") == "Ann"
+        assert first[1].get("id") == "inner" and first.tail is None
+        assert records[-1].text == "duplicate"
+        with pytest.raises(IndexError):
+            records[4]
+
+    def test_slices(self, records):
+        assert [r.get("id") for r in records[1:3]] == ["b", None]
+        assert [r.get("id") for r in records.slice(0, 2)] == ["a", "b"]
+        assert [r.get("id") for r in records[::-2]] == ["a", "b"]
+
+    def test_get_by_key(self, records):
+        assert records.get("a").findtext("name") == "Ann"     # first record wins
+        assert records.get("b").attrib == {"id": "b", "x": "1"}
+        assert records.get("zzz") is None
+        assert records.get("zzz", 0) == 0
+        assert records.position("b") == 1
+        assert "a" in records and "inner" not in records and 1 not in records
+
+    def test_matches_iterfind(self, records, path):
+        outer = [r for r in pygixml.iterfind(path, "rec") if r.get("id") != "inner"]
+        assert [(r.get("id"), r.text) for r in records] == \
+            [(r.get("id"), r.text) for r in outer]
+
+    def test_document(self, records):
+        doc = records.document(1)
+        assert doc.root.name == "rec"
+        assert doc.root.attribute("x").value == "1"
+
+    def test_stale_index(self, records, path):
+        path.write_bytes(DOC + b"\n")
+        with pytest.raises(pygixml.PygiXMLError):
+            pygixml.RecordFile(path)
+
+    def test_not_an_index(self, path, tmp_path):
+        bogus = tmp_path / "bogus"
+        bogus.write_bytes(b"hello")
+        with pytest.raises(ValueError):
+            pygixml.RecordFile(path, bogus)
+
+    def test_closed(self, records):
+        records.close()
+        records.close()
+        with pytest.raises(ValueError):
+            records[0]
+
+    def test_repr(self, records, path):
+        assert repr(records) == f"RecordFile({str(path)!r}, tag='rec', records=4)"
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for native bulk removal (XMLNode.remove_all / XMLDocument.prune)
+"""
+
+import pytest
+import pygixml
+
+RAW = pygixml.FormatFlags.RAW
+
+
+def _xml(node):
+    return node.to_string(flags=RAW)
+
+
+class TestRemoveAll:
+    """XMLNode.remove_all() criteria"""
+
+    def test_by_tag(self):
+        doc = pygixml.parse_string("<r><debug/><a><debug>x</debug><keep/></a></r>")
+        assert doc.root.remove_all(tag="debug") == 2
+        assert _xml(doc.root) == "<r><a><keep/></a></r>"
+
+    def test_nested_matches_counted_once(self):
+        doc = pygixml.parse_string("<r><debug><debug/></debug></r>")
+        assert doc.root.remove_all(tag="debug") == 1
+        assert _xml(doc.root) == "<r/>"
+
+    def test_by_attr(self):
+        doc = pygixml.parse_string('<r><a x="1"/><b/><c x=""/></r>')
+        assert doc.root.remove_all(attr="x") == 2
+        assert _xml(doc.root) == "<r><b/></r>"
+
+    def test_by_attr_value(self):
+        doc = pygixml.parse_string(
+            '<r><i s="draft"/><i s="ok"/><j s="draft"/></r>')
+        assert doc.root.remove_all(tag="i", attr="s", value="draft") == 1
+        assert _xml(doc.root) == '<r><i s="ok"/><j s="draft"/></r>'
+
+    def test_by_node_type(self):
+        doc = pygixml.parse_string(
+            "<r><!--a--><x><!--b-->text</x></r>", pygixml.ParseFlags.FULL)
+        assert doc.root.remove_all(node_type="comment") == 2
+        assert _xml(doc.root) == "<r><x>text</x></r>"
+
+    def test_text_nodes(self):
+        doc = pygixml.parse_string("<r><a>1</a><b>2</b></r>")
+        assert doc.root.remove_all(node_type="pcdata") == 2
+        assert _xml(doc.root) == "<r><a/><b/></r>"
+
+    def test_self_is_never_removed(self):
+        doc = pygixml.parse_string("<debug><debug/></debug>")
+        assert doc.root.remove_all(tag="debug") == 1
+        assert doc.root.name == "debug"
+
+    def test_scoped_to_subtree(self):
+        doc = pygixml.parse_string("<r><a><x/></a><b><x/></b></r>")
+        assert doc.root.child("a").remove_all(tag="x") == 1
+        assert _xml(doc.root) == "<r><a/><b><x/></b></r>"
+
+    def test_no_match(self):
+        doc = pygixml.parse_string("<r><a/></r>")
+        assert doc.root.remove_all(tag="zzz") == 0
+        assert _xml(doc.root) == "<r><a/></r>"
+
+    def test_many_siblings(self):
+        doc = pygixml.parse_string("<r/>")
+        doc.root.build(("item", {"drop": str(i % 2)}) for i in range(1000))
+        assert doc.root.remove_all(attr="drop", value="1") == 500
+        assert len(doc.root.select_nodes("item")) == 500
+
+
+class TestPrune:
+    """XMLDocument.prune() covers the whole document"""
+
+    def test_top_level_comments(self):
+        doc = pygixml.parse_string(
+            "<!--head--><r><!--in--><a/></r>", pygixml.ParseFlags.FULL)
+        assert doc.prune(node_type="comment") == 2
+        assert doc.first_child().name == "r"
+
+    def test_prune_by_tag(self):
+        doc = pygixml.parse_string("<r><debug/><a><debug/></a></r>")
+        assert doc.prune(tag="debug") == 2
+        assert _xml(doc.root) == "<r><a/></r>"
+
+    def test_prune_root(self):
+        doc = pygixml.parse_string("<r/>")
+        assert doc.prune(tag="r") == 1
+        assert doc.first_child().type == "null"
+
+
+class TestRemoveAllErrors:
+    """Invalid criteria are rejected"""
+
+    def test_no_criteria(self):
+        doc = pygixml.parse_string("<r/>")
+        with pytest.raises(ValueError):
+            doc.root.remove_all()
+        with pytest.raises(ValueError):
+            doc.prune()
+
+    def test_value_without_attr(self):
+        doc = pygixml.parse_string("<r/>")
+        with pytest.raises(ValueError):
+            doc.root.remove_all(tag="a", value="x")
+
+    def test_unknown_node_type(self):
+        doc = pygixml.parse_string("<r/>")
+        with pytest.raises(ValueError):
+            doc.root.remove_all(node_type="banana")
+
+    def test_null_node(self):
+        doc = pygixml.parse_string("<r/>")
+        with pytest.raises(pygixml.PygiXMLNullNodeError):
+            doc.root.child("missing").remove_all(tag="x")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for direct serialization: to_bytes(), write(fileobj) and
+iter_serialize(chunk_size)
+"""
+
+import io
+
+import pytest
+import pygixml
+
+
+XML = '<root a="x&quot;y"><item id="1">v &lt; w</item><b><c/></b>متن</root>'
+
+
+@pytest.fixture
+def doc():
+    return pygixml.parse_string(XML)
+
+
+class TestToBytes:
+    """to_bytes() matches to_string().encode()"""
+
+    @pytest.mark.parametrize("indent", ["  ", "\t", "", 4, 0])
+    def test_document_matches_to_string(self, doc, indent):
+        assert doc.to_bytes(indent) == doc.to_string(indent).encode("utf-8")
+
+    def test_node_matches_to_string(self, doc):
+        item = doc.root.child("item")
+        assert item.to_bytes() == b'<item id="1">v &lt; w</item>'
+
+    def test_returns_bytes(self, doc):
+        assert type(doc.root.to_bytes()) is bytes
+
+    def test_null_node(self, doc):
+        assert doc.root.child("missing").to_bytes() == b""
+
+    def test_large_document(self):
+        doc = pygixml.XMLDocument()
+        doc.build(("root", [("item", {"id": str(i)}, "x" * 20) for i in range(5000)]))
+        assert doc.to_bytes() == doc.to_string().encode("utf-8")
+
+
+class TestWrite:
+    """write(fileobj) flushes chunks to .write()"""
+
+    def test_binary_stream(self, doc):
+        out = io.BytesIO()
+        doc.write(out)
+        assert out.getvalue() == doc.to_bytes()
+
+    def test_text_stream(self, doc):
+        out = io.StringIO()
+        doc.write(out, chunk_size=3)
+        assert out.getvalue() == doc.to_string()
+
+    def test_fixed_size_chunks(self, doc):
+        sizes = []
+
+        class Recorder:
+            def write(self, data):
+                sizes.append(len(data))
+
+        doc.write(Recorder(), chunk_size=16)
+        assert sum(sizes) == len(doc.to_bytes())
+        assert all(n == 16 for n in sizes[:-1])
+
+    def test_node_write(self, doc):
+        out = io.BytesIO()
+        doc.root.child("b").write(out, indent="")
+        assert out.getvalue() == doc.root.child("b").to_bytes("")
+
+    def test_not_a_file(self, doc):
+        with pytest.raises(TypeError):
+            doc.write("out.xml")
+
+    def test_write_error_propagates(self, doc):
+        class Broken:
+            def write(self, data):
+                raise OSError("disk full")
+
+        with pytest.raises(OSError, match="disk full"):
+            doc.write(Broken(), chunk_size=8)
+
+
+class TestIterSerialize:
+    """iter_serialize(chunk_size) yields bytes chunks lazily"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+    def test_join_equals_to_bytes(self, doc, chunk_size):
+        chunks = list(doc.iter_serialize(chunk_size))
+        assert b"".join(chunks) == doc.to_bytes()
+        assert all(len(c) == chunk_size for c in chunks[:-1])
+
+    def test_node_and_indent(self, doc):
+        chunks = doc.root.child("b").iter_serialize(4, indent=0)
+        assert b"".join(chunks) == doc.root.child("b").to_bytes(0)
+
+    def test_null_node_yields_nothing(self, doc):
+        assert list(doc.root.child("missing").iter_serialize()) == []
+
+    @pytest.mark.parametrize("chunk_size", [3, 1000, 65537])
+    def test_chunks_across_batches(self, chunk_size):
+        big = pygixml.parse_string(
+            "<r>" + "".join(f"<i n='{i}'>{i}</i>" for i in range(20000)) + "</r>")
+        chunks = list(big.iter_serialize(chunk_size, indent=0))
+        assert b"".join(chunks) == big.to_bytes(0)
+        assert all(len(c) == chunk_size for c in chunks[:-1])
+        assert 0 < len(chunks[-1]) <= chunk_size
+
+    @pytest.mark.parametrize("flags", [
+        pygixml.FormatFlags.DEFAULT,
+        pygixml.FormatFlags.RAW,
+        pygixml.FormatFlags.INDENT | pygixml.FormatFlags.INDENT_ATTRIBUTES,
+        pygixml.FormatFlags.INDENT | pygixml.FormatFlags.NO_EMPTY_ELEMENT_TAGS,
+    ])
+    def test_mixed_content_matches_to_bytes(self, flags):
+        doc = pygixml.parse_string(
+            "<?xml version='1.0'?><r a='1' b='2'><!--c--><?pi v?>"
+            "<x>t<y k='&quot;'/>u</x><z><![CDATA[a<b]]><w/></z><e></e></r>",
+            pygixml.ParseFlags.DEFAULT | pygixml.ParseFlags.COMMENTS
+            | pygixml.ParseFlags.PI | pygixml.ParseFlags.DECLARATION)
+        for node in (doc.root.parent, doc.root, doc.root.child("x")):
+            for indent in ("  ", "\t", ""):
+                assert b"".join(node.iter_serialize(3, indent, flags)) == \
+                    node.to_bytes(indent, flags)
+
+    def test_modified_tree_raises(self):
+        big = pygixml.parse_string("<r>" + "<i>x</i>" * 50000 + "</r>")
+        it = big.iter_serialize(65536)
+        next(it)
+        big.root.remove_child(big.root.first_child())
+        with pytest.raises(RuntimeError):
+            next(it)
+        assert list(it) == []
+        assert b"".join(big.iter_serialize()) == big.to_bytes()
+
+    def test_abandoned_large_iterator(self):
+        big = pygixml.parse_string("<r>" + "<i/>" * 200000 + "</r>")
+        for size in (1, 4096):
+            it = big.iter_serialize(size)
+            assert next(it).startswith(b"<")
+            del it
+        assert big.to_bytes().startswith(b"<r>")
+
+    def test_abandoned_iterator(self, doc):
+        it = doc.iter_serialize(2)
+        assert next(it)
+        del it
+        # The document is still usable afterwards
+        assert doc.to_bytes() == doc.to_string().encode("utf-8")
+
+    def test_exhausted_iterator_stays_exhausted(self, doc):
+        it = doc.iter_serialize()
+        list(it)
+        assert list(it) == []
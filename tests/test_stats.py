@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Tests for pygixml.enable_stats / stats / reset_stats / set_stats_hook
+"""
+
+import math
+
+import pytest
+import pygixml
+from pygixml import dictify, jsonify, objectify
+
+
+XML = "<root><item id='1'>a</item><item id='2'>b</item><other/></root>"
+
+
+@pytest.fixture
+def collecting():
+    pygixml.reset_stats()
+    previous = pygixml.enable_stats()
+    yield
+    pygixml.enable_stats(previous)
+    pygixml.set_stats_hook(None)
+    pygixml.reset_stats()
+
+
+@pytest.fixture
+def doc():
+    return pygixml.parse_string(XML)
+
+
+class TestSwitch:
+    def test_disabled_by_default_records_nothing(self, doc):
+        pygixml.reset_stats()
+        assert pygixml.enable_stats(False) is False
+        doc.root.select_nodes("item")
+        pygixml.parse_string(XML)
+        snapshot = pygixml.stats()
+        assert snapshot == {"enabled": False, "xpath": {}, "parse": {}}
+
+    def test_enable_returns_previous(self, collecting):
+        assert pygixml.enable_stats(True) is True
+        assert pygixml.stats()["enabled"] is True
+
+    def test_reset_keeps_switch(self, collecting, doc):
+        pygixml.XPathQuery("item").evaluate_node_set(doc.root)
+        pygixml.reset_stats()
+        snapshot = pygixml.stats()
+        assert snapshot["enabled"] is True
+        assert snapshot["xpath"] == {} and snapshot["parse"] == {}
+
+
+class TestXPathStats:
+    def test_compile_and_evaluate(self, collecting, doc):
+        query = pygixml.XPathQuery("item")
+        query.evaluate_node_set(doc.root)
+        query.evaluate_strings(doc.root)
+        entry = pygixml.stats()["xpath"]["item"]
+        assert entry["compiles"] == 1
+        assert entry["evaluations"] == 2
+        assert entry["results"] == 4
+        assert entry["max_results"] == 2
+        assert 0 <= entry["max_time"] <= entry["total_time"]
+        assert entry["compile_time"] >= 0
+
+    def test_select_nodes_counts_cache_misses_only(self, collecting, doc):
+        pygixml.xpath_cache_clear()
+        for _ in range(3):
+            doc.root.select_nodes("item[@id]")
+        entry = pygixml.stats()["xpath"]["item[@id]"]
+        assert entry["compiles"] == 1
+        assert entry["evaluations"] == 3
+
+    def test_scalar_and_single_results(self, collecting, doc):
+        pygixml.XPathQuery("count(item)").evaluate_number(doc.root)
+        doc.root.select_node("missing")
+        xpath = pygixml.stats()["xpath"]
+        assert xpath["count(item)"]["results"] == 1
+        assert xpath["missing"]["results"] == 0
+
+    def test_bulk_and_many(self, collecting, doc):
+        query = pygixml.XPathQuery("item")
+        query.evaluate_many([doc.root, doc.root], kind="count", workers=1)
+        query.evaluate_attrs(doc.root)
+        entry = pygixml.stats()["xpath"]["item"]
+        assert entry["evaluations"] == 2
+        assert entry["results"] == 4
+
+    def test_indexed_select(self, collecting, doc):
+        doc.build_index()
+        doc.root.select_nodes("//item")
+        assert pygixml.stats()["xpath"]["//item"]["results"] == 2
+
+    def test_failed_compile_not_recorded(self, collecting):
+        with pytest.raises(Exception):
+            pygixml.XPathQuery("item[")
+        assert "item[" not in pygixml.stats()["xpath"]
+
+
+class TestParseStats:
+    def test_entry_points(self, collecting, tmp_path):
+        path = tmp_path / "doc.xml"
+        path.write_text(XML)
+        pygixml.parse_string(XML)
+        pygixml.parse_file(str(path))
+        pygixml.XMLDocument().load_string(XML)
+        pygixml.XMLDocument().load_file(str(path))
+        objectify.from_string(XML)
+        objectify.from_file(str(path))
+        dictify.parse(XML)
+        jsonify.dumps_file(str(path))
+        parse = pygixml.stats()["parse"]
+        assert set(parse) == {
+            "parse_string", "parse_file", "XMLDocument.load_string",
+            "XMLDocument.load_file", "objectify.from_string",
+            "objectify.from_file", "dictify.parse", "jsonify.dumps_file",
+        }
+        for entry in parse.values():
+            assert entry["calls"] == 1
+            assert entry["failures"] == 0
+            assert entry["bytes"] == len(XML)
+
+    def test_failure_counted(self, collecting):
+        with pytest.raises(pygixml.PygiXMLError):
+            pygixml.parse_string("<a>")
+        entry = pygixml.stats()["parse"]["parse_string"]
+        assert entry["calls"] == 1 and entry["failures"] == 1
+
+    def test_missing_file(self, collecting, tmp_path):
+        assert not pygixml.XMLDocument().load_file(str(tmp_path / "nope.xml"))
+        entry = pygixml.stats()["parse"]["XMLDocument.load_file"]
+        assert entry["failures"] == 1 and entry["bytes"] == 0
+
+
+class TestHook:
+    def test_events(self, collecting, doc):
+        events = []
+        assert pygixml.set_stats_hook(
+            lambda *event: events.append(event)) is None
+        pygixml.parse_string(XML)
+        pygixml.XPathQuery("other").evaluate_node_set(doc.root)
+        kinds = [(kind, key, size) for kind, key, _, size in events]
+        assert kinds == [("parse", "parse_string", len(XML)),
+                         ("xpath_compile", "other", 0),
+                         ("xpath_evaluate", "other", 1)]
+        assert all(secs >= 0 and not math.isnan(secs)
+                   for _, _, secs, _ in events)
+
+    def test_not_called_when_disabled(self, collecting, doc):
+        events = []
+        pygixml.set_stats_hook(lambda *event: events.append(event))
+        pygixml.enable_stats(False)
+        pygixml.parse_string(XML)
+        assert events == []
+
+    def test_replace_and_remove(self, collecting):
+        def first(*a):
+            pass
+        pygixml.set_stats_hook(first)
+        assert pygixml.set_stats_hook(None) is first
+
+    def test_rejects_non_callable(self, collecting):
+        with pytest.raises(TypeError):
+            pygixml.set_stats_hook(42)
+
+    def test_hook_errors_propagate(self, collecting):
+        def boom(*a):
+            raise RuntimeError("exporter down")
+        pygixml.set_stats_hook(boom)
+        with pytest.raises(RuntimeError):
+            pygixml.parse_string(XML)
@@ -7,7 +7,9 @@ Run with:
     pytest tests/test_stream.py -v
 """
 
+import asyncio
 import io
+import json
 import os
 import tempfile
 
@@ -133,6 +135,62 @@ class TestClear:
             assert len(rec) == 0  # children dropped by clear()
 
 
+    def test_release_detaches_emitted_elements(self):
+        records_holder = []
+        seen = []
+        for ev, el in pygixml.iterparse(SAMPLE, events=("start", "end"),
+                                        release=True):
+            if ev == "start" and el.tag == "records":
+                records_holder.append(el)
+            if ev == "end" and el.tag == "record":
+                seen.append(len(records_holder[0]))
+
+        # still attached while being handled, gone afterwards
+        assert seen == [3, 2, 1]
+        assert len(records_holder[0]) == 0
+
+    def test_release_with_tag_filter(self):
+        holder = []
+        for ev, el in pygixml.iterparse(SAMPLE, events=("start", "end"),
+                                        tag="record", release=True):
+            holder.append(el)
+        # children of a released record are not emitted, so they stay
+        assert [c.tag for c in holder[-1]] == ["name", "city"]
+
+    def test_release_keeps_text_and_tail(self):
+        data = b"<r>a<x>1</x>b<x>2</x>c</r>"
+        elems = []
+        for _, el in pygixml.iterparse(data, release=True):
+            elems.append(el)
+        assert [(e.tag, e.text, e.tail) for e in elems] == \
+            [("x", "1", "b"), ("x", "2", "c"), ("r", "a", None)]
+        assert len(elems[-1]) == 0
+
+    def test_release_chunked(self):
+        p = pygixml.PullParser(release=True)
+        data = b"<r><x>1</x>t<y/></r>"
+        elems = []
+        for i in range(len(data)):
+            p.feed(data[i:i + 1])
+            elems.extend(el for _, el in p.read_events())
+        p.close()
+        elems.extend(el for _, el in p.read_events())
+        # the tail arrives after <x> was detached and still lands on it
+        assert [(e.tag, e.text, e.tail) for e in elems] == \
+            [("x", "1", "t"), ("y", None, None), ("r", None, None)]
+        assert len(elems[-1]) == 0
+
+    def test_release_after_breaking_out(self):
+        p = pygixml.PullParser(release=True)
+        p.feed(b"<r><h><b/><b/></h><h><b/><b/><b/></h>")
+        for ev, el in p.read_events():
+            break                       # the first <b>, left mid-generator
+        p.feed(b"</r>")
+        p.close()
+        heads = [el for _, el in p.read_events() if el.tag == "h"]
+        assert [len(h) for h in heads] == [0, 0]
+
+
 # ---------------------------------------------------------------------------
 # StreamElement API (find/findall/findtext/iter/get/items/keys/len/bool)
 # ---------------------------------------------------------------------------
@@ -315,6 +373,60 @@ class TestSourceTypes:
         # force many feed() calls / chunk boundaries
         assert sum(1 for _ in pygixml.iterfind(SAMPLE, "record", chunk_size=3)) == 3
 
+    def test_bom_is_stripped_from_file(self, tmp_path):
+        p = tmp_path / "bom.xml"
+        p.write_bytes(b"\xef\xbb\xbf<root>ok</root>")
+        assert [el.text for el in pygixml.iterfind(str(p), "root")] == ["ok"]
+
+    def test_mapped_file_small_chunks(self, tmp_path):
+        p = tmp_path / "data.xml"
+        p.write_bytes(SAMPLE)
+        ids = [el.get("id") for el in pygixml.iterfind(p, "record", chunk_size=5)]
+        assert ids == ["1", "2", "3"]
+
+    def test_mapped_file_error_position(self, tmp_path):
+        p = tmp_path / "bad.xml"
+        p.write_bytes(b"<root>\n<a>\n</b></root>")
+        with pytest.raises(pygixml.PygiXMLError, match="line 3"):
+            list(pygixml.iterparse(p))
+
+    def test_empty_file(self, tmp_path):
+        p = tmp_path / "empty.xml"
+        p.write_bytes(b"")
+        with pytest.raises(pygixml.PygiXMLError):
+            list(pygixml.iterparse(p))
+
+    def test_read_only_file_object(self):
+        class Reader:
+            def __init__(self, data):
+                self._f = io.BytesIO(data)
+
+            def read(self, n):
+                return self._f.read(n)
+
+        assert sum(1 for _ in pygixml.iterfind(Reader(SAMPLE), "record",
+                                               chunk_size=7)) == 3
+
+    def test_readinto_short_reads(self):
+        class Trickle(io.RawIOBase):
+            def __init__(self, data):
+                self._f = io.BytesIO(data)
+
+            def readable(self):
+                return True
+
+            def readinto(self, b):
+                chunk = self._f.read(min(len(b), 5))
+                b[:len(chunk)] = chunk
+                return len(chunk)
+
+        ids = [el.get("id") for el in pygixml.iterfind(Trickle(SAMPLE), "record")]
+        assert ids == ["1", "2", "3"]
+
+    def test_text_stream_source(self):
+        text = SAMPLE.decode("utf-8").split("?>", 1)[1]
+        assert sum(1 for _ in pygixml.iterfind(io.StringIO(text), "record")) == 3
+
 
 # ---------------------------------------------------------------------------
 # PullParser (low-level incremental API)
@@ -350,6 +462,36 @@ class TestPullParser:
         tags = [el.tag for _, el in events]
         assert tags == ["a", "b", "root"]
 
+    def test_feed_buffer_objects(self):
+        import mmap
+        data = b"<root><a x='1'>t</a></root>"
+        with mmap.mmap(-1, len(data)) as mm:
+            mm.write(data)
+            sources = [bytearray(data[:9]), memoryview(data)[9:20], mm[20:]]
+            p = pygixml.PullParser(events=("end",))
+            for chunk in sources:
+                p.feed(chunk)
+            p.close()
+        assert [(el.tag, el.text) for _, el in p.read_events()] == \
+            [("a", "t"), ("root", None)]
+
+    def test_feed_reused_buffer(self):
+        data = b"<root><a>first</a><a>second</a></root>"
+        buf = bytearray(8)
+        src = io.BytesIO(data)
+        p = pygixml.PullParser(events=("end",))
+        while True:
+            n = src.readinto(buf)
+            if not n:
+                break
+            p.feed(memoryview(buf)[:n])
+        p.close()
+        assert [el.text for _, el in p.read_events()][:2] == ["first", "second"]
+
+    def test_feed_rejects_str(self):
+        with pytest.raises(TypeError):
+            pygixml.PullParser().feed("<root/>")
+
     def test_close_is_idempotent(self):
         p = pygixml.PullParser()
         p.feed(b"<root/>")
@@ -371,6 +513,425 @@ class TestPullParser:
         assert p.position == len(b"<root>\nhello\n</root>")
 
 
+class TestRetainMatched:
+    DOC = (b"<feed v='1'>intro<meta><rec id='x'/></meta>"
+           b"<rec id='1'>a<sub k='v'>b</sub>c</rec>between"
+           b"<group><rec id='2'><rec id='3'/></rec></group>tail</feed>")
+
+    def test_same_matches_as_retain_all(self):
+        def snap(retain):
+            return [(e.tag, e.attrib, e.text, [c.tag for c in e])
+                    for e in pygixml.iterfind(self.DOC, "rec", retain=retain)]
+        assert snap("matched") == snap("all")
+
+    def test_subtree_is_complete(self):
+        rec = [e for e in pygixml.iterfind(self.DOC, "rec")][1]
+        assert rec.get("id") == "1"
+        assert rec.text == "a"
+        assert rec[0].attrib == {"k": "v"}
+        assert (rec[0].text, rec[0].tail) == ("b", "c")
+
+    def test_matched_tail_not_recorded(self):
+        recs = list(pygixml.iterfind(self.DOC, "rec"))
+        assert recs[1].tail is None
+        assert [e.tail for e in pygixml.iterfind(self.DOC, "rec", retain="all")][1] \
+            == "between"
+
+    def test_nested_matches(self):
+        events = list(pygixml.iterparse(self.DOC, events=("start", "end"),
+                                        tag="rec", retain="matched"))
+        ids = [(ev, e.get("id")) for ev, e in events]
+        assert ids == [("start", "x"), ("end", "x"), ("start", "1"),
+                       ("end", "1"), ("start", "2"), ("start", "3"),
+                       ("end", "3"), ("end", "2")]
+        assert [c.get("id") for c in events[-1][1]] == ["3"]
+
+    def test_chunked_feed(self):
+        p = pygixml.PullParser(tag="rec", retain="matched")
+        for i in range(len(self.DOC)):
+            p.feed(self.DOC[i:i + 1])
+        p.close()
+        assert [e.get("id") for _, e in p.read_events()] == ["x", "1", "3", "2"]
+
+    def test_memory_bounded_without_clear(self):
+        import tracemalloc
+        data = b"<root>" + b"".join(
+            b"<rec id='%d'><name>item %d</name></rec>" % (i, i)
+            for i in range(20000)) + b"</root>"
+
+        def peak(retain):
+            kept = []
+            tracemalloc.start()
+            for e in pygixml.iterfind(data, "rec", retain=retain):
+                kept.append(e.get("id"))    # the element itself is dropped
+            result = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert len(kept) == 20000
+            return result
+
+        assert peak("matched") * 4 < peak("all")
+
+    def test_unclosed_input(self):
+        p = pygixml.PullParser(tag="rec", retain="matched")
+        p.feed(b"<root><other>")
+        with pytest.raises(pygixml.PygiXMLError):
+            p.close()
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            pygixml.PullParser(retain="matched")
+        with pytest.raises(ValueError):
+            pygixml.PullParser(tag="rec", retain="some")
+
+
+class TestChunkBoundaries:
+    """The bulk content/attribute scan must not depend on chunk layout."""
+
+    DOC = (
+        "<?xml version='1.0'?>\r\n<root a=\"x\ty\r\nz\" b='&lt;&#x263A;'>\r\n"
+        "  plain run of text \u00e9\u4e2d &amp; more<![CDATA[<raw>]]>tail\r\n"
+        "  <?proc some data?><!-- skipped --><e/>after\n"
+        "</root>"
+    ).encode("utf-8")
+
+    @staticmethod
+    def _run(chunks):
+        p = pygixml.PullParser(events=("start", "end", "pi"))
+        out = []
+        for chunk in chunks:
+            p.feed(chunk)
+            for ev, obj in p.read_events():
+                if ev == "pi":
+                    out.append((ev, obj))
+                else:
+                    out.append((ev, obj.tag, dict(obj.attrib)))
+        p.close()
+        return out, p.line, p.position
+
+    def _snapshot(self, chunks):
+        p = pygixml.PullParser(events=("end",))
+        ends = []
+        for chunk in chunks:
+            p.feed(chunk)
+            ends.extend(el for _, el in p.read_events())
+        p.close()
+        return ([(el.tag, el.text, el.tail) for el in ends],
+                self._run(chunks))
+
+    def test_every_split_point(self):
+        expected = self._snapshot([self.DOC])
+        for i in range(1, len(self.DOC)):
+            assert self._snapshot([self.DOC[:i], self.DOC[i:]]) == expected, i
+
+    def test_byte_by_byte(self):
+        chunks = [self.DOC[i:i + 1] for i in range(len(self.DOC))]
+        assert self._snapshot(chunks) == self._snapshot([self.DOC])
+
+    def test_normalization(self):
+        root = pygixml.PullParser(events=("end",))
+        root.feed(self.DOC)
+        root.close()
+        elem = [el for _, el in root.read_events()][-1]
+        assert elem.attrib == {"a": "x y z", "b": "<\u263a"}
+        assert elem.text == "\n  plain run of text \u00e9\u4e2d & more<raw>tail\n  "
+        assert elem[0].tail == "after\n"
+
+    def test_error_line_after_bulk_text(self):
+        p = pygixml.PullParser()
+        with pytest.raises(pygixml.PygiXMLError) as exc:
+            p.feed(b"<root>\n" + b"text\n" * 10 + b"</wrong>")
+        assert "line 12" in str(exc.value)
+
+
+# ---------------------------------------------------------------------------
+# aiterparse
+# ---------------------------------------------------------------------------
+
+class TestAiterparse:
+    @staticmethod
+    def _collect(reader, **kw):
+        async def run():
+            return [(ev, el.tag) async for ev, el in pygixml.aiterparse(reader, **kw)]
+        return asyncio.run(run())
+
+    def test_stream_reader(self):
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(SAMPLE[:50])
+            reader.feed_data(SAMPLE[50:])
+            reader.feed_eof()
+            return [el.get("id") async for _, el in
+                    pygixml.aiterparse(reader, tag="record", chunk_size=16)]
+        assert asyncio.run(run()) == ["1", "2", "3"]
+
+    def test_custom_async_reader(self):
+        class Reader:
+            def __init__(self, data):
+                self._f = io.BytesIO(data)
+
+            async def read(self, n):
+                await asyncio.sleep(0)
+                return self._f.read(n)
+
+        events = self._collect(Reader(b"\xef\xbb\xbf<r><a/></r>"),
+                               events=("start", "end"), chunk_size=3)
+        assert events == [("start", "r"), ("start", "a"), ("end", "a"), ("end", "r")]
+
+    def test_backpressure(self):
+        class Reader:
+            reads = 0
+
+            def __init__(self):
+                self._f = io.BytesIO(b"<r>" + b"<a/>" * 100 + b"</r>")
+
+            async def read(self, n):
+                Reader.reads += 1
+                return self._f.read(n)
+
+        async def run():
+            agen = pygixml.aiterparse(Reader(), tag="a", chunk_size=8)
+            await agen.__anext__()
+            await agen.aclose()
+
+        asyncio.run(run())
+        assert Reader.reads <= 2
+
+    def test_concurrent_feeds(self):
+        async def one(i):
+            reader = asyncio.StreamReader()
+
+            async def produce():
+                for j in range(5):
+                    reader.feed_data(b"<r>" if j == 0 else b"")
+                    reader.feed_data(b"<x n='%d'/>" % (i * 10 + j))
+                    await asyncio.sleep(0)
+                reader.feed_data(b"</r>")
+                reader.feed_eof()
+
+            task = asyncio.ensure_future(produce())
+            out = [el.get("n") async for _, el in pygixml.aiterparse(reader, tag="x")]
+            await task
+            return out
+
+        async def run():
+            return await asyncio.gather(*(one(i) for i in range(20)))
+
+        results = asyncio.run(run())
+        assert results[3] == ["30", "31", "32", "33", "34"]
+        assert len(results) == 20
+
+    def test_malformed(self):
+        class Reader:
+            async def read(self, n, _data=[b"<a></b>"]):
+                return _data.pop() if _data else b""
+
+        with pytest.raises(pygixml.PygiXMLError):
+            self._collect(Reader())
+
+
+# ---------------------------------------------------------------------------
+# PullParser.checkpoint / resume_from
+# ---------------------------------------------------------------------------
+
+class TestCheckpoint:
+    DOC = (b"\xef\xbb\xbf<db v='1'>\n<g k='a&quot;b\tc'>"
+           + b"".join(b"<rec id='%d'><v>%d</v></rec>\n" % (i, i) for i in range(10))
+           + b"</g><rec id='last'/></db>")
+
+    def _stop_after(self, source, rec_id, **kw):
+        parser = pygixml.PullParser(tag="rec", checkpoints=True, **kw)
+        for _, elem in parser.iterparse(source, chunk_size=7):
+            if elem.get("id") == rec_id:
+                return parser.checkpoint()
+
+    def test_state(self):
+        state = self._stop_after(self.DOC, "4", retain="matched")
+        assert self.DOC[3:3 + state["offset"]].endswith(b"<rec id='4'><v>4</v></rec>")
+        assert state["line"] == 6
+        assert state["stack"] == [["db", {}], ["g", {}]]
+        assert json.loads(json.dumps(state)) == state
+
+    def test_resume(self):
+        state = json.loads(json.dumps(self._stop_after(self.DOC, "4")))
+        assert state["stack"] == [["db", {"v": "1"}], ["g", {"k": 'a"b c'}]]
+        ids = [e.get("id") for e in pygixml.iterfind(self.DOC, "rec", resume_from=state)]
+        assert ids == ["5", "6", "7", "8", "9", "last"]
+
+    def test_resumed_ancestors_and_events(self):
+        state = self._stop_after(self.DOC, "8")
+        events = [(ev, el.tag, dict(el.attrib)) for ev, el in
+                  pygixml.iterparse(self.DOC, events=("start", "end"), resume_from=state)]
+        assert events[:2] == [("start", "rec", {"id": "9"}), ("start", "v", {})]
+        assert events[-4:] == [("end", "g", {"k": 'a"b c'}),
+                               ("start", "rec", {"id": "last"}),
+                               ("end", "rec", {"id": "last"}),
+                               ("end", "db", {"v": "1"})]
+
+    def test_never_inside_a_match(self):
+        parser = pygixml.PullParser(tag="rec", checkpoints=True)
+        parser.feed(self.DOC[3:])
+        events = parser.read_events()
+        next(events)
+        # the whole document is queued: the mark after rec 0 is the latest
+        # one whose events are out, and it sits outside any <rec>
+        assert parser.checkpoint()["stack"] == [["db", {"v": "1"}], ["g", {"k": 'a"b c'}]]
+        assert self.DOC[3:3 + parser.checkpoint()["offset"]].endswith(b"</rec>")
+
+    def test_consumed_start_is_not_produced_again(self):
+        parser = pygixml.PullParser(tag="rec", events=("start", "end"), checkpoints=True)
+        it = parser.iterparse(self.DOC)
+        next(it), next(it), next(it)        # start 0, end 0, start 1
+        state = parser.checkpoint()
+        assert state["skip"] == 1
+        rest = [(ev, el.get("id")) for ev, el in
+                pygixml.iterparse(self.DOC, events=("start", "end"), tag="rec",
+                                  resume_from=state)]
+        assert rest[:2] == [("end", "1"), ("start", "2")]
+
+    @pytest.mark.parametrize("release", [False, True])
+    def test_nested_matches(self, release):
+        doc = (b"<db><rec id='1'><rec id='n1'/><rec id='n2'><rec id='n3'/></rec></rec>"
+               b"<rec id='2'/><rec id='3'><rec id='n4'/></rec></db>")
+        full = [e.get("id") for e in pygixml.iterfind(doc, "rec", retain="all")]
+        for stop in range(len(full)):
+            parser = pygixml.PullParser(tag="rec", checkpoints=True, release=release)
+            for i, (_, elem) in enumerate(parser.iterparse(doc, chunk_size=3)):
+                if i == stop:
+                    break
+            state = json.loads(json.dumps(parser.checkpoint()))
+            rest = [e.get("id") for e in pygixml.iterfind(doc, "rec", retain="all",
+                                                           release=release,
+                                                           resume_from=state)]
+            assert rest == full[stop + 1:]
+
+    @pytest.mark.parametrize("kind", ["path", "gzip", "file"])
+    def test_sources(self, tmp_path, kind):
+        import gzip
+        state = self._stop_after(self.DOC, "6")
+        path = tmp_path / "doc.xml"
+        data = gzip.compress(self.DOC) if kind == "gzip" else self.DOC
+        path.write_bytes(data)
+        if kind == "file":
+            with open(path, "rb") as f:
+                ids = [e.get("id") for e in pygixml.iterfind(f, "rec", chunk_size=5,
+                                                               resume_from=state)]
+        else:
+            ids = [e.get("id") for e in pygixml.iterfind(path, "rec", chunk_size=5,
+                                                           resume_from=state)]
+        assert ids == ["7", "8", "9", "last"]
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 7])
+    def test_short_reads_past_bom(self, chunk_size):
+        class Trickle(io.BytesIO):
+            # a pipe-like source: never more than one byte per read
+            def read(self, n=-1):
+                return super().read(1)
+
+            def readinto(self, b):
+                return super().readinto(memoryview(b)[:1])
+
+        parser = pygixml.PullParser(tag="rec", checkpoints=True)
+        for _, elem in parser.iterparse(Trickle(self.DOC), chunk_size=chunk_size):
+            if elem.get("id") == "1":
+                break
+        state = parser.checkpoint()
+        assert state == self._stop_after(self.DOC, "1")
+        ids = [e.get("id") for e in pygixml.iterfind(Trickle(self.DOC), "rec",
+                                                       chunk_size=chunk_size,
+                                                       resume_from=state)]
+        assert ids == ["2", "3", "4", "5", "6", "7", "8", "9", "last"]
+
+    def test_after_root_closed(self):
+        parser = pygixml.PullParser(tag="db", checkpoints=True)
+        assert [el.tag for _, el in parser.iterparse(b"<db/>\n")] == ["db"]
+        state = parser.checkpoint()
+        assert state["offset"] == 5 and state["stack"] == []
+        assert list(pygixml.iterparse(b"<db/>\n", resume_from=state)) == []
+
+    def test_error_position_after_resume(self):
+        state = self._stop_after(self.DOC, "2")
+        bad = self.DOC.replace(b"<v>5</v>", b"<v>5</w>")
+        with pytest.raises(pygixml.PygiXMLError) as exc:
+            list(pygixml.iterfind(bad, "rec", resume_from=state))
+        assert "line 7" in str(exc.value)
+
+    def test_fresh_state_and_errors(self):
+        parser = pygixml.PullParser(checkpoints=True)
+        assert parser.checkpoint() == {"version": 1, "offset": 0, "line": 1,
+                                       "column": 0, "stack": [], "skip": 0}
+        with pytest.raises(pygixml.PygiXMLError):
+            pygixml.PullParser().checkpoint()
+        with pytest.raises(ValueError):
+            pygixml.PullParser(resume_from={"offset": 3})
+        with pytest.raises(ValueError):
+            list(pygixml.iterparse(io.StringIO("<a/>"),
+                                   resume_from=self._stop_after(self.DOC, "1")))
+
+
+# ---------------------------------------------------------------------------
+# PullParser(mode="raw")
+# ---------------------------------------------------------------------------
+
+class TestRawMode:
+    DOC = (b"<?xml version='1.0'?>\n<r a='1' b='&lt;'>hi <x/>t&amp;ail"
+           b"<?pi body?><y k='v'>z</y>\n</r>")
+
+    def test_events(self):
+        assert list(pygixml.iterparse(self.DOC, mode="raw")) == [
+            ("start", "r", ("a", "1", "b", "<")),
+            ("text", "hi "),
+            ("start", "x", ()),
+            ("end", "x"),
+            ("text", "t&ail"),
+            ("start", "y", ("k", "v")),
+            ("text", "z"),
+            ("end", "y"),
+            ("text", "\n"),
+            ("end", "r"),
+        ]
+
+    def test_event_selection(self):
+        events = list(pygixml.iterparse(self.DOC, mode="raw", events=("end", "pi")))
+        assert events == [("end", "x"), ("pi", "pi", "body"), ("end", "y"), ("end", "r")]
+
+    def test_chunking_does_not_split_text(self):
+        expected = list(pygixml.iterparse(self.DOC, mode="raw"))
+        for size in (1, 2, 5):
+            assert list(pygixml.iterparse(self.DOC, mode="raw", chunk_size=size)) == expected
+
+    def test_matches_tree_mode(self):
+        raw = [(ev, tag) for ev, tag, *_ in
+               pygixml.iterparse(SAMPLE, events=("start", "end"), mode="raw")]
+        tree = [(ev, el.tag) for ev, el in
+                pygixml.iterparse(SAMPLE, events=("start", "end"))]
+        assert raw == tree
+
+    def test_feed_and_close(self):
+        parser = pygixml.PullParser(mode="raw")
+        parser.feed(b"<a>te")
+        assert list(parser.read_events()) == [("start", "a", ())]
+        parser.feed(b"xt</a>")
+        parser.close()
+        assert list(parser.read_events()) == [("text", "text"), ("end", "a")]
+
+    def test_unclosed(self):
+        parser = pygixml.PullParser(mode="raw")
+        parser.feed(b"<a><b>")
+        with pytest.raises(pygixml.PygiXMLError):
+            parser.close()
+
+    @pytest.mark.parametrize("kwargs", [
+        {"mode": "sax"},
+        {"mode": "raw", "tag": "a"},
+        {"mode": "raw", "release": True},
+        {"mode": "raw", "checkpoints": True},
+        {"events": ("text",)},
+    ])
+    def test_bad_arguments(self, kwargs):
+        with pytest.raises(ValueError):
+            pygixml.PullParser(**kwargs)
+
+
 # ---------------------------------------------------------------------------
 # Error handling
 # ---------------------------------------------------------------------------
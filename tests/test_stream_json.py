@@ -323,6 +323,76 @@ class TestStreamToJsonl:
         assert total == sum(range(n))
 
 
+    def test_checkpoint_and_resume(self, tmp_path):
+        xml_p = tmp_path / "data.xml"
+        out_p = tmp_path / "out.jsonl"
+        xml_p.write_bytes(b"<root><g>" + b"".join(
+            b"<item id='%d'><v>%d</v></item>" % (i, i) for i in range(10)) + b"</g></root>")
+        states = []
+        assert jsonify.stream_jsonl(str(xml_p), str(out_p), "item",
+                                    checkpoint=states.append, checkpoint_every=4) == 10
+        full = out_p.read_bytes()
+        assert [s["records"] for s in states] == [4, 8]
+        assert states[0]["stack"] == [["root", {}], ["g", {}]]
+
+        state = json.loads(json.dumps(states[0]))
+        with open(out_p, "ab") as f:        # a record cut short by a crash
+            f.write(b'{"@id":"9",')
+        more = []
+        n = jsonify.stream_jsonl(str(xml_p), str(out_p), "item", resume_from=state,
+                                 checkpoint=more.append, checkpoint_every=4)
+        assert n == 6
+        assert out_p.read_bytes() == full
+        assert [s["records"] for s in more] == [8]
+        assert more[0]["output_size"] == states[1]["output_size"]
+        ids = [e.get("id") for e in pygixml.iterfind(str(xml_p), "item", resume_from=state)]
+        assert ids == [str(i) for i in range(4, 10)]
+
+    def test_checkpoint_with_nested_records(self, tmp_path):
+        xml_p = tmp_path / "data.xml"
+        out_p = tmp_path / "out.jsonl"
+        xml_p.write_bytes(b"<root>" + b"".join(
+            b"<item id='%d'><item id='n%d'/></item>" % (i, i) for i in range(6)) + b"</root>")
+        states = []
+        jsonify.stream_jsonl(str(xml_p), str(out_p), "item",
+                             checkpoint=states.append, checkpoint_every=2)
+        full = out_p.read_bytes()
+        assert len(full.splitlines()) == 6
+        assert jsonify.stream_jsonl(str(xml_p), str(out_p), "item",
+                                    resume_from=states[0]) == 4
+        assert out_p.read_bytes() == full
+
+    def test_checkpoint_errors(self, tmp_path):
+        xml_p = tmp_path / "data.xml"
+        xml_p.write_bytes(SAMPLE)
+        with pytest.raises(ValueError):
+            jsonify.stream_jsonl(str(xml_p), str(tmp_path / "o.jsonl.gz"), "record",
+                                 checkpoint=print)
+        with pytest.raises(ValueError):
+            jsonify.stream_jsonl(str(xml_p), str(tmp_path / "o.jsonl"), "record",
+                                 checkpoint=print, checkpoint_every=0)
+
+        def boom(state):
+            raise RuntimeError("disk full")
+        with pytest.raises(RuntimeError, match="disk full"):
+            jsonify.stream_jsonl(str(xml_p), str(tmp_path / "o.jsonl"), "record",
+                                 checkpoint=boom, checkpoint_every=1)
+
+    def test_checkpoint_failure_stops_at_once(self, tmp_path):
+        xml_p = tmp_path / "data.xml"
+        xml_p.write_bytes(b"<root>" + b"<item/>" * 50 + b"</root>")
+        calls = []
+
+        def failing(state):
+            calls.append(state["records"])
+            if state["records"] == 21:
+                raise RuntimeError("checkpoint store unavailable")
+        with pytest.raises(RuntimeError, match="unavailable"):
+            jsonify.stream_jsonl(str(xml_p), str(tmp_path / "o.jsonl"), "item",
+                                 checkpoint=failing, checkpoint_every=7)
+        assert calls == [7, 14, 21]
+
+
 # ---------------------------------------------------------------------------
 # pygixml.iterdict
 # ---------------------------------------------------------------------------
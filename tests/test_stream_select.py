@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for pygixml.stream_select (streaming XPath subset)
+"""
+
+import pytest
+import pygixml
+
+
+FEED = (
+    b"<feed>"
+    b"<entry type='x'><title>A</title><b><title>nested</title></b></entry>"
+    b"<entry type='y'><title>B</title></entry>"
+    b"<entry type='x'><title>C<i>!</i>D</title></entry>"
+    b"<entry><title>E</title><title>F</title></entry>"
+    b"</feed>"
+)
+
+
+def _texts(path, source=FEED, **kw):
+    return [m if isinstance(m, str) else m.text
+            for m in pygixml.stream_select(source, path, **kw)]
+
+
+class TestAgreesWithDom:
+    """Every supported expression gives the same matches as the DOM"""
+
+    @pytest.mark.parametrize("path", [
+        "/feed/entry[@type='x']/title",
+        '/feed/entry[@type="y"]/title',
+        "//title",
+        "/feed//title",
+        "//entry//title",
+        "/feed/entry[2]/title",
+        "/feed/entry/title[2]",
+        "/feed/entry[@type][2]",
+        "/feed/entry[@type='x'][2]/title",
+        "/feed/*/title",
+        "//b/title",
+        "/feed",
+    ])
+    def test_elements(self, path):
+        doc = pygixml.parse_string(FEED.decode())
+        expected = [(m.node.name, m.node.child_value())
+                    for m in doc.root.select_nodes(path)]
+        got = [(e.tag, e.text) for e in pygixml.stream_select(FEED, path)]
+        assert sorted(got) == sorted(expected)
+
+    def test_text_nodes(self):
+        doc = pygixml.parse_string(FEED.decode())
+        path = "/feed/*/title/text()"
+        expected = [m.node.value for m in doc.root.select_nodes(path)]
+        assert _texts(path) == expected == ["A", "B", "C", "D", "E", "F"]
+
+
+class TestMatches:
+
+    def test_subtree_materialized(self):
+        entry = next(pygixml.stream_select(FEED, "/feed/entry[1]"))
+        assert entry.get("type") == "x"
+        assert [c.tag for c in entry] == ["title", "b"]
+        assert entry.find("b/title").text == "nested"
+
+    def test_nested_matches_inner_first(self):
+        xml = b"<r><s id='1'><s id='2'/></s></r>"
+        assert [e.get("id") for e in pygixml.stream_select(xml, "//s")] == ["2", "1"]
+
+    def test_position_counts_per_parent(self):
+        xml = b"<r><g><i>1</i><i>2</i></g><g><i>3</i><i>4</i></g></r>"
+        assert _texts("//i[2]", xml) == ["2", "4"]
+        assert _texts("/r/g/i[1]", xml) == ["1", "3"]
+
+    def test_no_match(self):
+        assert list(pygixml.stream_select(FEED, "/other//title")) == []
+
+    def test_file_source_and_small_chunks(self, tmp_path):
+        path = tmp_path / "feed.xml"
+        path.write_bytes(FEED)
+        assert _texts("//entry[@type='x']/title", str(path), chunk_size=3) == ["A", "C"]
+
+    def test_large_document(self):
+        xml = b"<r>" + b"".join(
+            b"<rec kind='%s'><v>%d</v></rec>" % (b"a" if i % 3 else b"b", i)
+            for i in range(5000)) + b"</r>"
+        values = _texts("/r/rec[@kind='b']/v/text()", xml)
+        assert values == [str(i) for i in range(0, 5000, 3)]
+
+
+class TestUnsupported:
+
+    @pytest.mark.parametrize("path", [
+        "entry",                 # relative
+        "/feed/entry[last()]",   # functions
+        "/feed/entry/@type",     # attribute step
+        "//text()",
+        "/feed/entry[0]",
+        "/feed/entry[@n=1]",     # unquoted literal
+        "/feed/entry[@type='x'",
+        "/feed/text()/x",
+        "/",
+    ])
+    def test_rejected_eagerly(self, path):
+        with pytest.raises(ValueError):
+            pygixml.stream_select(FEED, path)
+
+    def test_malformed_xml(self):
+        with pytest.raises(pygixml.PygiXMLError):
+            list(pygixml.stream_select(b"<a><b></a>", "//b"))
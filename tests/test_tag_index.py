@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Tests for XMLDocument.build_index (per-document tag index)
+"""
+
+import pytest
+import pygixml
+from pygixml import objectify
+
+
+XML = (
+    "<lib>"
+    "<shelf n='1'><book id='a'><title>A</title></book>"
+    "<book id='b'><title>B</title><note><title>inner</title></note></book></shelf>"
+    "<!-- c --><shelf n='2'><book id='c'><title>C</title></book>text</shelf>"
+    "<ns:book id='d'/>"
+    "</lib>"
+)
+
+
+@pytest.fixture
+def doc():
+    return pygixml.parse_string(XML)
+
+
+def _ids(nodes):
+    return [n.attribute("id").value for n in nodes]
+
+
+def _texts(nodes):
+    return [n.text() for n in nodes]
+
+
+def _xpath_names(node_set):
+    return [n.node.xpath for n in node_set]
+
+
+class TestBuildIndex:
+    def test_returns_element_count(self, doc):
+        assert doc.build_index() == 12
+
+    def test_empty_document(self):
+        doc = pygixml.XMLDocument()
+        assert doc.build_index() == 0
+        assert len(doc.append_child("a").select_nodes("//a")) == 1
+
+    def test_drop(self, doc):
+        doc.build_index()
+        assert doc.build_index(tags=False) == 0
+        assert _ids(doc.root.children(True, tag="book")) == ["a", "b", "c"]
+
+    def test_rebuild_is_idempotent(self, doc):
+        assert doc.build_index() == doc.build_index()
+
+
+class TestChildrenTag:
+    def test_direct_children(self, doc):
+        assert [s.attribute("n").value
+                for s in doc.root.children(tag="shelf")] == ["1", "2"]
+        assert list(doc.root.children(tag="book")) == []
+
+    def test_recursive_without_index(self, doc):
+        assert _texts(doc.root.children(True, tag="title")) == \
+            ["A", "B", "inner", "C"]
+
+    @pytest.mark.parametrize("tag", ["book", "title", "shelf", "note",
+                                     "ns:book", "missing", "lib"])
+    def test_index_matches_walk(self, doc, tag):
+        expected = [n.xpath for n in doc.root.children(True, tag=tag)]
+        doc.build_index()
+        assert [n.xpath for n in doc.root.children(True, tag=tag)] == expected
+
+    def test_subtree_scope(self, doc):
+        doc.build_index()
+        first, second = doc.root.children(tag="shelf")
+        assert _texts(first.children(True, tag="title")) == ["A", "B", "inner"]
+        assert _texts(second.children(True, tag="title")) == ["C"]
+        book_b = first.child("book").next_sibling
+        assert _texts(book_b.children(True, tag="title")) == ["B", "inner"]
+
+    def test_leaf_scope(self, doc):
+        doc.build_index()
+        last = doc.root.child("ns:book")
+        assert list(last.children(True, tag="book")) == []
+
+
+class TestSelectNodes:
+    @pytest.mark.parametrize("query", ["//book", "//title", "//ns:book",
+                                       "//missing", "//lib"])
+    def test_matches_xpath(self, doc, query):
+        expected = _xpath_names(doc.root.select_nodes(query))
+        doc.build_index()
+        assert _xpath_names(doc.root.select_nodes(query)) == expected
+
+    def test_context_does_not_matter(self, doc):
+        doc.build_index()
+        leaf = doc.root.child("shelf").child("book")
+        assert len(leaf.select_nodes("//title")) == 4
+
+    def test_select_node(self, doc):
+        doc.build_index()
+        assert doc.root.select_node("//title").node.text() == "A"
+        assert doc.root.select_node("//missing").node.is_null()
+
+    @pytest.mark.parametrize("query", ["//book/title", "//*", "//book[1]",
+                                       "//@id", "book", "//title/text()"])
+    def test_other_expressions_fall_back(self, doc, query):
+        expected = len(doc.root.select_nodes(query))
+        doc.build_index()
+        assert len(doc.root.select_nodes(query)) == expected
+
+
+class TestInvalidation:
+    def test_append_child(self, doc):
+        doc.build_index()
+        book = doc.root.child("shelf").append_child("book")
+        book.append_attribute("id").value = "x"
+        assert _ids(doc.root.children(True, tag="book")) == ["a", "b", "x", "c"]
+        assert len(doc.root.select_nodes("//book")) == 4
+
+    def test_prepend_child(self, doc):
+        doc.build_index()
+        doc.root.prepend_child("title")
+        assert len(doc.root.select_nodes("//title")) == 5
+        assert doc.root.select_node("//title").node.text() == ""
+
+    def test_remove_child(self, doc):
+        doc.build_index()
+        shelf = doc.root.child("shelf")
+        shelf.remove_child(shelf.child("book"))
+        assert _ids(doc.root.children(True, tag="book")) == ["b", "c"]
+
+    def test_rename(self, doc):
+        doc.build_index()
+        doc.root.child("shelf").child("book").name = "volume"
+        assert _ids(doc.root.children(True, tag="book")) == ["b", "c"]
+        assert len(doc.root.select_nodes("//volume")) == 1
+
+    def test_remove_all_and_prune(self, doc):
+        doc.build_index()
+        doc.root.remove_all(tag="note")
+        assert _texts(doc.root.children(True, tag="title")) == ["A", "B", "C"]
+        doc.prune(tag="book")
+        assert list(doc.root.children(True, tag="title")) == []
+
+    def test_build(self, doc):
+        doc.build_index()
+        doc.root.build(("book", {"id": "z"}))
+        assert _ids(doc.root.children(True, tag="book"))[-1] == "z"
+
+    def test_reload(self, doc):
+        doc.build_index()
+        doc.load_string("<r><book id='n'/></r>")
+        assert _ids(doc.root.children(True, tag="book")) == ["n"]
+        doc.reset()
+        doc.append_child("book")
+        assert len(doc.first_child().select_nodes("//book")) == 1
+
+    def test_documents_are_independent(self, doc):
+        other = pygixml.parse_string(XML)
+        doc.build_index()
+        other.root.append_child("book")
+        assert len(doc.root.select_nodes("//book")) == 3
+        assert len(other.root.select_nodes("//book")) == 4
+
+
+class TestObjectifyFindall:
+    def test_findall_uses_index(self, doc):
+        root = objectify.from_node(doc.root)
+        expected = [str(t) for t in root.findall("title")]
+        doc.build_index()
+        assert [str(t) for t in root.findall("title")] == expected
+        assert [str(t) for t in root.shelf[0].findall("title")] == \
+            ["A", "B", "inner"]
+
+    def test_findall_after_setattr(self, doc):
+        doc.build_index()
+        root = objectify.from_node(doc.root)
+        root.title = "top"
+        assert [str(t) for t in root.findall("title")][-1] == "top"
+        del root.title
+        assert len(root.findall("title")) == 4
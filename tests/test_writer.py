@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Tests for the constant-memory streaming writer (pygixml.XMLWriter)
+"""
+
+import gc
+import io
+import os
+import tempfile
+
+import pytest
+import pygixml
+
+
+def _write(build, **kwargs):
+    out = io.BytesIO()
+    with pygixml.XMLWriter(out, **kwargs) as w:
+        build(w)
+    return out.getvalue().decode("utf-8")
+
+
+class TestWriterBasics:
+    """start / text / end / element"""
+
+    def test_declaration_default(self):
+        xml = _write(lambda w: w.element("root"))
+        assert xml == '<?xml version="1.0" encoding="UTF-8"?><root/>'
+
+    def test_no_declaration(self):
+        xml = _write(lambda w: w.element("root"), declaration=False)
+        assert xml == "<root/>"
+
+    def test_nested_elements(self):
+        def build(w):
+            w.start("root", {"v": "1"})
+            w.element("item", {"id": "1"}, "a")
+            w.element("item", {"id": "2"}, "b")
+            w.end()
+        xml = _write(build, declaration=False)
+        assert xml == '<root v="1"><item id="1">a</item><item id="2">b</item></root>'
+
+    def test_escaping(self):
+        def build(w):
+            w.start("root", {"q": 'a"b<c&'})
+            w.text("x < y & z > w")
+            w.end()
+        xml = _write(build, declaration=False)
+        assert xml == '<root q="a&quot;b&lt;c&amp;">x &lt; y &amp; z &gt; w</root>'
+
+    def test_non_str_values(self):
+        xml = _write(lambda w: w.element("n", {"count": 3, "skip": None}, 1.5),
+                     declaration=False)
+        assert xml == '<n count="3">1.5</n>'
+
+    def test_round_trip_through_parser(self):
+        def build(w):
+            w.start("catalog")
+            for i in range(50):
+                w.element("item", {"id": str(i)}, f"name {i}")
+            w.end()
+        doc = pygixml.parse_string(_write(build))
+        items = doc.root.select_nodes("item")
+        assert len(items) == 50
+        assert items[49].node.text() == "name 49"
+
+    def test_depth(self):
+        out = io.BytesIO()
+        w = pygixml.XMLWriter(out)
+        assert w.depth == 0
+        w.start("a")
+        w.start("b")
+        assert w.depth == 2
+        w.end()
+        w.end()
+        assert w.depth == 0
+        w.close()
+
+
+class TestWriterPretty:
+    """indent= pretty printing"""
+
+    def test_indent_int(self):
+        def build(w):
+            w.start("root")
+            w.element("a", None, "1")
+            w.start("b")
+            w.element("c")
+            w.end()
+            w.end()
+        xml = _write(build, indent=2, declaration=False)
+        assert xml == "<root>\n  <a>1</a>\n  <b>\n    <c/>\n  </b>\n</root>\n"
+
+    def test_mixed_content_untouched(self):
+        def build(w):
+            w.start("p")
+            w.text("one ")
+            w.element("b", None, "two")
+            w.text(" three")
+            w.end()
+        xml = _write(build, indent="\t", declaration=False)
+        assert xml == "<p>one <b>two</b> three</p>\n"
+
+
+class TestWriterSubtree:
+    """write_subtree() embeds existing DOM nodes"""
+
+    def test_subtree_compact(self):
+        doc = pygixml.parse_string("<sub><a>1</a><b/></sub>")
+        def build(w):
+            w.start("root")
+            w.write_subtree(doc.root)
+            w.end()
+        xml = _write(build, declaration=False)
+        assert pygixml.parse_string(xml).root.select_node("sub/a").node.text() == "1"
+        assert "\n" not in xml
+
+    def test_subtree_pretty(self):
+        doc = pygixml.parse_string("<sub><a>1</a></sub>")
+        def build(w):
+            w.start("root")
+            w.write_subtree(doc)
+            w.element("after")
+            w.end()
+        xml = _write(build, indent=2, declaration=False)
+        assert xml == "<root>\n  <sub>\n    <a>1</a>\n  </sub>\n  <after/>\n</root>\n"
+
+    def test_document_with_leading_comment(self):
+        doc = pygixml.parse_string("<!-- note --><?pi x?><sub><a/></sub>",
+                                   pygixml.ParseFlags.FULL)
+        xml = _write(lambda w: w.write_subtree(doc), declaration=False)
+        assert xml == "<!-- note --><?pi x?><sub><a/></sub>"
+
+    def test_subtree_second_root(self):
+        doc = pygixml.parse_string("<sub/>")
+        w = pygixml.XMLWriter(io.BytesIO())
+        w.write_subtree(doc.root)
+        with pytest.raises(pygixml.PygiXMLError):
+            w.write_subtree(doc)
+        with pytest.raises(pygixml.PygiXMLError):
+            w.write_subtree(doc.root)
+        w.close()
+
+    def test_subtree_null_node(self):
+        doc = pygixml.parse_string("<root/>")
+        w = pygixml.XMLWriter(io.BytesIO())
+        with pytest.raises(pygixml.PygiXMLNullNodeError):
+            w.write_subtree(doc.root.child("missing"))
+
+
+class TestWriterTargets:
+    """Paths, binary and text file objects, small buffers"""
+
+    def test_path(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.xml")
+            with pygixml.XMLWriter(path) as w:
+                w.element("root", {"id": "1"})
+            doc = pygixml.parse_file(path)
+            assert doc.root.attribute("id").value == "1"
+
+    def test_text_stream_with_tiny_buffer(self):
+        out = io.StringIO()
+        with pygixml.XMLWriter(out, declaration=False, buffer_size=1) as w:
+            w.element("شهر", {"نام": "تهران"}, "متن" * 10)
+        assert out.getvalue() == '<شهر نام="تهران">' + "متن" * 10 + "</شهر>"
+
+    def test_file_object_left_open(self):
+        out = io.BytesIO()
+        w = pygixml.XMLWriter(out)
+        w.element("root")
+        w.close()
+        assert not out.closed
+        assert w.closed
+
+    def test_bad_target(self):
+        with pytest.raises(TypeError):
+            pygixml.XMLWriter(42)
+
+    def test_unwritable_path(self):
+        with pytest.raises(pygixml.PygiXMLError):
+            pygixml.XMLWriter("/nonexistent-dir/out.xml")
+
+
+class TestWriterErrors:
+    """Misuse is reported, not silently accepted"""
+
+    def test_end_without_start(self):
+        w = pygixml.XMLWriter(io.BytesIO())
+        with pytest.raises(pygixml.PygiXMLError):
+            w.end()
+
+    def test_end_tag_mismatch(self):
+        w = pygixml.XMLWriter(io.BytesIO())
+        w.start("a")
+        with pytest.raises(pygixml.PygiXMLError):
+            w.end("b")
+
+    def test_close_with_open_elements(self):
+        w = pygixml.XMLWriter(io.BytesIO())
+        w.start("a")
+        with pytest.raises(pygixml.PygiXMLError):
+            w.close()
+
+    def test_write_after_close(self):
+        w = pygixml.XMLWriter(io.BytesIO())
+        w.element("a")
+        w.close()
+        with pytest.raises(pygixml.PygiXMLError):
+            w.start("b")
+
+    def test_empty_tag(self):
+        w = pygixml.XMLWriter(io.BytesIO())
+        with pytest.raises(ValueError):
+            w.start("")
+
+    @pytest.mark.parametrize("tag, attrs", [("a b", None), ("1a", None), ("a>", None),
+                                            ("a", {"b c": "1"}), ("a", {"": "1"}),
+                                            ("a", {"x='1'": "1"})])
+    def test_invalid_names(self, tag, attrs):
+        out = io.BytesIO()
+        w = pygixml.XMLWriter(out, declaration=False)
+        with pytest.raises(ValueError):
+            w.start(tag, attrs)
+        w.element("ok", {"ns:a-b.c": "1", "é": "2"})
+        w.close()
+        assert out.getvalue() == '<ok ns:a-b.c="1" é="2"/>'.encode("utf-8")
+
+    def test_second_root(self):
+        w = pygixml.XMLWriter(io.BytesIO())
+        w.element("a")
+        with pytest.raises(pygixml.PygiXMLError):
+            w.start("b")
+        with pytest.raises(pygixml.PygiXMLError):
+            w.element("b")
+
+    def test_top_level_text(self):
+        out = io.BytesIO()
+        w = pygixml.XMLWriter(out, declaration=False)
+        with pytest.raises(pygixml.PygiXMLError):
+            w.text("top <level>")
+        w.text("\n")
+        w.element("a")
+        w.close()
+        assert out.getvalue() == b"\n<a/>"
+
+    def test_unclosed_writer_discards_buffer(self):
+        out = io.BytesIO()
+        w = pygixml.XMLWriter(out, declaration=False)
+        w.start("a")
+        w.element("b")
+        w.flush()
+        w.element("c")
+        with pytest.warns(ResourceWarning):
+            del w
+        assert out.getvalue() == b"<a><b/>"
+
+    def test_exception_in_with_block_discards_buffer(self):
+        out = io.BytesIO()
+        with pytest.raises(KeyError):
+            with pygixml.XMLWriter(out, declaration=False) as w:
+                w.start("a")
+                w.element("b")
+                w.flush()
+                w.element("c")
+                raise KeyError("x")
+        assert out.getvalue() == b"<a><b/>" and w.closed
+
+    def test_failed_constructor_does_not_warn(self, recwarn):
+        with pytest.raises(TypeError):
+            pygixml.XMLWriter(42)
+        gc.collect()
+        assert not [w for w in recwarn if w.category is ResourceWarning]
+
+    def test_writer_in_a_cycle(self):
+        class Target(io.BytesIO):
+            pass
+        out = Target()
+        w = pygixml.XMLWriter(out, declaration=False)
+        out.writer = w          # target -> writer -> target
+        w.element("a")
+        del w, out
+        with pytest.warns(ResourceWarning):
+            gc.collect()
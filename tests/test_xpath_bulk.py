@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for bulk XPathQuery evaluation (evaluate_strings / _numbers / _nodes / _attrs)
+"""
+
+import math
+
+import pytest
+import pygixml
+
+
+@pytest.fixture
+def doc():
+    return pygixml.parse_string(
+        "<root>"
+        "<item id='1' price='3.5'>apple</item>"
+        "<item id='2' price=' 12 '>pe<b>a</b>r<![CDATA[!]]></item>"
+        "<item id='3' price='n/a'><!--c-->plum</item>"
+        "</root>"
+    )
+
+
+class TestEvaluateStrings:
+
+    def test_element_string_values(self, doc):
+        q = pygixml.XPathQuery("item")
+        assert q.evaluate_strings(doc.root) == ["apple", "pear!", "plum"]
+
+    def test_attribute_values(self, doc):
+        assert pygixml.XPathQuery("item/@id").evaluate_strings(doc.root) == ["1", "2", "3"]
+
+    def test_text_nodes(self, doc):
+        assert pygixml.XPathQuery("item/text()").evaluate_strings(doc.root)[:2] == ["apple", "pe"]
+
+    def test_matches_xpath_string(self, doc):
+        for i in (1, 2, 3):
+            expected = pygixml.XPathQuery(f"string(item[{i}])").evaluate_string(doc.root)
+            got = pygixml.XPathQuery(f"item[{i}]").evaluate_strings(doc.root)
+            assert got == [expected]
+
+    def test_empty(self, doc):
+        assert pygixml.XPathQuery("missing").evaluate_strings(doc.root) == []
+
+    def test_unicode(self):
+        doc = pygixml.parse_string("<r><n>تهران</n><n>東京</n></r>")
+        assert pygixml.XPathQuery("n").evaluate_strings(doc.root) == ["تهران", "東京"]
+
+    def test_bindings(self, doc):
+        q = pygixml.XPathQuery("item[@id = $id]/@price", variables={"id": str})
+        assert q.evaluate_strings(doc.root, id="2") == [" 12 "]
+
+    def test_non_node_set_expression(self, doc):
+        with pytest.raises(RuntimeError):
+            pygixml.XPathQuery("count(item)").evaluate_strings(doc.root)
+
+
+class TestEvaluateNumbers:
+
+    def test_numbers(self, doc):
+        values = pygixml.XPathQuery("item/@price").evaluate_numbers(doc.root)
+        assert values[:2] == [3.5, 12.0]
+        assert math.isnan(values[2])
+
+    def test_xpath_number_rules(self):
+        doc = pygixml.parse_string(
+            "<r><v>-2</v><v>.5</v><v>1e3</v><v>+1</v><v></v><v>7.</v></r>")
+        values = pygixml.XPathQuery("v").evaluate_numbers(doc.root)
+        assert values[0] == -2.0 and values[1] == 0.5 and values[5] == 7.0
+        assert all(math.isnan(v) for v in values[2:5])
+
+    def test_independent_of_locale(self, doc):
+        import locale
+        saved = locale.setlocale(locale.LC_NUMERIC)
+        for name in ("de_DE.UTF-8", "de_DE.utf8", "fr_FR.UTF-8", "fr_FR.utf8",
+                     "German_Germany.1252"):
+            try:
+                locale.setlocale(locale.LC_NUMERIC, name)
+                break
+            except locale.Error:
+                continue
+        else:
+            pytest.skip("no comma-decimal locale installed")
+        try:
+            values = pygixml.XPathQuery("item/@price").evaluate_numbers(doc.root)
+        finally:
+            locale.setlocale(locale.LC_NUMERIC, saved)
+        assert values[:2] == [3.5, 12.0]
+
+    def test_numpy(self, doc):
+        np = pytest.importorskip("numpy")
+        arr = pygixml.XPathQuery("item/@id").evaluate_numbers(doc.root, as_numpy=True)
+        assert arr.dtype == np.float64
+        assert arr.tolist() == [1.0, 2.0, 3.0]
+
+    def test_numpy_missing(self, doc):
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            with pytest.raises(pygixml.PygiXMLError):
+                pygixml.XPathQuery("item").evaluate_numbers(doc.root, as_numpy=True)
+        else:
+            pytest.skip("NumPy is installed")
+
+
+class TestEvaluateNodesAndAttrs:
+
+    def test_nodes(self, doc):
+        nodes = pygixml.XPathQuery("item").evaluate_nodes(doc.root)
+        assert [n.attribute("id").value for n in nodes] == ["1", "2", "3"]
+        assert all(isinstance(n, pygixml.XMLNode) for n in nodes)
+
+    def test_nodes_skip_attributes(self, doc):
+        assert pygixml.XPathQuery("item/@id").evaluate_nodes(doc.root) == []
+
+    def test_attrs(self, doc):
+        attrs = pygixml.XPathQuery("item/@*").evaluate_attrs(doc.root)
+        assert [(a.name, a.value) for a in attrs][:2] == [("id", "1"), ("price", "3.5")]
+        assert len(attrs) == 6
+
+    def test_attrs_skip_nodes(self, doc):
+        assert pygixml.XPathQuery("item").evaluate_attrs(doc.root) == []
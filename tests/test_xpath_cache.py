@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled XPath query cache
+"""
+
+import threading
+
+import pytest
+import pygixml
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    pygixml.set_xpath_cache_size(256)
+    pygixml.xpath_cache_clear()
+    yield
+    pygixml.set_xpath_cache_size(256)
+    pygixml.xpath_cache_clear()
+
+
+@pytest.fixture
+def doc():
+    return pygixml.parse_string("<root><a id='1'/><b/><a id='2'/></root>")
+
+
+class TestXPathCacheHits:
+    """select_nodes / select_node go through the cache"""
+
+    def test_repeated_query_hits(self, doc):
+        for _ in range(3):
+            assert len(doc.root.select_nodes("a")) == 2
+        info = pygixml.xpath_cache_info()
+        assert (info.hits, info.misses, info.currsize) == (2, 1, 1)
+        assert info.maxsize == 256
+
+    def test_select_node_shares_entries(self, doc):
+        doc.root.select_nodes("a[@id='2']")
+        assert doc.root.select_node("a[@id='2']").node.attribute("id").value == "2"
+        assert pygixml.xpath_cache_info().hits == 1
+
+    def test_results_independent_of_context(self, doc):
+        other = pygixml.parse_string("<root><a/></root>")
+        assert len(doc.root.select_nodes("a")) == 2
+        assert len(other.root.select_nodes("a")) == 1
+
+    def test_query_module_uses_cache(self, doc):
+        from pygixml.query import _execute_xpath
+        _execute_xpath(doc, "//a")
+        _execute_xpath(doc, "//a")
+        assert pygixml.xpath_cache_info().hits == 1
+
+    def test_invalid_expression_not_cached(self, doc):
+        with pytest.raises(Exception):
+            doc.root.select_nodes("a[")
+        assert pygixml.xpath_cache_info().currsize == 0
+
+
+class TestXPathCacheSize:
+    """LRU bounds and configuration"""
+
+    def test_lru_eviction(self, doc):
+        pygixml.set_xpath_cache_size(2)
+        doc.root.select_nodes("a")
+        doc.root.select_nodes("b")
+        doc.root.select_nodes("a")        # refresh "a"
+        doc.root.select_nodes("c")        # evicts "b"
+        doc.root.select_nodes("a")
+        doc.root.select_nodes("b")
+        info = pygixml.xpath_cache_info()
+        assert info.currsize == 2
+        assert (info.hits, info.misses) == (2, 4)
+
+    def test_shrink_evicts(self, doc):
+        for q in ("a", "b", "c", "d"):
+            doc.root.select_nodes(q)
+        pygixml.set_xpath_cache_size(1)
+        assert pygixml.xpath_cache_info().currsize == 1
+
+    def test_zero_disables(self, doc):
+        pygixml.set_xpath_cache_size(0)
+        doc.root.select_nodes("a")
+        doc.root.select_nodes("a")
+        info = pygixml.xpath_cache_info()
+        assert (info.hits, info.misses, info.currsize) == (0, 2, 0)
+
+    def test_negative_size(self):
+        with pytest.raises(ValueError):
+            pygixml.set_xpath_cache_size(-1)
+
+    def test_clear(self, doc):
+        doc.root.select_nodes("a")
+        pygixml.xpath_cache_clear()
+        assert pygixml.xpath_cache_info() == (0, 0, 256, 0)
+
+
+class TestXPathCacheThreads:
+    """Concurrent lookups share compiled queries safely"""
+
+    def test_concurrent_select(self, doc):
+        pygixml.set_xpath_cache_size(4)
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(200):
+                    q = ("a", "b", "//a[@id]", "*", "a[1]", "b[1]")[(i + n) % 6]
+                    doc.root.select_nodes(q)
+            except Exception as exc:   # pragma: no cover - reported below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors
+        info = pygixml.xpath_cache_info()
+        assert info.hits + info.misses == 1600
+        assert info.currsize <= 4
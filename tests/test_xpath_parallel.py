@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for XPathQuery.evaluate_many (parallel evaluation over many documents)
+"""
+
+import pytest
+import pygixml
+
+
+def _make_docs(count=40):
+    return [
+        pygixml.parse_string(
+            "<root>" + "".join(
+                f"<item id='{d}-{i}'><price>{i}.5</price></item>"
+                for i in range(d % 5)) + "</root>")
+        for d in range(count)
+    ]
+
+
+class TestEvaluateMany:
+
+    @pytest.mark.parametrize("workers", [1, 3, 8, None])
+    def test_strings_in_input_order(self, workers):
+        docs = _make_docs()
+        q = pygixml.XPathQuery("//item/@id")
+        expected = [q.evaluate_strings(d.root) for d in docs]
+        assert q.evaluate_many(docs, kind="strings", workers=workers) == expected
+
+    def test_count(self):
+        docs = _make_docs()
+        counts = pygixml.XPathQuery("//item").evaluate_many(docs, kind="count", workers=4)
+        assert counts == [d % 5 for d in range(len(docs))]
+
+    def test_numbers(self):
+        docs = _make_docs(6)
+        q = pygixml.XPathQuery("//price")
+        assert q.evaluate_many(docs, kind="numbers", workers=2)[4] == [0.5, 1.5, 2.5, 3.5]
+
+    def test_nodes(self):
+        docs = _make_docs(6)
+        rows = pygixml.XPathQuery("item").evaluate_many(
+            [d.root for d in docs], kind="nodes", workers=2)
+        assert [len(r) for r in rows] == [0, 1, 2, 3, 4, 0]
+        assert rows[3][2].attribute("id").value == "3-2"
+
+    def test_documents_and_nodes_mixed(self):
+        docs = _make_docs(3)
+        q = pygixml.XPathQuery("//item")
+        assert q.evaluate_many([docs[2], docs[2].root], kind="count") == [2, 2]
+
+    def test_bindings_shared(self):
+        docs = _make_docs(10)
+        q = pygixml.XPathQuery("//item[price > $min]", variables={"min": float})
+        assert q.evaluate_many(docs, kind="count", workers=3, min=2) == \
+            [max(d % 5 - 2, 0) for d in range(10)]
+
+    def test_generator_input(self):
+        q = pygixml.XPathQuery("//item")
+        gen = (pygixml.parse_string("<r><item/><item/></r>") for _ in range(5))
+        assert q.evaluate_many(gen, kind="count", workers=2) == [2] * 5
+
+    def test_empty(self):
+        assert pygixml.XPathQuery("//item").evaluate_many([], workers=4) == []
+
+
+class TestEvaluateManyErrors:
+
+    def test_bad_kind(self):
+        with pytest.raises(ValueError):
+            pygixml.XPathQuery("a").evaluate_many([], kind="bogus")
+
+    def test_bad_workers(self):
+        with pytest.raises(ValueError):
+            pygixml.XPathQuery("a").evaluate_many([], workers=0)
+
+    def test_bad_item(self):
+        with pytest.raises(TypeError):
+            pygixml.XPathQuery("a").evaluate_many(["<a/>"])
+
+    def test_not_node_set(self):
+        doc = pygixml.parse_string("<a/>")
+        with pytest.raises(RuntimeError):
+            pygixml.XPathQuery("count(a)").evaluate_many([doc], kind="count")
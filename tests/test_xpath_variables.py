@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for parameterized XPath queries (XPathQuery variables=)
+"""
+
+import pytest
+import pygixml
+
+
+@pytest.fixture
+def doc():
+    return pygixml.parse_string(
+        "<root>"
+        "<item id='1' price='3'>apple</item>"
+        "<item id='2' price='5'>pear</item>"
+        "<item id='it&apos;s' price='8'>quote</item>"
+        "</root>"
+    )
+
+
+class TestVariableTypes:
+    """str / number / bool / node-set variables"""
+
+    def test_string_variable(self, doc):
+        q = pygixml.XPathQuery("item[@id = $id]", variables={"id": str})
+        assert q.evaluate_node(doc.root, id="2").node.text() == "pear"
+        assert q.evaluate_node(doc.root, id="1").node.text() == "apple"
+
+    def test_string_needs_no_escaping(self, doc):
+        q = pygixml.XPathQuery("item[@id = $id]", variables={"id": str})
+        assert q.evaluate_string(doc.root, id="it's") == "quote"
+
+    def test_number_variable(self, doc):
+        q = pygixml.XPathQuery("count(item[@price > $n])", variables={"n": float})
+        assert q.evaluate_number(doc.root, n=4) == 2.0
+        assert q.evaluate_number(doc.root, n=4.5) == 2.0
+        assert q.evaluate_number(doc.root, n=100) == 0.0
+
+    def test_int_is_number(self, doc):
+        q = pygixml.XPathQuery("item[$i]", variables={"i": int})
+        assert q.evaluate_string(doc.root, i=3) == "quote"
+
+    def test_bool_variable(self, doc):
+        q = pygixml.XPathQuery("$flag and item", variables={"flag": bool})
+        assert q.evaluate_boolean(doc.root, flag=True) is True
+        assert q.evaluate_boolean(doc.root, flag=False) is False
+
+    def test_node_set_variable(self, doc):
+        q = pygixml.XPathQuery("$items[@price < 6]",
+                               variables={"items": pygixml.XPathNodeSet})
+        items = doc.root.select_nodes("item")
+        assert len(q.evaluate_node_set(doc.root, items=items)) == 2
+
+    def test_multiple_variables(self, doc):
+        q = pygixml.XPathQuery("item[@price >= $lo and @price <= $hi]",
+                               variables={"lo": float, "hi": float})
+        assert len(q.evaluate_node_set(doc.root, lo=3, hi=5)) == 2
+        assert len(q.evaluate_node_set(doc.root, lo=6, hi=9)) == 1
+
+
+class TestBindingSemantics:
+    """Defaults, per-call binding and validation"""
+
+    def test_unbound_defaults_to_empty(self, doc):
+        q = pygixml.XPathQuery("item[@id = $id]", variables={"id": str})
+        assert len(q.evaluate_node_set(doc.root)) == 0
+
+    def test_bindings_reset_each_call(self, doc):
+        q = pygixml.XPathQuery("item[@id = $id]", variables={"id": str})
+        assert q.evaluate_string(doc.root, id="2") == "pear"
+        assert len(q.evaluate_node_set(doc.root)) == 0
+        both = pygixml.XPathQuery("count(item[@id = $a or @id = $b])",
+                                  variables={"a": str, "b": str})
+        assert both.evaluate_number(doc.root, a="1", b="2") == 2.0
+        assert both.evaluate_number(doc.root, a="1") == 1.0
+
+    def test_variables_property(self):
+        q = pygixml.XPathQuery("$a = $b", variables={"a": str, "b": float})
+        assert q.variables == {"a": str, "b": float}
+        assert pygixml.XPathQuery("1").variables == {}
+
+    def test_unknown_binding(self, doc):
+        q = pygixml.XPathQuery("item[@id = $id]", variables={"id": str})
+        with pytest.raises(TypeError):
+            q.evaluate_node_set(doc.root, other="x")
+        with pytest.raises(TypeError):
+            pygixml.XPathQuery("item").evaluate_node_set(doc.root, id="1")
+
+    def test_wrong_value_type(self, doc):
+        q = pygixml.XPathQuery("item[@id = $id]", variables={"id": str})
+        with pytest.raises(TypeError):
+            q.evaluate_node_set(doc.root, id=1)
+        n = pygixml.XPathQuery("item[$i]", variables={"i": float})
+        with pytest.raises(TypeError):
+            n.evaluate_node_set(doc.root, i="1")
+
+    def test_unsupported_declared_type(self):
+        with pytest.raises(TypeError):
+            pygixml.XPathQuery("$x", variables={"x": list})
+
+    def test_undeclared_variable_fails_to_compile(self):
+        with pytest.raises(RuntimeError):
+            pygixml.XPathQuery("item[@id = $id]")
+        with pytest.raises(RuntimeError):
+            pygixml.XPathQuery("item[@id = $id]", variables={"other": str})